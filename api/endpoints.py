@@ -0,0 +1,242 @@
+import hashlib
+from collections import namedtuple
+
+from django.conf import settings
+from django.core.cache import cache
+
+from wagtail.images import get_image_model
+from wagtail.rich_text import expand_db_html
+
+from blogpages.listings import paginate_by_cursor
+from blogpages.models import Author, BlogDetail, BlogIndex
+
+
+# `columns` are what must be loaded to produce the field, `prefetch`
+# optionally adds related lookups to the queryset
+Field = namedtuple("Field", ["columns", "get", "prefetch"], defaults=[None])
+
+
+def attribute(name):
+    return Field((name,), lambda obj, request: getattr(obj, name))
+
+
+def foreign_key(name):
+    return Field((name,), lambda obj, request: getattr(obj, name + "_id"))
+
+
+def timestamp(name):
+    def get(obj, request):
+        value = getattr(obj, name)
+        return value.isoformat() if value else None
+
+    return Field((name,), get)
+
+
+class Endpoint:
+    """
+    Read-only JSON listing and detail of one model.
+
+    Clients pick what they get with `?fields=a,b` (or `*` for everything),
+    and only the columns those fields need are loaded.
+    """
+
+    model = None
+    fields = {}
+    default_fields = ()
+    # Always loaded, for pagination and conditional GETs
+    base_columns = ("id",)
+
+    def get_queryset(self):
+        return self.model.objects.all()
+
+    def get_fields(self, request):
+        requested = request.GET.get("fields")
+        if not requested:
+            return list(self.default_fields)
+        if requested == "*":
+            return list(self.fields)
+
+        names = list(dict.fromkeys(name.strip() for name in requested.split(",") if name.strip()))
+        unknown = [name for name in names if name not in self.fields]
+        if unknown:
+            raise ValueError(f"Unknown fields: {', '.join(unknown)}")
+        return names
+
+    def load(self, queryset, fields):
+        columns = set(self.base_columns)
+        for name in fields:
+            columns.update(self.fields[name].columns)
+        queryset = queryset.only(*columns)
+
+        for name in fields:
+            if self.fields[name].prefetch:
+                queryset = self.fields[name].prefetch(queryset)
+        return queryset
+
+    def paginate(self, queryset, cursor, limit):
+        queryset = queryset.order_by("pk")
+        if cursor:
+            try:
+                queryset = queryset.filter(pk__gt=int(cursor))
+            except ValueError:
+                raise ValueError("Invalid cursor")
+
+        objects = list(queryset[: limit + 1])
+        next_cursor = str(objects[limit - 1].pk) if len(objects) > limit else None
+        return objects[:limit], next_cursor
+
+    def get_cache_version(self, obj):
+        """
+        A value that changes whenever `obj`'s representation does, if known.
+        Lets responses be validated (ETag / 304) without serializing anything.
+        """
+        return None
+
+    def get_last_modified(self, obj):
+        """
+        When `obj`'s representation last changed, if known, for Last-Modified.
+        """
+        return None
+
+    def serialize(self, objects, fields, request):
+        return [
+            {name: self.fields[name].get(obj, request) for name in fields}
+            for obj in objects
+        ]
+
+
+class RevisionedEndpoint(Endpoint):
+    """
+    For models published through revisions: each object's representation
+    is cached per live revision, so it's only serialized again once a new
+    revision is published.
+    """
+
+    base_columns = ("id", "last_published_at", "live_revision")
+
+    def get_queryset(self):
+        return self.model.objects.filter(live=True)
+
+    def get_last_modified(self, obj):
+        return obj.last_published_at
+
+    def get_cache_version(self, obj):
+        return obj.live_revision_id
+
+    def serialize(self, objects, fields, request):
+        fields_key = hashlib.md5(",".join(fields).encode(), usedforsecurity=False).hexdigest()
+        keys = [
+            f"api:{self.model._meta.label_lower}:{obj.pk}:{self.get_cache_version(obj)}:"
+            f"{request.get_host()}:{fields_key}"
+            for obj in objects
+        ]
+
+        cached = cache.get_many(keys)
+        missing = {key: obj for key, obj in zip(keys, objects) if key not in cached}
+        if missing:
+            serialized = dict(
+                zip(missing, super().serialize(missing.values(), fields, request))
+            )
+            cache.set_many(
+                serialized, getattr(settings, "API_CACHE_TIMEOUT", 60 * 60 * 24)
+            )
+            cached.update(serialized)
+
+        return [cached[key] for key in keys]
+
+
+class PageEndpoint(RevisionedEndpoint):
+    base_columns = RevisionedEndpoint.base_columns + ("first_published_at", "path", "url_path")
+
+    def get_queryset(self):
+        return self.model.objects.live().public()
+
+    def get_cache_version(self, obj):
+        # Moving a page changes its URL without a new revision
+        return f"{obj.live_revision_id}:{obj.url_path}"
+
+    def get_last_modified(self, obj):
+        # Not last_published_at, which a move doesn't change; pages are
+        # validated by their ETag (which includes the URL) alone
+        return None
+
+    def paginate(self, queryset, cursor, limit):
+        # Newest first, like the blog listing
+        return paginate_by_cursor(queryset, cursor, limit)
+
+
+page_fields = {
+    "id": attribute("id"),
+    "title": attribute("title"),
+    "slug": attribute("slug"),
+    "url": Field(("url_path",), lambda page, request: page.get_full_url(request)),
+    "first_published_at": timestamp("first_published_at"),
+    "last_published_at": timestamp("last_published_at"),
+}
+
+
+class BlogDetailEndpoint(PageEndpoint):
+    model = BlogDetail
+    fields = {
+        **page_fields,
+        "subtitle": attribute("subtitle"),
+        "author": foreign_key("author"),
+        "image": foreign_key("image"),
+        "tags": Field(
+            (),
+            lambda page, request: [item.tag.name for item in page.tagged_items.all()],
+            lambda queryset: queryset.prefetch_related("tagged_items__tag"),
+        ),
+        # The stored StreamField JSON, without building block values
+        "body": Field(("body",), lambda page, request: list(page.body.raw_data)),
+    }
+    default_fields = ("id", "title", "url", "first_published_at")
+
+
+class BlogIndexEndpoint(PageEndpoint):
+    model = BlogIndex
+    fields = {
+        **page_fields,
+        "subtitle": attribute("subtitle"),
+        "body": Field(("body",), lambda page, request: expand_db_html(page.body)),
+    }
+    default_fields = ("id", "title", "url")
+
+
+class AuthorEndpoint(RevisionedEndpoint):
+    model = Author
+    fields = {
+        "id": attribute("id"),
+        "name": attribute("name"),
+        "bio": attribute("bio"),
+        "last_published_at": timestamp("last_published_at"),
+    }
+    default_fields = ("id", "name")
+
+
+class ImageEndpoint(Endpoint):
+    model = get_image_model()
+    fields = {
+        "id": attribute("id"),
+        "title": attribute("title"),
+        "caption": attribute("caption"),
+        "width": attribute("width"),
+        "height": attribute("height"),
+        # The file field reads the dimensions it keeps up to date
+        "url": Field(
+            ("file", "width", "height"),
+            lambda image, request: request.build_absolute_uri(image.file.url),
+        ),
+        "focal_point": Field(
+            ("focal_point_x", "focal_point_y", "focal_point_width", "focal_point_height"),
+            lambda image, request: {
+                "x": image.focal_point_x,
+                "y": image.focal_point_y,
+                "width": image.focal_point_width,
+                "height": image.focal_point_height,
+            }
+            if image.has_focal_point()
+            else None,
+        ),
+    }
+    default_fields = ("id", "title", "width", "height", "url")
@@ -0,0 +1,20 @@
+from django.urls import path
+
+from api import endpoints, views
+
+
+app_name = "api"
+
+routes = {
+    "posts": endpoints.BlogDetailEndpoint(),
+    "blog-indexes": endpoints.BlogIndexEndpoint(),
+    "authors": endpoints.AuthorEndpoint(),
+    "images": endpoints.ImageEndpoint(),
+}
+
+urlpatterns = []
+for name, endpoint in routes.items():
+    urlpatterns += [
+        path(f"{name}/", views.listing, {"endpoint": endpoint}, name=f"{name}_listing"),
+        path(f"{name}/<int:pk>/", views.detail, {"endpoint": endpoint}, name=f"{name}_detail"),
+    ]
@@ -0,0 +1,101 @@
+import hashlib
+import json
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import Http404, JsonResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+from django.views.decorators.http import require_safe
+
+
+MAX_LIMIT = 100
+
+
+def _etag(*parts):
+    return '"%s"' % hashlib.md5(repr(parts).encode(), usedforsecurity=False).hexdigest()
+
+
+def _conditional_json(request, get_data, etag=None, last_modified=None):
+    """
+    Respond with `get_data()` as JSON, or a 304 if the client's copy matches
+    `etag` / `last_modified`. Without an `etag` one is taken from the
+    content, which still saves the transfer but not the serialization.
+    """
+    content = None
+    if etag is None:
+        content = json.dumps(get_data(), cls=DjangoJSONEncoder)
+        etag = _etag(content)
+
+    response = JsonResponse({})
+    response["ETag"] = etag
+    # Clients may keep responses but must revalidate them
+    response["Cache-Control"] = "public, no-cache"
+    if last_modified is not None:
+        response["Last-Modified"] = http_date(last_modified.timestamp())
+
+    not_modified = get_conditional_response(
+        request,
+        etag=etag,
+        last_modified=int(last_modified.timestamp()) if last_modified else None,
+        response=response,
+    )
+    if not_modified is not response:
+        return not_modified
+
+    response.content = content or json.dumps(get_data(), cls=DjangoJSONEncoder)
+    return response
+
+
+@require_safe
+def listing(request, endpoint):
+    try:
+        fields = endpoint.get_fields(request)
+        limit = max(1, min(int(request.GET.get("limit", 20)), MAX_LIMIT))
+        objects, next_cursor = endpoint.paginate(
+            endpoint.load(endpoint.get_queryset(), fields), request.GET.get("after"), limit
+        )
+    except ValueError as e:
+        return JsonResponse({"error": str(e)}, status=400)
+
+    next_url = None
+    if next_cursor:
+        query = request.GET.copy()
+        query["after"] = next_cursor
+        next_url = request.build_absolute_uri("?" + query.urlencode())
+
+    def get_data():
+        return {"items": endpoint.serialize(objects, fields, request), "next": next_url}
+
+    versions = [endpoint.get_cache_version(obj) for obj in objects]
+    if objects and None not in versions:
+        etag = _etag(
+            request.get_host(),
+            fields,
+            next_cursor,
+            [(obj.pk, version) for obj, version in zip(objects, versions)],
+        )
+        modified = [endpoint.get_last_modified(obj) for obj in objects]
+        last_modified = max(modified) if None not in modified else None
+        return _conditional_json(request, get_data, etag, last_modified)
+    return _conditional_json(request, get_data)
+
+
+@require_safe
+def detail(request, endpoint, pk):
+    try:
+        fields = endpoint.get_fields(request)
+    except ValueError as e:
+        return JsonResponse({"error": str(e)}, status=400)
+
+    obj = endpoint.load(endpoint.get_queryset(), fields).filter(pk=pk).first()
+    if obj is None:
+        raise Http404
+
+    def get_data():
+        return endpoint.serialize([obj], fields, request)[0]
+
+    version = endpoint.get_cache_version(obj)
+    if version is None:
+        return _conditional_json(request, get_data)
+    etag = _etag(request.get_host(), fields, obj.pk, version)
+    return _conditional_json(request, get_data, etag, endpoint.get_last_modified(obj))
@@ -1,8 +1,27 @@
+from functools import partial
+
 from django.core.exceptions import ValidationError
 from wagtail import blocks
 from wagtail.images.blocks import ImageChooserBlock
 
-class TextBlock(blocks.TextBlock):
+from blocks.cache import static_render_cache
+from caching.dependencies import record_dependency
+
+
+class ContextFreeBlock:
+    """
+    Mixin for blocks whose output depends only on their value, never on the
+    page or request: each distinct value is rendered once per process and
+    reused (see blocks.cache.static_render_cache).
+    """
+
+    def render(self, value, context=None):
+        return static_render_cache.get_or_render(
+            self, value, partial(super().render, value)
+        )
+
+
+class TextBlock(ContextFreeBlock, blocks.TextBlock):
 
     def __init__(self, **kwargs):
         super().__init__(**kwargs,
@@ -23,7 +42,7 @@ class TextBlock(blocks.TextBlock):
         group = "Standalone blocks"
        
 
-class InfoBlock(blocks.StaticBlock):
+class InfoBlock(ContextFreeBlock, blocks.StaticBlock):
     class Meta:
         # icon = '....'
         group = "Standalone blocks"
@@ -48,7 +67,7 @@ class FAQBlock(blocks.StructBlock):
 
 
 
-class FAQListBlock(blocks.ListBlock):
+class FAQListBlock(ContextFreeBlock, blocks.ListBlock):
     def __init__(self, **kwargs):
         super().__init__(FAQBlock(), **kwargs)
 
@@ -122,8 +141,12 @@ class ImageBlock(ImageChooserBlock):
 
     def get_context(self, value, parent_context=None):
         from blogpages.models import BlogDetail
+        from blogpages.listings import get_blog_listing
         context = super().get_context(value, parent_context)
-        context['blog_posts'] = BlogDetail.objects.all().live().public()
+        # Any published post changes this list
+        record_dependency(BlogDetail)
+        request = parent_context.get('request') if parent_context else None
+        context['blog_posts'] = get_blog_listing(request)
         return context
 
     class Meta:
@@ -0,0 +1,97 @@
+import hashlib
+import json
+import threading
+from collections import Counter, OrderedDict
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import models
+
+from caching.dependencies import cached_render, record_dependency
+from blocks.values import iter_leaf_values
+
+
+# (block type, "hits" | "misses") -> count, for this process
+block_cache_stats = Counter()
+
+
+def _without_ids(data):
+    # List and stream items carry a random id that says nothing about content
+    if isinstance(data, dict):
+        if set(data) == {"type", "value", "id"}:
+            data = {"type": data["type"], "value": data["value"]}
+        return {key: _without_ids(value) for key, value in data.items()}
+    if isinstance(data, list):
+        return [_without_ids(item) for item in data]
+    return data
+
+
+def _block_class(block):
+    return f"{type(block).__module__}.{type(block).__qualname__}"
+
+
+def value_digest(block, value):
+    content = json.dumps(
+        _without_ids(block.get_prep_value(value)),
+        cls=DjangoJSONEncoder,
+        sort_keys=True,
+    )
+    return hashlib.sha1(content.encode(), usedforsecurity=False).hexdigest()
+
+
+def block_cache_key(child, site_id=None):
+    """
+    Key on the block's class, its name in the stream and a hash of its stored
+    value, so identical blocks share an entry across revisions and pages.
+    Changes to objects the block references are handled by invalidation.
+    """
+    digest = value_digest(child.block, child.value)
+    return f"blockcache:{_block_class(child.block)}:{child.block_type}:{site_id}:{digest}"
+
+
+def render_cached_block(child, context=None, site_id=None):
+    def render():
+        # Chosen pages, images, authors... drop this entry when they change
+        record_dependency(
+            [leaf for leaf in iter_leaf_values(child.value) if isinstance(leaf, models.Model)]
+        )
+        return child.render(context=context)
+
+    timeout = getattr(settings, "BLOCK_CACHE_TIMEOUT", 60 * 60 * 24)
+    value, hit = cached_render(block_cache_key(child, site_id), render, timeout)
+    block_cache_stats[(child.block_type, "hits" if hit else "misses")] += 1
+    return value
+
+
+class StaticRenderCache:
+    """
+    Bounded in-process LRU of rendered output for context-free blocks, keyed
+    by block class and value hash. Entries are immutable SafeStrings.
+    """
+
+    def __init__(self, maxsize):
+        self.maxsize = maxsize
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = self.misses = 0
+
+    def get_or_render(self, block, value, render):
+        key = (_block_class(block), value_digest(block, value))
+        with self.lock:
+            if key in self.entries:
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return self.entries[key]
+
+        rendered = render()
+        with self.lock:
+            self.misses += 1
+            self.entries[key] = rendered
+            if len(self.entries) > self.maxsize:
+                self.entries.popitem(last=False)
+        return rendered
+
+
+static_render_cache = StaticRenderCache(
+    getattr(settings, "STATIC_BLOCK_RENDER_CACHE_SIZE", 1024)
+)
@@ -0,0 +1,79 @@
+import json
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from blocks.search import extract_stream_text
+from blogpages.models import BlogDetail
+
+
+def sample_body(repeat):
+    body = []
+    for i in range(repeat):
+        body += [
+            {"type": "text", "value": f"Text {i}"},
+            {
+                "type": "faq",
+                "value": [
+                    {
+                        "type": "item",
+                        "value": {
+                            "question": f"Question {i}.{n}?",
+                            "answer": f"<p>Answer <b>{i}.{n}</b> with some more words.</p>",
+                        },
+                    }
+                    for n in range(5)
+                ],
+            },
+            {
+                "type": "carousel",
+                "value": [
+                    {"type": "image", "value": 1},
+                    {"type": "quotation", "value": {"text": f"Quotation {i}", "author": "Someone"}},
+                ],
+            },
+            {
+                "type": "call_to_action_1",
+                "value": {"text": f"<p>Call to action {i}</p>", "page": 1, "button_text": "Go"},
+            },
+            {"type": "image", "value": 1},
+            {"type": "author", "value": 1},
+        ]
+    return json.dumps(body)
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare extracting searchable text from a large BlogDetail body's JSON with "
+        "Wagtail's get_searchable_content(), which builds every block value."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--blocks", type=int, default=1200, help="Approximate body size in blocks.")
+        parser.add_argument("--iterations", type=int, default=20)
+
+    def handle(self, *args, **options):
+        field = BlogDetail._meta.get_field("body")
+        raw = sample_body(max(1, options["blocks"] // 6))
+        # Both start from decoded JSON, as JSON decoding costs the same either way
+        data = json.loads(raw)
+        iterations = options["iterations"]
+
+        def run(label, extract):
+            with CaptureQueriesContext(connection) as queries:
+                start = time.perf_counter()
+                for _ in range(iterations):
+                    # A fresh value each time, as when indexing a page loaded from the database
+                    extract(field.to_python(data))
+                elapsed = time.perf_counter() - start
+            self.stdout.write(
+                f"{label}: {elapsed / iterations * 1000:.2f}ms per body, "
+                f"{len(raw) * iterations / elapsed / 1e6:.1f}MB/s, "
+                f"{len(queries) // iterations} queries per body"
+            )
+
+        self.stdout.write(f"Body of {len(data)} blocks, {len(raw) / 1e3:.0f}kB of JSON")
+        run("raw JSON extraction", extract_stream_text)
+        run("get_searchable_content", lambda value: field.get_searchable_content(value))
@@ -0,0 +1,76 @@
+import time
+from unittest import mock
+
+from django.core.management.base import BaseCommand
+
+from blocks import blocks as custom_blocks
+from blocks.blocks import ContextFreeBlock
+from blocks.cache import StaticRenderCache
+from blogpages.models import BlogDetail
+
+
+def sample_value(block_type, i):
+    if block_type == "text":
+        return f"Text {i}"
+    if block_type == "faq":
+        return [
+            {
+                "type": "item",
+                "id": f"{i}-{n}",
+                "value": {
+                    "question": f"Question {i}.{n}?",
+                    "answer": f"<p>Answer <b>{i}.{n}</b> with some more words.</p>",
+                },
+            }
+            for n in range(5)
+        ]
+    return None
+
+
+class Command(BaseCommand):
+    help = (
+        "Time rendering the context-free blocks (see blocks.blocks.ContextFreeBlock) "
+        "without the static render cache, from it when warm, and through it when "
+        "every render misses."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--iterations", type=int, default=5000)
+
+    def handle(self, *args, **options):
+        iterations = options["iterations"]
+        child_blocks = BlogDetail._meta.get_field("body").stream_block.child_blocks
+        block_types = [
+            name for name, block in child_blocks.items() if isinstance(block, ContextFreeBlock)
+        ]
+
+        self.stdout.write(f"{'block':<8} {'uncached':>10} {'warm':>10} {'all misses':>11}")
+        for block_type in block_types:
+            block = child_blocks[block_type]
+            values = [
+                block.to_python(sample_value(block_type, i)) for i in range(iterations)
+            ]
+
+            def time_renders(render, values):
+                start = time.perf_counter()
+                for value in values:
+                    render(value)
+                return (time.perf_counter() - start) / len(values) * 1e6
+
+            # The block's own render(), bypassing the cache
+            uncached = time_renders(
+                lambda value: super(ContextFreeBlock, block).render(value), [values[0]] * iterations
+            )
+            with mock.patch.object(custom_blocks, "static_render_cache", StaticRenderCache(1024)):
+                block.render(values[0])
+                warm = time_renders(block.render, [values[0]] * iterations)
+            # More distinct values than the cache holds, as for a block whose
+            # value is different on every page
+            with mock.patch.object(custom_blocks, "static_render_cache", StaticRenderCache(1)):
+                misses = time_renders(block.render, values)
+
+            distinct = len({str(value) for value in values[:2]}) > 1
+            self.stdout.write(
+                f"{block_type:<8} {uncached:>8.1f}us {warm:>8.1f}us "
+                + (f"{misses:>9.1f}us" if distinct else f"{'-':>11}")
+            )
@@ -0,0 +1,74 @@
+import re
+from html import unescape
+
+from wagtail import blocks
+
+
+# Weight of the text each kind of block holds. Short CharBlock text (FAQ
+# questions, button labels) reads like a heading; chooser, static and other
+# non-text blocks contribute nothing.
+HEADING = "heading"
+TEXT = "text"
+
+BLOCK_END_RE = re.compile(r"</(?:p|h\d|li|blockquote)>|<(?:br|hr)\s*/?>", re.IGNORECASE)
+TAG_RE = re.compile(r"<[^>]*>")
+
+
+def richtext_to_text(html):
+    # Like wagtail.rich_text.get_text_for_indexing, but with a regex instead
+    # of an HTML parser: stored rich text is well-formed, and this is several
+    # times faster on large bodies
+    return unescape(TAG_RE.sub("", BLOCK_END_RE.sub(" ", html))).strip()
+
+
+def _iter_raw_list(raw):
+    for item in raw or ():
+        # ListBlock items are {"type": "item", "value": ..., "id": ...}, or
+        # bare values in data saved before Wagtail 2.16
+        if isinstance(item, dict) and item.get("type") == "item" and "value" in item:
+            yield item["value"]
+        else:
+            yield item
+
+
+def iter_block_text(block, raw):
+    """
+    Yield (weight, text) for the text in `raw`, the stored JSON of a value
+    of `block`. Works on the JSON directly, so no block values are built
+    and chooser blocks don't query for the objects they point to.
+    """
+    if raw in (None, ""):
+        return
+
+    if isinstance(block, blocks.StreamBlock):
+        for child in raw:
+            child_block = block.child_blocks.get(child.get("type"))
+            if child_block is not None:
+                yield from iter_block_text(child_block, child.get("value"))
+    elif isinstance(block, blocks.StructBlock):
+        for name, child_block in block.child_blocks.items():
+            yield from iter_block_text(child_block, raw.get(name))
+    elif isinstance(block, blocks.ListBlock):
+        for item in _iter_raw_list(raw):
+            yield from iter_block_text(block.child_block, item)
+    elif isinstance(block, blocks.RichTextBlock):
+        yield TEXT, richtext_to_text(raw)
+    elif isinstance(block, blocks.CharBlock):
+        yield HEADING, raw
+    elif isinstance(block, blocks.TextBlock):
+        yield TEXT, raw
+
+
+def extract_stream_text(stream_value):
+    """
+    The text of a StreamField value as {weight: "joined text"}, read from its
+    raw JSON.
+    """
+    text = {HEADING: [], TEXT: []}
+    stream_block = stream_value.stream_block
+    for child in stream_value.raw_data:
+        child_block = stream_block.child_blocks.get(child.get("type"))
+        if child_block is not None:
+            for weight, value in iter_block_text(child_block, child.get("value")):
+                text[weight].append(value)
+    return {weight: " ".join(values) for weight, values in text.items()}
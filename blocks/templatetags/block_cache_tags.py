@@ -0,0 +1,23 @@
+from django import template
+
+from wagtail.models import Site
+
+from blocks.cache import render_cached_block
+
+register = template.Library()
+
+
+@register.simple_tag(takes_context=True)
+def include_cached_block(context, child):
+    """
+    `{% include_block %}` for one child of a StreamField, served from the
+    per-block cache (see blocks.cache).
+    """
+    request = context.get("request")
+    if request is None or getattr(request, "is_preview", False):
+        return child.render(context=context.flatten())
+
+    site = Site.find_for_request(request)
+    return render_cached_block(
+        child, context=context.flatten(), site_id=site.pk if site else None
+    )
@@ -0,0 +1,20 @@
+from wagtail.blocks import StreamValue, StructValue
+from wagtail.blocks.list_block import ListValue
+
+
+def iter_leaf_values(value):
+    """
+    Walk a (possibly nested) block value, yielding the non-container values
+    inside it: strings, rich text, chosen pages/images/snippets and so on.
+    """
+    if isinstance(value, StreamValue):
+        for child in value:
+            yield from iter_leaf_values(child.value)
+    elif isinstance(value, StructValue):
+        for child in value.values():
+            yield from iter_leaf_values(child)
+    elif isinstance(value, (ListValue, list, tuple)):
+        for child in value:
+            yield from iter_leaf_values(child)
+    else:
+        yield value
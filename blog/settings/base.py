@@ -30,9 +30,14 @@ INSTALLED_APPS = [
     "documents",
     "blogpages",
     "blocks",
+    "caching",
+    "static_site",
+    "api",
 
     "wagtail.contrib.forms",
     "wagtail.contrib.redirects",
+    "wagtail.contrib.routable_page",
+    "wagtail.contrib.search_promotions",
     "wagtail.embeds",
     "wagtail.sites",
     "wagtail.users",
@@ -50,9 +55,12 @@ INSTALLED_APPS = [
     "django.contrib.sessions",
     "django.contrib.messages",
     "django.contrib.staticfiles",
+    # After wagtail.images and wagtail.documents: replaces their file cleanup
+    "filestore",
 ]
 
 MIDDLEWARE = [
+    "caching.middleware.FullPageCacheMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
@@ -93,6 +101,22 @@ DATABASES = {
     "default": {
         "ENGINE": "django.db.backends.sqlite3",
         "NAME": os.path.join(BASE_DIR, "db.sqlite3"),
+        "OPTIONS": {
+            # Run on every new connection. WAL lets readers carry on while a
+            # page is published, and with synchronous=NORMAL a commit doesn't
+            # wait for an fsync. Writers queue for up to busy_timeout ms
+            # rather than failing with "database is locked".
+            "init_command": (
+                "PRAGMA busy_timeout=20000;"
+                "PRAGMA journal_mode=WAL;"
+                "PRAGMA synchronous=NORMAL;"
+                "PRAGMA mmap_size=268435456;"
+            ),
+            # Take the write lock when a transaction starts: a read
+            # transaction that later writes can't wait for the lock, so it
+            # fails straight away if another process wrote in between
+            "transaction_mode": "IMMEDIATE",
+        },
     }
 }
 
@@ -171,9 +195,45 @@ WAGTAIL_SITE_NAME = "blog"
 WAGTAILSEARCH_BACKENDS = {
     "default": {
         "BACKEND": "wagtail.search.backends.database",
+        # Indexing goes through search.index_queue instead
+        "AUTO_UPDATE": False,
     }
 }
 
+# Which backend the site search uses: "default", or "inverted" for the
+# in-process BM25 index (see search.inverted_index), which the search index
+# queue keeps up to date alongside the default one. Build it with
+# `manage.py update_index --backend inverted`.
+SITE_SEARCH_BACKEND = os.environ.get("SITE_SEARCH_BACKEND", "default")
+
+if SITE_SEARCH_BACKEND == "inverted":
+    WAGTAILSEARCH_BACKENDS["inverted"] = {
+        "BACKEND": "search.inverted_index",
+        "PATH": os.path.join(BASE_DIR, ".cache", "search-index.jsonl"),
+        "AUTO_UPDATE": False,
+    }
+
+# Index queued changes from a background thread in each web process. Set to
+# False when running `manage.py process_search_index_queue --loop` instead.
+SEARCH_INDEX_QUEUE_THREAD = True
+
+# Flushes that try to index an object before it's left in the queue as failed
+SEARCH_INDEX_QUEUE_MAX_ATTEMPTS = 5
+
+# Seconds between writes of the search analytics each process collects in
+# memory (see search.analytics)
+SEARCH_ANALYTICS_FLUSH_INTERVAL = 30
+
+# Anonymous GETs of HTML pages are served from a cache of rendered responses
+# for FULL_PAGE_CACHE_TIMEOUT seconds, or until something they show is
+# published (see caching.middleware). Only URLs with no query string, or
+# with just the parameters listed here, are cached. Paths under the excluded
+# prefixes never are: they aren't worth it, are never anonymous or (search)
+# must run to be counted in the analytics, its results being cached anyway.
+FULL_PAGE_CACHE_TIMEOUT = 600
+FULL_PAGE_CACHE_QUERY_PARAMS = ["after"]
+FULL_PAGE_CACHE_EXCLUDED_PATHS = ["/admin/", "/django-admin/", "/documents/", "/search/"]
+
 # Base URL to use when referring to full URLs within the Wagtail admin backend -
 # e.g. in notification emails. Don't include '/admin' or a trailing slash
 WAGTAILADMIN_BASE_URL = "http://example.com"
@@ -189,8 +249,50 @@ WAGTAILIMAGES_IMAGE_MODEL = "images.CustomImage"
 
 WAGTAILIMAGES_EXTENSIONS = ["jpg", "jpeg", "png", "gif", "webp", "svg"]
 
+# Named sets of image sizes, rendered by `{% rendition_set image "name" %}` as
+# a <picture> with a srcset per format: AVIF and WebP sources with a JPEG
+# fallback (see images.rendition_sets). "sizes" is the <img> sizes attribute.
+IMAGE_RENDITION_SETS = {
+    "block": {
+        "spec": "fill-{320x160,400x200,800x400}",
+        "sizes": "(max-width: 400px) 100vw, 400px",
+    },
+    "gallery": {
+        "spec": "fill-{150x150,300x300}-c100",
+        "sizes": "150px",
+    },
+}
+IMAGE_RENDITION_FORMATS = ["avif", "webp", "jpeg"]
+
+# Forms that don't delete a replaced file other uploads still share (see filestore)
+WAGTAILIMAGES_IMAGE_FORM_BASE = "images.forms.ImageForm"
+WAGTAILDOCS_DOCUMENT_FORM_BASE = "documents.forms.DocumentForm"
+
+# Where to keep a static export of the site up to date on publish (see static_site).
+# Unset to disable; `manage.py export_static_site` does a full export.
+STATIC_SITE_EXPORT_DIR = os.environ.get("STATIC_SITE_EXPORT_DIR")
+
+# Worker processes that pre-generate renditions after an upload (see images.renditions).
+# Set to 0 to generate them inline instead.
+IMAGE_RENDITION_WORKERS = 2
+
 WAGTAILDOCS_DOCUMENT_MODEL = "documents.CustomDocument"
 
+# How documents.views.serve sends document files: None to send them itself
+# with sendfile(), or "x-accel-redirect" (nginx) / "x-sendfile" (Apache,
+# lighttpd) to hand them to the web server. For X-Accel-Redirect,
+# DOCUMENTS_OFFLOAD_PREFIX is an internal nginx location aliased to MEDIA_ROOT.
+DOCUMENTS_SERVE_OFFLOAD = os.environ.get("DOCUMENTS_SERVE_OFFLOAD") or None
+DOCUMENTS_OFFLOAD_PREFIX = "/protected-media/"
+
+# Worker processes that extract uploaded documents' text for search (see
+# documents.extraction); 0 extracts inline instead. At most
+# DOCUMENT_TEXT_MAX_LENGTH characters are kept per document, and the first
+# DOCUMENT_SEARCH_TEXT_LENGTH of them are indexed.
+DOCUMENT_TEXT_WORKERS = 2
+DOCUMENT_TEXT_MAX_LENGTH = 1_000_000
+DOCUMENT_SEARCH_TEXT_LENGTH = 100_000
+
 # WAGTAILDOCS_EXTENSIONS = ["pdf", "doc", "docx", "xls", "xlsx", "ppt", "pptx", "odt", "txt"]
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
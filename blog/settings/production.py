@@ -1,7 +1,67 @@
 from .base import *
+import importlib.util
+import os
+
+from django.core.exceptions import ImproperlyConfigured
 
 DEBUG = False
 
+# PostgreSQL when DATABASE_NAME is set (needs psycopg), otherwise the SQLite
+# database from base.py
+if os.environ.get("DATABASE_NAME"):
+    DATABASES = {
+        "default": {
+            "ENGINE": "django.db.backends.postgresql",
+            "NAME": os.environ["DATABASE_NAME"],
+            "USER": os.environ.get("DATABASE_USER", ""),
+            "PASSWORD": os.environ.get("DATABASE_PASSWORD", ""),
+            "HOST": os.environ.get("DATABASE_HOST", ""),
+            "PORT": os.environ.get("DATABASE_PORT", ""),
+            "CONN_HEALTH_CHECKS": True,
+            "OPTIONS": {},
+        }
+    }
+
+    if importlib.util.find_spec("psycopg") is None:
+        raise ImproperlyConfigured("DATABASE_NAME is set but psycopg isn't installed (see requirements.txt).")
+
+    if os.environ.get("DATABASE_POOL_MAX_SIZE"):
+        # A psycopg connection pool per process (needs psycopg[pool]). Can't
+        # be combined with persistent connections.
+        if importlib.util.find_spec("psycopg_pool") is None:
+            raise ImproperlyConfigured(
+                "DATABASE_POOL_MAX_SIZE is set but psycopg_pool isn't installed (see requirements.txt)."
+            )
+        DATABASES["default"]["OPTIONS"]["pool"] = {
+            "min_size": int(os.environ.get("DATABASE_POOL_MIN_SIZE", 2)),
+            "max_size": int(os.environ["DATABASE_POOL_MAX_SIZE"]),
+            "timeout": int(os.environ.get("DATABASE_POOL_TIMEOUT", 10)),
+        }
+    else:
+        # Keep each worker's connection open between requests
+        DATABASES["default"]["CONN_MAX_AGE"] = int(
+            os.environ.get("DATABASE_CONN_MAX_AGE", 600)
+        )
+
+# One cache shared by every worker process, so publishing invalidates
+# cached pages, fragments and search results for all of them rather than
+# only in the process that handled the publish. Redis when REDIS_URL is set,
+# otherwise a database table (created by `manage.py createcachetable`).
+if os.environ.get("REDIS_URL"):
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": os.environ["REDIS_URL"],
+        }
+    }
+else:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.db.DatabaseCache",
+            "LOCATION": "cache_table",
+        }
+    }
+
 try:
     from .local import *
 except ImportError:
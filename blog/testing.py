@@ -0,0 +1,42 @@
+import shutil
+import tempfile
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.images import ImageFile
+from django.test import override_settings
+from PIL import Image as PILImage
+
+from wagtail.images import get_image_model
+
+
+class PageTestMixin:
+    """
+    For TestCases that request pages: uploads go to a temporary MEDIA_ROOT,
+    and caching uses a private in-memory cache.
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        media_root = tempfile.mkdtemp()
+        cls.addClassCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        overrides = override_settings(
+            MEDIA_ROOT=media_root,
+            CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}},
+            # No collectstatic manifest in tests
+            STORAGES={
+                **settings.STORAGES,
+                "staticfiles": {"BACKEND": "django.contrib.staticfiles.storage.StaticFilesStorage"},
+            },
+        )
+        overrides.enable()
+        cls.addClassCleanup(overrides.disable)
+        super().setUpClass()
+
+
+def make_image(title, filename, color=(0, 80, 160)):
+    # Uploads with identical content share one file, so vary `color` for
+    # images that need files of their own
+    f = BytesIO()
+    PILImage.new("RGB", (640, 480), color).save(f, "JPEG")
+    return get_image_model().objects.create(title=title, file=ImageFile(f, name=filename))
@@ -7,12 +7,18 @@ from wagtail import urls as wagtail_urls
 from wagtail.documents import urls as wagtaildocs_urls
 
 from search import views as search_views
+from blogpages import views as blogpages_views
 
 urlpatterns = [
     path("django-admin/", admin.site.urls),
     path("admin/", include(wagtailadmin_urls)),
+    path("documents/", include("documents.urls")),
     path("documents/", include(wagtaildocs_urls)),
+    path("api/v1/", include("api.urls")),
     path("search/", search_views.search, name="search"),
+    path("search/autocomplete/", search_views.autocomplete, name="search_autocomplete"),
+    path("sitemap.xml", blogpages_views.sitemap, name="sitemap"),
+    path("sitemap-<int:section>.xml", blogpages_views.sitemap, name="sitemap_section"),
 ]
 
 
@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class BlogpagesConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'blogpages'
+
+    def ready(self):
+        from blogpages import signals  # noqa: F401
@@ -0,0 +1,284 @@
+"""
+Bulk loading of legacy posts as live BlogDetail pages under a BlogIndex.
+
+Instead of an add_child() and publish per post, each batch is a fixed
+handful of bulk queries: treebeard paths are allocated in sequence after
+the index's last child, and the page, post, tag and revision rows are
+inserted in bulk. No signals fire, so the search index, reference index,
+tag index and caches are brought up to date once at the end (see
+BlogImporter.finish).
+"""
+
+import csv
+import json
+from itertools import islice
+
+from django.contrib.contenttypes.models import ContentType
+from django.db import connection, transaction
+from django.db.models import F
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from django.utils.text import slugify
+
+from modelcluster.models import get_serializable_data_for_fields
+from taggit.models import Tag
+from wagtail.models import Page, ReferenceIndex, Revision
+from wagtail.search.backends import get_search_backends
+
+from blogpages.models import Author, BlogDetail, BlogPageTag, PublishedPostTag
+from blogpages.syndication import sitemap_section, sitemap_section_tag
+from blogpages.tag_index import update_tag_counts
+from caching.dependencies import invalidate
+from search.autocomplete import autocomplete_index
+
+
+def read_rows(stream, format):
+    """
+    Yield posts as dicts from JSON lines or CSV (with a header row).
+    """
+    if format == "csv":
+        yield from csv.DictReader(stream)
+    else:
+        for line in stream:
+            if line.strip():
+                yield json.loads(line)
+
+
+def batches(iterable, size):
+    iterator = iter(iterable)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+
+def _split_tags(value):
+    if isinstance(value, str):
+        value = value.split(",")
+    return [name.strip() for name in value or () if name.strip()]
+
+
+def _parse_body(value):
+    # A StreamField's stored JSON, inline in JSON lines or as a string in CSV
+    if isinstance(value, str):
+        return json.loads(value) if value.strip() else []
+    return value or []
+
+
+def _parse_published_at(value):
+    if not value:
+        return timezone.now()
+    published_at = parse_datetime(value) if isinstance(value, str) else value
+    if published_at is None:
+        raise ValueError(f"Invalid first_published_at: {value!r}")
+    if timezone.is_naive(published_at):
+        published_at = timezone.make_aware(published_at)
+    return published_at
+
+
+class BlogImporter:
+    def __init__(self, blog_index):
+        self.blog_index = blog_index
+        self.content_type = ContentType.objects.get_for_model(BlogDetail)
+        self.base_content_type = ContentType.objects.get_for_model(Page)
+
+        self.slugs = set(blog_index.get_children().values_list("slug", flat=True))
+        last_child = blog_index.get_last_child()
+        self.next_step = (
+            Page._str2int(last_child.path[-Page.steplen :]) + 1 if last_child else 1
+        )
+
+        self.author_ids = {}
+        self.tag_ids = {}
+        self.imported_ids = []
+        self.new_author_ids = []
+
+    def _unique_slug(self, slug):
+        candidate, suffix = slug, 1
+        while candidate in self.slugs:
+            suffix += 1
+            candidate = f"{slug}-{suffix}"
+        self.slugs.add(candidate)
+        return candidate
+
+    def _next_path(self):
+        path = Page._get_path(self.blog_index.path, self.blog_index.depth + 1, self.next_step)
+        self.next_step += 1
+        return path
+
+    def _resolve_authors(self, names):
+        missing = set(names) - set(self.author_ids)
+        if not missing:
+            return
+        self.author_ids.update(
+            Author.objects.filter(name__in=missing).values_list("name", "pk")
+        )
+        created = Author.objects.bulk_create(
+            [Author(name=name, bio="") for name in missing - set(self.author_ids)]
+        )
+        self.author_ids.update((author.name, author.pk) for author in created)
+        self.new_author_ids += [author.pk for author in created]
+
+    def _resolve_tags(self, names):
+        missing = set(names) - set(self.tag_ids)
+        if not missing:
+            return
+        Tag.objects.bulk_create(
+            [Tag(name=name, slug=slugify(name)) for name in missing], ignore_conflicts=True
+        )
+        self.tag_ids.update(Tag.objects.filter(name__in=missing).values_list("name", "pk"))
+        # Names whose slug was already taken by another tag; taggit picks a free one
+        for name in missing - set(self.tag_ids):
+            self.tag_ids[name] = Tag.objects.create(name=name).pk
+
+    def _build_post(self, row):
+        title = (row.get("title") or "").strip()
+        if not title:
+            raise ValueError("Every post needs a title")
+
+        slug = self._unique_slug(slugify(row.get("slug") or title) or "post")
+        published_at = _parse_published_at(row.get("first_published_at"))
+        author = (row.get("author") or "").strip()
+
+        return BlogDetail(
+            title=title,
+            draft_title=title,
+            slug=slug,
+            path=self._next_path(),
+            depth=self.blog_index.depth + 1,
+            numchild=0,
+            url_path=f"{self.blog_index.url_path}{slug}/",
+            locale_id=self.blog_index.locale_id,
+            live=True,
+            has_unpublished_changes=False,
+            first_published_at=published_at,
+            last_published_at=published_at,
+            latest_revision_created_at=published_at,
+            subtitle=row.get("subtitle") or "",
+            body=_parse_body(row.get("body")),
+            author_id=self.author_ids[author] if author else None,
+        )
+
+    def _insert_posts(self, posts):
+        # bulk_create() doesn't support multi-table inheritance, so the
+        # Page rows go in first and the BlogDetail rows refer to them
+        page_fields = [field for field in Page._meta.concrete_fields if not field.primary_key]
+        pages = Page.objects.bulk_create(
+            [
+                Page(**{field.attname: getattr(post, field.attname) for field in page_fields})
+                for post in posts
+            ]
+        )
+        for post, page in zip(posts, pages):
+            post.id = post.page_ptr_id = page.pk
+
+        fields = BlogDetail._meta.local_concrete_fields
+        quote = connection.ops.quote_name
+        with connection.cursor() as cursor:
+            cursor.executemany(
+                "INSERT INTO %s (%s) VALUES (%s)"
+                % (
+                    quote(BlogDetail._meta.db_table),
+                    ", ".join(quote(field.column) for field in fields),
+                    ", ".join(["%s"] * len(fields)),
+                ),
+                [
+                    [
+                        field.get_db_prep_save(field.pre_save(post, True), connection)
+                        for field in fields
+                    ]
+                    for post in posts
+                ],
+            )
+
+    def _revision(self, post, tagged_items):
+        content = get_serializable_data_for_fields(post)
+        content["tagged_items"] = [
+            {"pk": item.pk, "content_object": post.pk, "tag": item.tag_id}
+            for item in tagged_items
+        ]
+        return Revision(
+            content_type=self.content_type,
+            base_content_type=self.base_content_type,
+            object_id=str(post.pk),
+            created_at=post.first_published_at,
+            object_str=post.title,
+            content=content,
+        )
+
+    def import_batch(self, rows):
+        tag_names = [_split_tags(row.get("tags")) for row in rows]
+
+        with transaction.atomic():
+            self._resolve_authors(
+                {row["author"].strip() for row in rows if (row.get("author") or "").strip()}
+            )
+            self._resolve_tags({name for names in tag_names for name in names})
+
+            posts = [self._build_post(row) for row in rows]
+            self._insert_posts(posts)
+
+            tagged_items = BlogPageTag.objects.bulk_create(
+                [
+                    BlogPageTag(content_object_id=post.pk, tag_id=self.tag_ids[name])
+                    for post, names in zip(posts, tag_names)
+                    for name in dict.fromkeys(names)
+                ]
+            )
+            items_by_post = {}
+            for item in tagged_items:
+                items_by_post.setdefault(item.content_object_id, []).append(item)
+
+            PublishedPostTag.objects.bulk_create(
+                [
+                    PublishedPostTag(
+                        tag_id=item.tag_id,
+                        post_id=post.pk,
+                        first_published_at=post.first_published_at,
+                        path=post.path,
+                    )
+                    for post in posts
+                    for item in items_by_post.get(post.pk, ())
+                ]
+            )
+
+            revisions = Revision.objects.bulk_create(
+                [self._revision(post, items_by_post.get(post.pk, ())) for post in posts]
+            )
+            Page.objects.bulk_update(
+                [
+                    Page(id=post.pk, live_revision_id=revision.pk, latest_revision_id=revision.pk)
+                    for post, revision in zip(posts, revisions)
+                ],
+                ["live_revision", "latest_revision"],
+            )
+
+            Page.objects.filter(pk=self.blog_index.pk).update(
+                numchild=F("numchild") + len(posts)
+            )
+
+        self.imported_ids += [post.pk for post in posts]
+        return len(posts)
+
+    def finish(self, index_batch_size=1000, update_search_index=True):
+        """
+        Everything the page_published and post_save signals would have done
+        for each post, done once for the whole import.
+        """
+        update_tag_counts(set(self.tag_ids.values()))
+
+        for ids in batches(self.imported_ids, index_batch_size):
+            posts = list(BlogDetail.objects.filter(pk__in=ids))
+            for post in posts:
+                ReferenceIndex.create_or_update_for_object(post)
+
+            if update_search_index:
+                for backend in get_search_backends():
+                    backend.add_bulk(BlogDetail, posts)
+
+        if update_search_index and self.new_author_ids:
+            authors = list(Author.objects.filter(pk__in=self.new_author_ids))
+            for backend in get_search_backends():
+                backend.add_bulk(Author, authors)
+
+        sitemap_sections = {sitemap_section_tag(sitemap_section(pk)) for pk in self.imported_ids}
+        invalidate(self.blog_index, BlogDetail, Page, sitemap_sections)
+        autocomplete_index.reset()
@@ -0,0 +1,83 @@
+import base64
+import binascii
+from collections import namedtuple
+from datetime import datetime
+
+from django.db.models import Q
+
+
+BlogListingItem = namedtuple("BlogListingItem", ["id", "title", "url"])
+
+
+def _load_blog_listing(request):
+    from blogpages.models import BlogDetail
+
+    posts = BlogDetail.objects.live().public().only("title", "url_path")
+    return [
+        BlogListingItem(post.id, post.title, post.get_url(request))
+        for post in posts
+    ]
+
+
+def get_blog_listing(request=None):
+    """
+    Live, public blog posts as (id, title, url) items.
+
+    Loaded with one query per request and shared by every block that needs it,
+    so the cost doesn't grow with the number of blocks on the page.
+    """
+    if request is None:
+        return _load_blog_listing(request)
+
+    listing = getattr(request, "_blog_listing", None)
+    if listing is None:
+        listing = request._blog_listing = _load_blog_listing(request)
+    return listing
+
+
+def encode_cursor(post):
+    raw = f"{post.first_published_at.isoformat()}|{post.path}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor):
+    """
+    Returns (first_published_at, path), or None if the cursor is malformed.
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        published_at, path = raw.split("|", 1)
+        return datetime.fromisoformat(published_at), path
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        return None
+
+
+def paginate_by_cursor(queryset, cursor=None, per_page=10):
+    """
+    Keyset pagination, newest first, ordered by (first_published_at, path).
+
+    Each page is a single indexed range query however deep into the listing
+    it is, unlike OFFSET pagination. Returns (posts, next_cursor). Raises
+    ValueError if `cursor` is malformed.
+    """
+    queryset = queryset.filter(first_published_at__isnull=False).order_by(
+        "-first_published_at", "-path"
+    )
+
+    if cursor:
+        position = decode_cursor(cursor)
+        if position is None:
+            raise ValueError("Invalid cursor")
+        published_at, path = position
+        # The redundant range on the leading column lets the database walk
+        # the first_published_at index from the cursor instead of sorting
+        # every older post
+        queryset = queryset.filter(
+            Q(first_published_at__lt=published_at)
+            | Q(first_published_at=published_at, path__lt=path),
+            first_published_at__lte=published_at,
+        )
+
+    posts = list(queryset[: per_page + 1])
+    next_cursor = encode_cursor(posts[per_page - 1]) if len(posts) > per_page else None
+    return posts[:per_page], next_cursor
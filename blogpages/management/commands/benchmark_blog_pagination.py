@@ -0,0 +1,79 @@
+import statistics
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.core.paginator import Paginator
+from django.db import transaction
+from django.utils import timezone
+
+from blogpages.importer import BlogImporter, batches
+from blogpages.listings import encode_cursor, paginate_by_cursor
+from blogpages.models import BlogDetail, BlogIndex
+
+
+class Command(BaseCommand):
+    help = (
+        "Time fetching the first, middle and last page of the blog listing "
+        "with cursor (keyset) pagination against OFFSET pagination, after "
+        "growing the blog to each of the given numbers of posts. Rolls back "
+        "the posts it adds."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("sizes", nargs="*", type=int, default=[10000, 100000])
+        parser.add_argument("--repeat", type=int, default=20)
+
+    def handle(self, *args, **options):
+        blog_index = BlogIndex.objects.first()
+        if blog_index is None:
+            raise CommandError("No BlogIndex to add posts to.")
+
+        per_page = blog_index.posts_per_page
+        posts = BlogDetail.objects.live().public().defer("body")
+        self.stdout.write(
+            f"{'posts':>7} {'page':>7} {'cursor p50':>11} {'offset p50':>11}"
+        )
+        with transaction.atomic():
+            importer = BlogImporter(blog_index)
+            start = timezone.now()
+            added = 0
+            for size in sorted(options["sizes"]):
+                missing = size - posts.count()
+                rows = (
+                    {
+                        "title": f"Benchmark post {added + i}",
+                        "first_published_at": start - timedelta(minutes=added + i),
+                    }
+                    for i in range(max(missing, 0))
+                )
+                for batch in batches(rows, 1000):
+                    added += importer.import_batch(batch)
+
+                total = posts.count()
+                ordered = posts.filter(first_published_at__isnull=False).order_by(
+                    "-first_published_at", "-path"
+                )
+                last_page = max(1, -(-total // per_page))
+                for page in sorted({1, (last_page + 1) // 2, last_page}):
+                    offset = (page - 1) * per_page
+                    cursor = encode_cursor(ordered[offset - 1]) if offset else None
+                    cursor_timing = self.time(
+                        lambda: paginate_by_cursor(posts, cursor, per_page), options["repeat"]
+                    )
+                    offset_timing = self.time(
+                        lambda: list(Paginator(ordered, per_page).page(page)), options["repeat"]
+                    )
+                    self.stdout.write(
+                        f"{total:>7} {page:>7} {cursor_timing:>9.2f}ms {offset_timing:>9.2f}ms"
+                    )
+
+            transaction.set_rollback(True)
+
+    def time(self, fetch, repeat):
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            fetch()
+            timings.append((time.perf_counter() - start) * 1000)
+        return statistics.median(timings)
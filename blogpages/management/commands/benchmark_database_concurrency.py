@@ -0,0 +1,128 @@
+import multiprocessing
+import random
+import statistics
+import time
+
+from django.contrib.auth.models import AnonymousUser
+from django.core.management.base import BaseCommand, CommandError
+from django.db import OperationalError, connection, connections
+from django.test import RequestFactory
+
+from wagtail.models import Page
+
+from blogpages.models import BlogDetail, BlogIndex
+
+
+def _percentile(timings, fraction):
+    return timings[max(int(len(timings) * fraction) - 1, 0)] if timings else 0.0
+
+
+def _worker(seed, duration, publish_ratio, page_ids, post_ids, results):
+    # Runs in a forked process, like a gunicorn worker, with its own connection
+    rng = random.Random(seed)
+    reads, publishes, errors = [], [], 0
+    factory = None
+
+    deadline = time.monotonic() + duration
+    while time.monotonic() < deadline:
+        publish = rng.random() < publish_ratio
+        start = time.perf_counter()
+        try:
+            if publish:
+                post = BlogDetail.objects.get(pk=rng.choice(post_ids))
+                post.save_revision().publish()
+            else:
+                page = Page.objects.get(pk=rng.choice(page_ids)).specific
+                if factory is None:
+                    site = page.get_site()
+                    factory = RequestFactory(SERVER_NAME=site.hostname, SERVER_PORT=str(site.port))
+                request = factory.get(page.url)
+                request.user = AnonymousUser()
+                page.serve(request).render()
+        except OperationalError:
+            errors += 1
+            continue
+        (publishes if publish else reads).append((time.perf_counter() - start) * 1000)
+
+    connection.close()
+    results.put((reads, publishes, errors))
+
+
+class Command(BaseCommand):
+    help = (
+        "Time a mixed load of page renders and publishes from several processes "
+        "at once against the current database. Publishes new revisions of "
+        "existing posts, so run it against a copy."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--workers", default="1,2,4,8", help="Comma-separated worker process counts to run."
+        )
+        parser.add_argument("--duration", type=float, default=10, help="Seconds per run.")
+        parser.add_argument(
+            "--publish-ratio", type=float, default=0.1, help="Share of requests that publish."
+        )
+        parser.add_argument("--posts", type=int, default=100, help="Number of posts to use.")
+
+    def handle(self, *args, **options):
+        try:
+            worker_counts = [int(count) for count in options["workers"].split(",")]
+        except ValueError:
+            raise CommandError("--workers must be comma-separated numbers.")
+
+        post_ids = list(
+            BlogDetail.objects.live().order_by("-first_published_at").values_list("pk", flat=True)[
+                : options["posts"]
+            ]
+        )
+        if not post_ids:
+            raise CommandError("No live posts.")
+        page_ids = post_ids + list(BlogIndex.objects.live().values_list("pk", flat=True))
+
+        self.stdout.write(
+            f"{connection.vendor}, {options['duration']:g}s per run, "
+            f"{options['publish_ratio']:.0%} publishes"
+        )
+        self.stdout.write(
+            f"{'workers':>7} {'req/s':>8} {'read p50':>9} {'read p95':>9} "
+            f"{'pub p50':>9} {'pub p95':>9} {'errors':>7}"
+        )
+
+        context = multiprocessing.get_context("fork")
+        for count in worker_counts:
+            # Forked processes mustn't share the parent's connection
+            connections.close_all()
+            results = context.Queue()
+            processes = [
+                context.Process(
+                    target=_worker,
+                    args=(
+                        seed,
+                        options["duration"],
+                        options["publish_ratio"],
+                        page_ids,
+                        post_ids,
+                        results,
+                    ),
+                )
+                for seed in range(count)
+            ]
+            for process in processes:
+                process.start()
+            # Collect before joining, or a full queue blocks the workers' exit
+            outcomes = [results.get() for _ in processes]
+            for process in processes:
+                process.join()
+
+            reads = sorted(timing for outcome in outcomes for timing in outcome[0])
+            publishes = sorted(timing for outcome in outcomes for timing in outcome[1])
+            errors = sum(outcome[2] for outcome in outcomes)
+            self.stdout.write(
+                f"{count:>7} {(len(reads) + len(publishes)) / options['duration']:>8.1f} "
+                f"{statistics.median(reads) if reads else 0:>7.1f}ms "
+                f"{_percentile(reads, 0.95):>7.1f}ms "
+                f"{statistics.median(publishes) if publishes else 0:>7.1f}ms "
+                f"{_percentile(publishes, 0.95):>7.1f}ms "
+                f"{errors:>7}"
+            )
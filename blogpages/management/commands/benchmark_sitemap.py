@@ -0,0 +1,101 @@
+import random
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test import RequestFactory, override_settings
+from django.test.utils import CaptureQueriesContext
+
+from wagtail.models import Site
+
+from blogpages import syndication, views
+from blogpages.models import BlogDetail
+from caching.dependencies import invalidate
+
+
+def _percentile(timings, fraction):
+    return timings[max(int(len(timings) * fraction) - 1, 0)] if timings else 0.0
+
+
+class Command(BaseCommand):
+    help = (
+        "Request the sitemap index and sections while publishing posts in "
+        "between, and compare regenerating only the published post's section "
+        "against regenerating every section. Uses a private in-memory cache, "
+        "and rolls back the publishes."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--requests", type=int, default=1000)
+        parser.add_argument(
+            "--publish-every", type=int, default=20, help="Publish a random post after this many requests."
+        )
+        parser.add_argument(
+            "--section-size",
+            type=int,
+            help="URLs per section instead of 50,000, to get several sections from a small database.",
+        )
+        parser.add_argument("--seed", type=int, default=0)
+
+    def handle(self, *args, **options):
+        site = Site.objects.filter(is_default_site=True).first()
+        post_ids = list(BlogDetail.objects.live().values_list("pk", flat=True))
+        if site is None or not post_ids:
+            raise CommandError("No default site or live posts.")
+
+        max_urls = syndication.SITEMAP_MAX_URLS
+        if options["section_size"]:
+            syndication.SITEMAP_MAX_URLS = options["section_size"]
+        try:
+            self.stdout.write(
+                f"{len(post_ids)} live posts, {syndication.SITEMAP_MAX_URLS} URLs per section, "
+                f"{options['requests']} requests, a publish every {options['publish_every']}"
+            )
+            self.stdout.write(
+                f"{'strategy':<10} {'hit rate':>8} {'p50':>8} {'p95':>8} {'queries':>8}"
+            )
+            for strategy in ("section", "all"):
+                hits, timings, queries = self.run(strategy, site, post_ids, options)
+                timings.sort()
+                self.stdout.write(
+                    f"{strategy:<10} {hits / len(timings):>8.0%} "
+                    f"{_percentile(timings, 0.5):>6.1f}ms {_percentile(timings, 0.95):>6.1f}ms "
+                    f"{queries / len(timings):>8.2f}"
+                )
+        finally:
+            syndication.SITEMAP_MAX_URLS = max_urls
+
+    def run(self, strategy, site, post_ids, options):
+        rng = random.Random(options["seed"])
+        factory = RequestFactory(SERVER_NAME=site.hostname, SERVER_PORT=str(site.port))
+        hits, timings, query_count = 0, [], 0
+        cache_settings = {
+            "default": {
+                "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+                "LOCATION": f"benchmark-{strategy}",
+            }
+        }
+        with override_settings(CACHES=cache_settings), transaction.atomic():
+            # Republishing existing posts doesn't change the number of sections
+            sections = [None, *range(1, syndication.sitemap_section_count(site) + 1)]
+            for i in range(options["requests"]):
+                if i and i % options["publish_every"] == 0:
+                    BlogDetail.objects.get(pk=rng.choice(post_ids)).save_revision().publish()
+                    if strategy == "all":
+                        # As when every section depended on every page
+                        invalidate([syndication.sitemap_section_tag(n) for n in sections[1:]])
+
+                request = factory.get("/sitemap.xml")
+                # The publishes would otherwise fill the capped query log
+                connection.queries_log.clear()
+                with CaptureQueriesContext(connection) as queries:
+                    start = time.perf_counter()
+                    response = views.sitemap(request, rng.choice(sections))
+                    b"".join(response.streaming_content)
+                    timings.append((time.perf_counter() - start) * 1000)
+                query_count += len(queries)
+                # Only the site lookup, nothing regenerated
+                hits += not any('FROM "wagtailcore_page"' in query["sql"] for query in queries)
+
+            transaction.set_rollback(True)
+        return hits, timings, query_count
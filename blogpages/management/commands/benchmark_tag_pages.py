@@ -0,0 +1,51 @@
+import statistics
+import time
+
+from django.contrib.auth.models import AnonymousUser
+from django.core.management.base import BaseCommand, CommandError
+from django.test import RequestFactory
+
+from blogpages.models import BlogIndex, TagPostCount
+
+
+class Command(BaseCommand):
+    help = "Time rendering the tag archive pages of the most used tags against the current database."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--tags", type=int, default=100, help="Number of tags to render.")
+        parser.add_argument("--repeat", type=int, default=5)
+
+    def handle(self, *args, **options):
+        blog_index = BlogIndex.objects.live().first()
+        if blog_index is None:
+            raise CommandError("No live BlogIndex.")
+        site = blog_index.get_site()
+        factory = RequestFactory(SERVER_NAME=site.hostname, SERVER_PORT=str(site.port))
+
+        slugs = list(
+            TagPostCount.objects.filter(post_count__gt=0)
+            .order_by("-post_count")
+            .values_list("tag__slug", flat=True)[: options["tags"]]
+        )
+        if not slugs:
+            raise CommandError("No tagged posts; run rebuild_tag_index first.")
+
+        timings = []
+        for _ in range(options["repeat"]):
+            for slug in slugs:
+                subpath = blog_index.reverse_subpage("tag_archive", args=[slug])
+                request = factory.get(blog_index.url + subpath)
+                request.user = AnonymousUser()
+                start = time.perf_counter()
+                view, view_args, view_kwargs = blog_index.resolve_subpage("/" + subpath)
+                blog_index.serve(request, view, view_args, view_kwargs).render()
+                timings.append((time.perf_counter() - start) * 1000)
+
+        timings.sort()
+        self.stdout.write(
+            f"{len(timings)} renders of {len(slugs)} tag pages "
+            f"({TagPostCount.objects.count()} tags): "
+            f"p50 {statistics.median(timings):.1f}ms, "
+            f"p95 {timings[int(len(timings) * 0.95) - 1]:.1f}ms, "
+            f"max {timings[-1]:.1f}ms"
+        )
@@ -0,0 +1,62 @@
+import sys
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from blogpages.importer import BlogImporter, batches, read_rows
+from blogpages.models import BlogIndex
+
+
+class Command(BaseCommand):
+    help = (
+        "Import posts as live BlogDetail pages from JSON lines or CSV. Each row has a title "
+        "and optionally slug, subtitle, body (StreamField JSON), tags, author (a name) and "
+        "first_published_at."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="Input file, or - for stdin.")
+        parser.add_argument("--format", choices=["jsonl", "csv"])
+        parser.add_argument("--batch-size", type=int, default=1000)
+        parser.add_argument("--blog-index", type=int, help="Page id of the BlogIndex to import into.")
+        parser.add_argument(
+            "--skip-search-index",
+            action="store_true",
+            help="Leave search indexing to a later update_index.",
+        )
+
+    def handle(self, *args, **options):
+        blog_index = BlogIndex.objects.all()
+        if options["blog_index"]:
+            blog_index = blog_index.filter(pk=options["blog_index"])
+        blog_index = blog_index.first()
+        if blog_index is None:
+            raise CommandError("No BlogIndex to import into.")
+
+        path = options["path"]
+        format = options["format"] or ("csv" if path.endswith(".csv") else "jsonl")
+        stream = sys.stdin if path == "-" else open(path, newline="", encoding="utf-8")
+
+        importer = BlogImporter(blog_index)
+        start = time.monotonic()
+        imported = 0
+        try:
+            with stream:
+                for batch in batches(read_rows(stream, format), options["batch_size"]):
+                    try:
+                        imported += importer.import_batch(batch)
+                    except (KeyError, ValueError) as e:
+                        raise CommandError(f"Row {imported + 1}-{imported + len(batch)}: {e}")
+                    elapsed = time.monotonic() - start
+                    self.stdout.write(f"{imported} posts ({imported / elapsed:.0f} rows/s)")
+        finally:
+            if imported:
+                self.stdout.write("Updating indexes...")
+                importer.finish(update_search_index=not options["skip_search_index"])
+
+        elapsed = time.monotonic() - start
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Imported {imported} posts in {elapsed:.1f}s ({imported / elapsed:.0f} rows/s)."
+            )
+        )
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from blogpages.tag_index import rebuild_tag_index
+
+
+class Command(BaseCommand):
+    help = "Rebuild the tag -> live post index and per-tag post counts from the posts' tags."
+
+    def handle(self, *args, **options):
+        rows = rebuild_tag_index()
+        self.stdout.write(self.style.SUCCESS(f"Indexed {rows} tagged posts."))
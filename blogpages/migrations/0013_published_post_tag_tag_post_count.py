@@ -0,0 +1,36 @@
+# Generated by Django 5.1.15 on 2026-10-18 06:45
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blogpages', '0012_alter_author_options'),
+        ('taggit', '0006_rename_taggeditem_content_type_object_id_taggit_tagg_content_8fc721_idx'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TagPostCount',
+            fields=[
+                ('tag', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='+', serialize=False, to='taggit.tag')),
+                ('post_count', models.PositiveIntegerField(db_index=True, default=0)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='PublishedPostTag',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('first_published_at', models.DateTimeField()),
+                ('path', models.CharField(max_length=255)),
+                ('post', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='published_tags', to='blogpages.blogdetail')),
+                ('tag', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='taggit.tag')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['tag', '-first_published_at', '-path'], name='blogpages_p_tag_id_88ad8c_idx')],
+                'constraints': [models.UniqueConstraint(fields=('tag', 'post'), name='unique_published_post_tag')],
+            },
+        ),
+    ]
@@ -1,6 +1,9 @@
 from django.db import models
+from django.http import Http404, StreamingHttpResponse
+from django.shortcuts import get_object_or_404
 
-from wagtail.models import Page
+from wagtail.contrib.routable_page.models import RoutablePageMixin, path
+from wagtail.models import Page, Site
 from wagtail.fields import RichTextField
 from wagtail.admin.panels import FieldPanel
 from wagtail.images import get_image_model
@@ -8,7 +11,7 @@ from wagtail.images import get_image_model
 from django.core.exceptions import ValidationError
 from modelcluster.fields import ParentalKey
 from modelcluster.contrib.taggit import ClusterTaggableManager
-from taggit.models import TaggedItemBase
+from taggit.models import Tag, TaggedItemBase
 
 from wagtail.documents.blocks import DocumentChooserBlock
 from wagtail.snippets.blocks import SnippetChooserBlock
@@ -19,6 +22,12 @@ from wagtail.models import DraftStateMixin, RevisionMixin, LockableMixin, Previe
 
 from wagtail.search import index
 
+from blogpages.listings import paginate_by_cursor
+from blogpages.tag_index import get_tag_cloud, get_tagged_posts
+from blogpages.syndication import stream_feed
+from blocks.search import HEADING, TEXT, extract_stream_text
+from caching.dependencies import record_dependency
+
 from wagtail.fields import StreamField
 from wagtail.blocks import (
     PageChooserBlock,
@@ -80,7 +89,39 @@ class BlogPageTag(TaggedItemBase):
     )
 
 
-class BlogIndex(Page):
+class PublishedPostTag(models.Model):
+    """
+    Tag -> live post lookup, denormalised from BlogPageTag on publish (see
+    blogpages.signals) so a tag archive page is one index range scan.
+    """
+
+    tag = models.ForeignKey(Tag, on_delete=models.CASCADE, related_name="+")
+    post = models.ForeignKey(
+        "blogpages.BlogDetail", on_delete=models.CASCADE, related_name="published_tags"
+    )
+    # Copied from the post, so paginate_by_cursor can page through the rows directly
+    first_published_at = models.DateTimeField()
+    path = models.CharField(max_length=255)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["tag", "post"], name="unique_published_post_tag"),
+        ]
+        indexes = [
+            models.Index(fields=["tag", "-first_published_at", "-path"]),
+        ]
+
+
+class TagPostCount(models.Model):
+    # Number of live posts per tag, for the tag cloud
+
+    tag = models.OneToOneField(
+        Tag, on_delete=models.CASCADE, primary_key=True, related_name="+"
+    )
+    post_count = models.PositiveIntegerField(default=0, db_index=True)
+
+
+class BlogIndex(RoutablePageMixin, Page):
     # A listing page for blog entries(child pages)
 
     max_count = 1
@@ -95,11 +136,62 @@ class BlogIndex(Page):
         FieldPanel("body"),
     ]
 
-    def get_context(self, request):
-        context = super().get_context(request)
-        context["blogpages"] = BlogDetail.objects.live().public()
+    posts_per_page = 10
+
+    def get_context(self, request, tag=None, *args, **kwargs):
+        context = super().get_context(request, *args, **kwargs)
+
+        record_dependency(BlogDetail)
+
+        cursor = request.GET.get("after")
+        try:
+            if tag is None:
+                # The StreamField body isn't shown in the listing, so don't load it
+                posts = BlogDetail.objects.live().public().defer("body")
+                posts, next_cursor = paginate_by_cursor(posts, cursor, self.posts_per_page)
+            else:
+                posts, next_cursor = get_tagged_posts(tag, cursor, self.posts_per_page)
+        except ValueError:
+            # A malformed ?after=, rather than silently showing the first page
+            raise Http404
+
+        for post in posts:
+            post.listing_url = post.get_url(request)
+
+        context["blogpages"] = posts
+        context["next_cursor"] = next_cursor
+        context["tag"] = tag
+        context["tag_cloud"] = get_tag_cloud()
         return context
 
+    def get_static_export_paths(self):
+        return [
+            self.reverse_subpage("tag_archive", args=[slug])
+            for slug in TagPostCount.objects.filter(post_count__gt=0).values_list(
+                "tag__slug", flat=True
+            )
+        ]
+
+    @path("tags/<slug:slug>/")
+    def tag_archive(self, request, slug):
+        tag = get_object_or_404(Tag, slug=slug)
+        return self.render(request, tag=tag)
+
+    def serve_feed(self, request, feed_type):
+        site = Site.find_for_request(request)
+        return StreamingHttpResponse(
+            stream_feed(self, feed_type, site, request.build_absolute_uri()),
+            content_type=f"application/{feed_type}+xml; charset=utf-8",
+        )
+
+    @path("feed/rss/")
+    def rss_feed(self, request):
+        return self.serve_feed(request, "rss")
+
+    @path("feed/atom/")
+    def atom_feed(self, request):
+        return self.serve_feed(request, "atom")
+
 
 from blocks import blocks as custom_blocks
 
@@ -161,6 +253,24 @@ class BlogDetail(Page):
         FieldPanel("author", permission='home.add_author'),
     ]
 
+    search_fields = Page.search_fields + [
+        index.SearchField("subtitle"),
+        index.SearchField("body_headings", boost=2),
+        index.SearchField("body_text"),
+    ]
+
+    def get_body_search_text(self):
+        # Read from the body's JSON (see blocks.search), once for both fields
+        if not hasattr(self, "_body_search_text"):
+            self._body_search_text = extract_stream_text(self.body)
+        return self._body_search_text
+
+    def body_headings(self):
+        return self.get_body_search_text()[HEADING]
+
+    def body_text(self):
+        return self.get_body_search_text()[TEXT]
+
     def clean(self):
         super().clean()
 
@@ -0,0 +1,68 @@
+from django.db.models.signals import post_delete, post_save, pre_delete
+from django.dispatch import receiver
+
+from wagtail.models import Page, PageViewRestriction
+from wagtail.signals import page_published, page_slug_changed, page_unpublished, post_page_move
+
+from blogpages.models import BlogDetail
+from blogpages.syndication import sitemap_section, sitemap_section_tag, sitemap_subtree_tags
+from blogpages.tag_index import remove_post_tags, sync_post_tags, sync_subtree_post_tags
+from caching.dependencies import invalidate
+
+
+@receiver(page_published, sender=BlogDetail)
+@receiver(page_unpublished, sender=BlogDetail)
+def sync_published_post_tags(sender, instance, **kwargs):
+    sync_post_tags(instance)
+
+
+# Before the rows go with the post's cascade, so the counts can be updated
+@receiver(pre_delete, sender=BlogDetail)
+def remove_deleted_post_tags(sender, instance, **kwargs):
+    remove_post_tags(instance.pk)
+
+
+@receiver(post_page_move)
+def sync_moved_post_tags(sender, instance, **kwargs):
+    # Moves (and reorders) change the path of every page in the subtree
+    if sync_subtree_post_tags(instance):
+        invalidate(BlogDetail)
+
+
+# Private posts are left out of tag pages by the rows' copy of the path
+@receiver(post_save, sender=PageViewRestriction)
+@receiver(post_delete, sender=PageViewRestriction)
+def sync_restricted_post_tags(sender, instance, **kwargs):
+    page = Page.objects.filter(pk=instance.page_id).first()
+    if page is not None:
+        sync_subtree_post_tags(page)
+
+
+@receiver(page_published)
+@receiver(page_unpublished)
+@receiver(post_delete)
+def invalidate_sitemap_section(sender, instance, **kwargs):
+    if isinstance(instance, Page):
+        invalidate(sitemap_section_tag(sitemap_section(instance.pk)))
+
+
+# A new url_path gives every page under it a new URL too, in whichever
+# sections they are listed
+@receiver(page_slug_changed)
+def invalidate_renamed_sitemap_sections(sender, instance, **kwargs):
+    invalidate(sitemap_subtree_tags(instance))
+
+
+@receiver(post_page_move)
+def invalidate_moved_sitemap_sections(sender, instance, url_path_before, url_path_after, **kwargs):
+    if url_path_before != url_path_after:
+        invalidate(sitemap_subtree_tags(instance))
+
+
+# Sections only list public pages
+@receiver(post_save, sender=PageViewRestriction)
+@receiver(post_delete, sender=PageViewRestriction)
+def invalidate_restricted_sitemap_sections(sender, instance, **kwargs):
+    page = Page.objects.filter(pk=instance.page_id).first()
+    if page is not None:
+        invalidate(sitemap_subtree_tags(page))
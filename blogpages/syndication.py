@@ -0,0 +1,187 @@
+from xml.sax.saxutils import escape
+
+from django.db.models import F, Max
+from django.urls import reverse
+from django.utils.feedgenerator import Atom1Feed, Rss201rev2Feed
+
+from wagtail.models import Page
+
+from caching.dependencies import cached_render, cached_stream, record_dependency
+
+
+SITEMAP_MAX_URLS = 50000
+SITEMAP_CACHE_TIMEOUT = 60 * 60 * 24
+FEED_ITEMS = 20
+FEED_CACHE_TIMEOUT = 60 * 60
+
+# Rows are fetched and written out in batches of this size
+CHUNK_SIZE = 1000
+
+
+class PageUrlBuilder:
+    """
+    Full URLs for a site's pages from their `url_path` alone, so listings can
+    be built from a values() projection instead of page instances.
+    """
+
+    def __init__(self, site):
+        self.root_url = site.root_url
+        self.root_path = site.root_page.url_path
+        self.serve_prefix = reverse("wagtail_serve", args=("",))
+
+    def filter(self, queryset):
+        return queryset.filter(url_path__startswith=self.root_path)
+
+    def __call__(self, url_path):
+        return self.root_url + self.serve_prefix + url_path[len(self.root_path) :]
+
+
+def _sitemap_pages(site):
+    urls = PageUrlBuilder(site)
+    return urls, urls.filter(Page.objects.live().public())
+
+
+def sitemap_section(page_id):
+    """
+    The sitemap section a page is listed in. Sections are fixed ranges of
+    page ids, so publishing a page only changes its own section, unless it
+    changes the URLs of the pages under it too.
+    """
+    return (page_id - 1) // SITEMAP_MAX_URLS + 1
+
+
+def sitemap_section_tag(section):
+    return f"sitemap:section:{section}"
+
+
+def sitemap_subtree_tags(page):
+    """
+    Tags of the sections listing `page` or any page under it, for changes
+    that reach the whole subtree, like a new url_path.
+    """
+    sections = (
+        Page.objects.descendant_of(page, inclusive=True)
+        .annotate(section=(F("pk") - 1) / SITEMAP_MAX_URLS + 1)
+        .values_list("section", flat=True)
+        .order_by()
+        .distinct()
+    )
+    return {sitemap_section_tag(section) for section in sections}
+
+
+def sitemap_section_count(site):
+    """
+    Cached until any page is published, unpublished or deleted, and then
+    recounted with a single MAX(id).
+    """
+
+    def count():
+        record_dependency(Page)
+        urls, pages = _sitemap_pages(site)
+        return max(1, sitemap_section(pages.aggregate(last=Max("pk"))["last"] or 0))
+
+    return cached_render(f"sitemap:sections:{site.pk}", count, SITEMAP_CACHE_TIMEOUT)[0]
+
+
+def _generate_sitemap(site, section):
+    urls, pages = _sitemap_pages(site)
+    rows = (
+        pages.filter(pk__gt=(section - 1) * SITEMAP_MAX_URLS, pk__lte=section * SITEMAP_MAX_URLS)
+        .order_by("pk")
+        .values_list("url_path", "last_published_at")
+    )
+
+    yield '<?xml version="1.0" encoding="UTF-8"?>\n'
+    yield '<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n'
+    chunk = []
+    for url_path, last_published_at in rows.iterator(chunk_size=CHUNK_SIZE):
+        entry = f"<url><loc>{escape(urls(url_path))}</loc>"
+        if last_published_at:
+            entry += f"<lastmod>{last_published_at.date().isoformat()}</lastmod>"
+        chunk.append(entry + "</url>\n")
+        if len(chunk) >= CHUNK_SIZE:
+            yield "".join(chunk)
+            chunk = []
+    yield "".join(chunk)
+    yield "</urlset>\n"
+
+
+def _generate_sitemap_index(site, section_count):
+    yield '<?xml version="1.0" encoding="UTF-8"?>\n'
+    yield '<sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n'
+    for section in range(1, section_count + 1):
+        section_url = site.root_url + reverse("sitemap_section", args=(section,))
+        yield f"<sitemap><loc>{escape(section_url)}</loc></sitemap>\n"
+    yield "</sitemapindex>\n"
+
+
+def stream_sitemap(site, section, section_count):
+    """
+    Chunks of sitemap XML: the single urlset when the site fits in one file,
+    otherwise the sitemap index (section=None) or one section of up to 50k
+    URLs. A section is cached until a page in it is published, unpublished,
+    deleted or made private, or one above it is renamed or moved; the index
+    only changes with the number of sections.
+    """
+    if section is None and section_count > 1:
+        generate = lambda: _generate_sitemap_index(site, section_count)
+        tags = []
+    else:
+        generate = lambda: _generate_sitemap(site, section or 1)
+        tags = [sitemap_section_tag(section or 1)]
+
+    return cached_stream(
+        f"sitemap:{site.pk}:{section or 0}:{section_count}",
+        generate,
+        SITEMAP_CACHE_TIMEOUT,
+        tags=tags,
+    )
+
+
+FEED_CLASSES = {"rss": Rss201rev2Feed, "atom": Atom1Feed}
+
+
+def _generate_feed(blog_index, feed_type, site, feed_url):
+    from blogpages.models import BlogDetail
+
+    urls = PageUrlBuilder(site)
+    feed = FEED_CLASSES[feed_type](
+        title=blog_index.title,
+        link=urls(blog_index.url_path),
+        description=blog_index.subtitle or blog_index.title,
+        feed_url=feed_url,
+    )
+
+    posts = (
+        BlogDetail.objects.live()
+        .public()
+        .child_of(blog_index)
+        .order_by("-first_published_at")
+        .values_list("title", "subtitle", "url_path", "first_published_at", "last_published_at")
+    )[:FEED_ITEMS]
+    for title, subtitle, url_path, first_published_at, last_published_at in posts:
+        feed.add_item(
+            title=title,
+            link=urls(url_path),
+            description=subtitle,
+            unique_id=urls(url_path),
+            pubdate=first_published_at,
+            updateddate=last_published_at,
+        )
+
+    yield feed.writeString("utf-8")
+
+
+def stream_feed(blog_index, feed_type, site, feed_url):
+    """
+    The latest posts under `blog_index` as an RSS or Atom document, cached
+    until a blog post is published, unpublished or deleted.
+    """
+    from blogpages.models import BlogDetail
+
+    return cached_stream(
+        f"feed:{feed_type}:{site.pk}:{blog_index.pk}",
+        lambda: _generate_feed(blog_index, feed_type, site, feed_url),
+        FEED_CACHE_TIMEOUT,
+        tags=[blog_index, BlogDetail],
+    )
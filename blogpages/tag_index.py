@@ -0,0 +1,165 @@
+from django.db.models import Count, OuterRef, Subquery
+
+from blogpages.listings import paginate_by_cursor
+
+
+TAG_CLOUD_SIZE = 50
+
+
+def sync_post_tags(post):
+    """
+    Bring the PublishedPostTag rows of `post` in line with its current tags
+    (none, unless it's live), and recount the tags that gained or lost it.
+    """
+    from blogpages.models import BlogPageTag, PublishedPostTag
+
+    existing = set(
+        PublishedPostTag.objects.filter(post=post).values_list("tag_id", flat=True)
+    )
+    if post.live and post.first_published_at:
+        current = set(
+            BlogPageTag.objects.filter(content_object_id=post.pk).values_list("tag_id", flat=True)
+        )
+    else:
+        current = set()
+
+    PublishedPostTag.objects.filter(post=post, tag_id__in=existing - current).delete()
+    PublishedPostTag.objects.filter(post=post, tag_id__in=existing & current).exclude(
+        first_published_at=post.first_published_at, path=post.path
+    ).update(first_published_at=post.first_published_at, path=post.path)
+    PublishedPostTag.objects.bulk_create(
+        [
+            PublishedPostTag(
+                tag_id=tag_id,
+                post_id=post.pk,
+                first_published_at=post.first_published_at,
+                path=post.path,
+            )
+            for tag_id in current - existing
+        ],
+        ignore_conflicts=True,
+    )
+
+    update_tag_counts(existing ^ current)
+
+
+def sync_subtree_post_tags(page):
+    """
+    Re-copy path and first_published_at into the PublishedPostTag rows of
+    every post at or under `page`, e.g. after it's moved, which changes the
+    path of the whole subtree.
+    """
+    from blogpages.models import BlogDetail, PublishedPostTag
+
+    post = BlogDetail.objects.filter(pk=OuterRef("post_id"))
+    return PublishedPostTag.objects.filter(
+        post__in=BlogDetail.objects.descendant_of(page, inclusive=True)
+    ).update(
+        path=Subquery(post.values("path")[:1]),
+        first_published_at=Subquery(post.values("first_published_at")[:1]),
+    )
+
+
+def remove_post_tags(post_id):
+    from blogpages.models import PublishedPostTag
+
+    rows = PublishedPostTag.objects.filter(post_id=post_id)
+    tag_ids = set(rows.values_list("tag_id", flat=True))
+    rows.delete()
+    update_tag_counts(tag_ids)
+
+
+def update_tag_counts(tag_ids=None):
+    """
+    Recount live posts for `tag_ids` (every tag if None) from the index.
+    """
+    from blogpages.models import PublishedPostTag, TagPostCount
+
+    rows = PublishedPostTag.objects.all()
+    if tag_ids is not None:
+        tag_ids = set(tag_ids)
+        if not tag_ids:
+            return
+        rows = rows.filter(tag_id__in=tag_ids)
+
+    counts = dict(rows.values_list("tag_id").annotate(count=Count("*")).order_by())
+    if tag_ids is None:
+        TagPostCount.objects.exclude(tag_id__in=counts).update(post_count=0)
+    else:
+        counts = {tag_id: counts.get(tag_id, 0) for tag_id in tag_ids}
+
+    TagPostCount.objects.bulk_create(
+        [TagPostCount(tag_id=tag_id, post_count=count) for tag_id, count in counts.items()],
+        update_conflicts=True,
+        unique_fields=["tag"],
+        update_fields=["post_count"],
+    )
+
+
+def rebuild_tag_index():
+    """
+    Rebuild the whole index from BlogPageTag, e.g. after a bulk import.
+    Returns the number of rows.
+    """
+    from blogpages.models import BlogPageTag, PublishedPostTag
+
+    live_tags = BlogPageTag.objects.filter(
+        content_object__live=True, content_object__first_published_at__isnull=False
+    ).values_list(
+        "tag_id",
+        "content_object_id",
+        "content_object__first_published_at",
+        "content_object__path",
+    )
+
+    PublishedPostTag.objects.all().delete()
+    PublishedPostTag.objects.bulk_create(
+        (
+            PublishedPostTag(
+                tag_id=tag_id, post_id=post_id, first_published_at=published_at, path=path
+            )
+            for tag_id, post_id, published_at, path in live_tags.iterator()
+        ),
+        batch_size=1000,
+        ignore_conflicts=True,
+    )
+    update_tag_counts()
+    return PublishedPostTag.objects.count()
+
+
+def get_tagged_posts(tag, cursor=None, per_page=10):
+    """
+    A page of live, public posts tagged `tag`, newest first, paged through
+    the index rather than joining the taggit tables. Returns
+    (posts, next_cursor) like paginate_by_cursor.
+    """
+    from wagtail.models import PageViewRestriction
+
+    from blogpages.models import BlogDetail, PublishedPostTag
+
+    rows = PublishedPostTag.objects.filter(tag=tag).only("post_id", "first_published_at", "path")
+    # Leave out private posts before paging, like PageQuerySet.public() but
+    # on the rows' copy of the path, so every page is still full
+    for path in PageViewRestriction.objects.values_list("page__path", flat=True):
+        rows = rows.exclude(path__startswith=path)
+
+    rows, next_cursor = paginate_by_cursor(rows, cursor, per_page)
+    posts = BlogDetail.objects.live().defer("body").in_bulk(
+        [row.post_id for row in rows]
+    )
+    return [posts[row.post_id] for row in rows if row.post_id in posts], next_cursor
+
+
+def get_tag_cloud(size=TAG_CLOUD_SIZE):
+    """
+    The most used tags as (tag, post_count) pairs, read from the precomputed
+    counts.
+    """
+    from blogpages.models import TagPostCount
+
+    return [
+        (count.tag, count.post_count)
+        for count in TagPostCount.objects.filter(post_count__gt=0)
+        .select_related("tag")
+        .order_by("-post_count", "tag__name")[:size]
+    ]
@@ -1,3 +1,114 @@
+from unittest import mock
+
+from django.core.cache import cache
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from wagtail.images.models import Filter
+from wagtail.models import PageViewRestriction
+
+from blog.testing import PageTestMixin, make_image
+from blogpages import syndication
+from blogpages.models import BlogDetail, BlogIndex, PublishedPostTag
+from home.models import HomePage
+from images.rendition_sets import rendition_set_specs
+
+
+class BlogPageTests(PageTestMixin, TestCase):
+    def setUp(self):
+        self.blog_index = HomePage.objects.get().add_child(
+            instance=BlogIndex(title="Posts", slug="posts")
+        )
+        self.post_count = 0
+
+    def make_image(self):
+        color = (self.post_count * 40 % 256, 80, 160)
+        image = make_image("Image", f"image-{self.post_count}.jpg", color)
+        # Rendition generation is covered by images.tests
+        image.create_renditions(*[Filter(spec) for spec in rendition_set_specs("block")])
+        return image
+
+    def make_post(self, image_blocks=0, tags=()):
+        self.post_count += 1
+        body = [("image", self.make_image()) for _ in range(image_blocks)]
+        post = self.blog_index.add_child(
+            instance=BlogDetail(
+                title=f"Post {self.post_count}", slug=f"post-{self.post_count}", body=body
+            )
+        )
+        post.tags.add(*tags)
+        post.save_revision().publish()
+        return post
+
+    def count_queries(self, url):
+        # Nothing cached, as on the first request after a publish
+        cache.clear()
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return len(queries)
+
+    def assert_same_queries(self, expected, url):
+        cache.clear()
+        with self.assertNumQueries(expected):
+            self.client.get(url)
+
+    def test_index_queries_dont_grow_with_posts(self):
+        for _ in range(2):
+            self.make_post()
+        expected = self.count_queries(self.blog_index.url)
+
+        for _ in range(6):
+            self.make_post()
+        self.assert_same_queries(expected, self.blog_index.url)
+
+    def test_detail_queries_dont_grow_with_image_blocks(self):
+        one_image = self.make_post(image_blocks=1)
+        four_images = self.make_post(image_blocks=4)
+        # Site root paths and the like are loaded on the first request either way
+        self.client.get(one_image.url)
+
+        expected = self.count_queries(one_image.url)
+        self.assert_same_queries(expected, four_images.url)
+
+    def test_malformed_cursor_is_not_found(self):
+        self.make_post()
+        cache.clear()
+        self.assertEqual(self.client.get(self.blog_index.url, {"after": "not-a-cursor"}).status_code, 404)
+
+    def test_private_posts_dont_shorten_tag_pages(self):
+        self.make_post(tags=["python"])
+        private = self.make_post(tags=["python"])
+        PageViewRestriction.objects.create(page=private, restriction_type=PageViewRestriction.LOGIN)
+
+        cache.clear()
+        url = self.blog_index.url + self.blog_index.reverse_subpage("tag_archive", args=["python"])
+        with mock.patch.object(BlogIndex, "posts_per_page", 1):
+            response = self.client.get(url)
+        self.assertEqual([post.title for post in response.context["blogpages"]], ["Post 1"])
+
+    def test_moving_a_post_updates_its_tag_rows(self):
+        post = self.make_post(tags=["python"])
+        self.make_post(tags=["python"])
+
+        post.move(self.blog_index, "last-child")
+        post.refresh_from_db()
+        self.assertEqual(
+            list(PublishedPostTag.objects.filter(post=post).values_list("path", flat=True)),
+            [post.path],
+        )
+
+    def test_renaming_a_section_updates_the_sitemap_under_it(self):
+        post = self.make_post()
+        # The post in a section of its own, apart from the index's
+        url = reverse("sitemap_section", args=(post.pk,))
+        with mock.patch.object(syndication, "SITEMAP_MAX_URLS", 1):
+            self.assertContains(self.client.get(url), "/posts/post-1/")
 
-# Create your tests here.
+            self.blog_index.slug = "articles"
+            with self.captureOnCommitCallbacks(execute=True):
+                self.blog_index.save_revision().publish()
+            # Streamed, so read while the patch is active
+            self.assertContains(self.client.get(url), "/articles/post-1/")
@@ -1,3 +1,20 @@
-from django.shortcuts import render
+from django.http import Http404, StreamingHttpResponse
 
-# Create your views here.
+from wagtail.models import Site
+
+from blogpages.syndication import sitemap_section_count, stream_sitemap
+
+
+def sitemap(request, section=None):
+    site = Site.find_for_request(request)
+    if site is None:
+        raise Http404
+
+    section_count = sitemap_section_count(site)
+    if section is not None and not 1 <= section <= section_count:
+        raise Http404
+
+    return StreamingHttpResponse(
+        stream_sitemap(site, section, section_count),
+        content_type="application/xml; charset=utf-8",
+    )
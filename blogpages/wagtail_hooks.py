@@ -31,13 +31,9 @@ class AuthorSnippet(SnippetViewSet):
     ]
 
 from wagtail import hooks
-from django.core.cache import cache
-
-@hooks.register('after_publish_page')
-def delete_all_cache(request, page):
-    cache.clear()
-    # print("page is:", page.title, page.id)
 
+# Cached fragments are invalidated per dependency by caching.signals,
+# so publishing no longer clears the whole cache.
 
 
 from django.contrib.auth.models import Permission
@@ -0,0 +1,200 @@
+import uuid
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.core.cache import InvalidCacheBackendError, caches
+from django.db import models
+
+from wagtail.models import ReferenceIndex
+
+
+DEPENDENCY_VERSION_PREFIX = "cachedeps"
+
+_collectors = ContextVar("cache_dependency_collectors", default=())
+
+
+def get_fragment_cache():
+    try:
+        return caches["template_fragments"]
+    except InvalidCacheBackendError:
+        return caches["default"]
+
+
+def _base_model(model):
+    # Pages (and any other multi-table child) are tagged by their base model,
+    # matching how ReferenceIndex stores `to_content_type`.
+    parents = model._meta.get_parent_list()
+    return parents[-1] if parents else model
+
+
+def model_tag(model):
+    """
+    Tag for "any object of this type", used by listings.
+    """
+    return model._meta.label_lower
+
+
+def object_tag(obj):
+    return f"{_base_model(obj._meta.model)._meta.label_lower}:{obj.pk}"
+
+
+def tags_for(*objects):
+    tags = set()
+    for obj in objects:
+        if obj is None:
+            continue
+        if isinstance(obj, str):
+            tags.add(obj)
+        elif isinstance(obj, type) and issubclass(obj, models.Model):
+            tags.add(model_tag(obj))
+        elif isinstance(obj, models.Model):
+            tags.add(object_tag(obj))
+        else:
+            tags.update(tags_for(*obj))
+    return tags
+
+
+def reference_tags(obj):
+    """
+    Tags for every page, snippet, image and document `obj` links to, read
+    from Wagtail's reference index rather than by walking its content.
+    """
+    references = (
+        ReferenceIndex.get_references_for_object(obj)
+        .values_list("to_content_type__app_label", "to_content_type__model", "to_object_id")
+        .distinct()
+    )
+    return {f"{app_label}.{model}:{pk}" for app_label, model, pk in references}
+
+
+def record_dependency(*objects):
+    """
+    Mark everything currently being cached as depending on `objects`
+    (model instances, model classes for listings, or raw tags).
+    """
+    collectors = _collectors.get()
+    if not collectors:
+        return
+    tags = tags_for(*objects)
+    for collected in collectors:
+        collected.update(tags)
+
+
+def collecting():
+    """
+    Whether anything is being cached, i.e. record_dependency() would have
+    an effect, for callers that need queries to work out their tags.
+    """
+    return bool(_collectors.get())
+
+
+@contextmanager
+def collect_dependencies():
+    collected = set()
+    token = _collectors.set(_collectors.get() + (collected,))
+    try:
+        yield collected
+    finally:
+        _collectors.reset(token)
+
+
+def _version_key(tag):
+    return f"{DEPENDENCY_VERSION_PREFIX}:{tag}"
+
+
+def _new_version():
+    return uuid.uuid4().hex
+
+
+def tag_versions(tags, cache=None):
+    """
+    The current version of each tag's key, creating any that are missing.
+    """
+    cache = cache or get_fragment_cache()
+    keys = [_version_key(tag) for tag in tags]
+    versions = cache.get_many(keys)
+    for key in keys:
+        if key not in versions:
+            # add() is atomic, so concurrent renders agree on one version
+            version = _new_version()
+            versions[key] = version if cache.add(key, version, None) else cache.get(key)
+    return versions
+
+
+def set_cached(cache_key, value, tags, timeout, cache=None):
+    """
+    Store `value` along with the current versions of `tags`.
+    """
+    cache = cache or get_fragment_cache()
+    cache.set(cache_key, (value, tag_versions(tags, cache=cache)), timeout)
+
+
+def get_cached(cache_key, cache=None):
+    """
+    The value stored by set_cached(), or None if there isn't one or any of
+    its tags has been invalidated since. A version key that has been evicted
+    counts as invalidated, so eviction can only cause misses, never stale hits.
+    """
+    cache = cache or get_fragment_cache()
+    entry = cache.get(cache_key)
+    if not isinstance(entry, tuple) or len(entry) != 2 or not isinstance(entry[1], dict):
+        # Missing, or stored before entries recorded tag versions
+        return None
+    value, versions = entry
+    if versions and cache.get_many(versions.keys()) != versions:
+        return None
+    # Whatever encloses this still depends on what the cached value did
+    record_dependency({key.split(":", 1)[1] for key in versions})
+    return value
+
+
+def invalidate(*objects, cache=None):
+    """
+    Make every cached entry that recorded a dependency on `objects` stale by
+    moving their tags to a new version. Returns the number of tags changed.
+    """
+    cache = cache or get_fragment_cache()
+    keys = [_version_key(tag) for tag in tags_for(*objects)]
+    cache.set_many({key: _new_version() for key in keys}, None)
+    return len(keys)
+
+
+def cached_render(cache_key, render, timeout, cache=None):
+    """
+    The cached value of `cache_key`, or the result of `render()` stored with
+    every dependency recorded while rendering. Returns (value, hit).
+    """
+    cache = cache or get_fragment_cache()
+
+    value = get_cached(cache_key, cache=cache)
+    if value is not None:
+        return value, True
+
+    with collect_dependencies() as tags:
+        value = render()
+
+    set_cached(cache_key, value, tags, timeout, cache=cache)
+    return value, False
+
+
+def cached_stream(cache_key, generate, timeout, tags=(), cache=None):
+    """
+    Iterate the cached output of `generate()`, or stream it straight from the
+    generator while keeping a copy to store once it finishes, so a miss still
+    starts responding immediately.
+    """
+    cache = cache or get_fragment_cache()
+
+    cached = get_cached(cache_key, cache=cache)
+    if cached is not None:
+        return iter([cached])
+
+    def stream():
+        chunks = []
+        for chunk in generate():
+            chunks.append(chunk)
+            yield chunk
+
+        set_cached(cache_key, "".join(chunks), tags_for(*tags), timeout, cache=cache)
+
+    return stream()
@@ -0,0 +1,83 @@
+import random
+import time
+
+from django.core.cache import caches
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.test import Client, override_settings
+
+from wagtail.models import Page
+
+from blogpages.models import BlogDetail
+
+
+def _percentile(timings, fraction):
+    return timings[max(int(len(timings) * fraction) - 1, 0)] if timings else 0.0
+
+
+class Command(BaseCommand):
+    help = (
+        "Request live pages while publishing posts in between, and compare the "
+        "full-page cache hit rate and response times of dependency invalidation "
+        "against clearing the whole cache on every publish. Uses a private "
+        "in-memory cache, and rolls back the publishes."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--requests", type=int, default=2000, help="Page requests per strategy.")
+        parser.add_argument(
+            "--publish-every", type=int, default=20, help="Publish a random post after this many requests."
+        )
+        parser.add_argument("--seed", type=int, default=0)
+
+    def handle(self, *args, **options):
+        urls = [page.url for page in Page.objects.live().specific() if page.url]
+        post_ids = list(BlogDetail.objects.live().values_list("pk", flat=True))
+        if not urls or not post_ids:
+            raise CommandError("No live posts to request and publish.")
+
+        self.stdout.write(
+            f"{options['requests']} requests over {len(urls)} pages, "
+            f"a publish every {options['publish_every']} requests"
+        )
+        self.stdout.write(f"{'strategy':<12} {'hit rate':>8} {'p50':>8} {'p95':>8}")
+        for strategy in ("dependency", "clear"):
+            hits, timings = self.run(strategy, urls, post_ids, options)
+            timings.sort()
+            self.stdout.write(
+                f"{strategy:<12} {hits / len(timings):>8.0%} "
+                f"{_percentile(timings, 0.5):>6.1f}ms {_percentile(timings, 0.95):>6.1f}ms"
+            )
+
+    def run(self, strategy, urls, post_ids, options):
+        rng = random.Random(options["seed"])
+        client = Client()
+        hits = 0
+        timings = []
+        cache_settings = {
+            "default": {
+                "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+                "LOCATION": f"benchmark-{strategy}",
+            }
+        }
+        with override_settings(CACHES=cache_settings), transaction.atomic():
+            cache = caches["default"]
+            cache.clear()
+            # Every page once, so both strategies start warm
+            for url in urls:
+                client.get(url)
+
+            for i in range(options["requests"]):
+                if i and i % options["publish_every"] == 0:
+                    # Signals invalidate the post's dependants either way
+                    BlogDetail.objects.get(pk=rng.choice(post_ids)).save_revision().publish()
+                    if strategy == "clear":
+                        cache.clear()
+
+                start = time.perf_counter()
+                response = client.get(rng.choice(urls))
+                timings.append((time.perf_counter() - start) * 1000)
+                hits += response.get("X-Cache") == "HIT"
+
+            transaction.set_rollback(True)
+        return hits, timings
@@ -0,0 +1,103 @@
+import http.client
+import threading
+import time
+from socketserver import ThreadingMixIn
+from wsgiref.simple_server import WSGIRequestHandler, WSGIServer, make_server
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.management.base import BaseCommand, CommandError
+from django.core.wsgi import get_wsgi_application
+
+from wagtail.models import Page
+
+from blogpages.models import BlogDetail, BlogIndex
+
+
+class ThreadingWSGIServer(ThreadingMixIn, WSGIServer):
+    daemon_threads = True
+
+
+class QuietHandler(WSGIRequestHandler):
+    def log_message(self, *args):
+        pass
+
+
+class Command(BaseCommand):
+    help = (
+        "Load test the BlogIndex and BlogDetail pages over HTTP from several "
+        "client threads against an in-process server, and report requests per "
+        "second with every cache emptied before each request (cold) and with "
+        "the full-page cache primed (warm). Clears the configured caches."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--threads", type=int, default=8, help="Concurrent client connections.")
+        parser.add_argument("--duration", type=float, default=10.0, help="Seconds per phase.")
+
+    def handle(self, *args, **options):
+        pages = Page.objects.live().type(BlogIndex, BlogDetail)
+        paths = [page.url for page in pages.specific() if page.url]
+        if not paths:
+            raise CommandError("No live blog pages.")
+
+        cold = threading.Event()
+        application = get_wsgi_application()
+
+        def app(environ, start_response):
+            if cold.is_set():
+                for alias in settings.CACHES:
+                    caches[alias].clear()
+            return application(environ, start_response)
+
+        server = make_server("127.0.0.1", 0, app, ThreadingWSGIServer, QuietHandler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        port = server.server_address[1]
+
+        self.stdout.write(f"{len(paths)} pages, {options['threads']} threads, {options['duration']:.0f}s per phase")
+        try:
+            cold.set()
+            self.report("cold", self.run(port, paths, options))
+            cold.clear()
+            for path in paths:
+                self.request(port, path)
+            self.report("warm", self.run(port, paths, options))
+        finally:
+            server.shutdown()
+
+    def request(self, port, path):
+        connection = http.client.HTTPConnection("127.0.0.1", port)
+        try:
+            connection.request("GET", path, headers={"Accept-Encoding": "gzip"})
+            response = connection.getresponse()
+            response.read()
+            return response.status, response.getheader("X-Cache") == "HIT"
+        finally:
+            connection.close()
+
+    def run(self, port, paths, options):
+        deadline = time.monotonic() + options["duration"]
+        results = []
+
+        def client(offset):
+            i = offset
+            while time.monotonic() < deadline:
+                results.append(self.request(port, paths[i % len(paths)]))
+                i += 1
+
+        threads = [threading.Thread(target=client, args=(i,)) for i in range(options["threads"])]
+        start = time.monotonic()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return results, time.monotonic() - start
+
+    def report(self, phase, run):
+        results, elapsed = run
+        errors = sum(1 for status, _ in results if status != 200)
+        hits = sum(1 for _, hit in results if hit)
+        self.stdout.write(
+            f"{phase}: {len(results) / elapsed:.0f} requests/s "
+            f"({len(results)} requests, {hits} cache hits, {errors} errors)"
+        )
@@ -0,0 +1,121 @@
+import gzip
+import hashlib
+import time
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.http import http_date
+
+from caching.dependencies import (
+    collect_dependencies,
+    get_cached,
+    get_fragment_cache,
+    set_cached,
+)
+
+
+class FullPageCacheMiddleware:
+    """
+    Serves anonymous GETs of HTML pages from a cache of gzipped responses.
+
+    Each entry is tagged with the surrogate keys (pages, authors, images...)
+    recorded while the response was rendered, so publishing purges only the
+    responses that showed the changed object (see caching.signals).
+
+    Should be the first middleware, so hits skip the rest of the stack and
+    stored responses include the headers other middleware add.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.timeout = getattr(settings, "FULL_PAGE_CACHE_TIMEOUT", 600)
+        self.excluded_paths = tuple(getattr(settings, "FULL_PAGE_CACHE_EXCLUDED_PATHS", ()))
+        self.query_params = set(getattr(settings, "FULL_PAGE_CACHE_QUERY_PARAMS", ()))
+
+    def is_cacheable_request(self, request):
+        return (
+            request.method == "GET"
+            # Logged-in users and anyone who has unlocked a private page have a session
+            and settings.SESSION_COOKIE_NAME not in request.COOKIES
+            and not request.path.startswith(self.excluded_paths)
+            # Otherwise any made-up parameter would add an entry, pushing
+            # real pages out of the cache
+            and request.GET.keys() <= self.query_params
+        )
+
+    def is_cacheable_response(self, response):
+        return (
+            response.status_code == 200
+            and not response.streaming
+            and not response.cookies
+            and response.get("Content-Type", "").startswith("text/html")
+            and "private" not in response.get("Cache-Control", "")
+            and "no-cache" not in response.get("Cache-Control", "")
+        )
+
+    def cache_key(self, request):
+        url = request.build_absolute_uri(request.path)
+        if request.GET:
+            url += "?" + urlencode(sorted(request.GET.lists()), doseq=True)
+        digest = hashlib.md5(url.encode(), usedforsecurity=False).hexdigest()
+        return f"fullpage:{digest}"
+
+    def __call__(self, request):
+        if not self.is_cacheable_request(request):
+            return self.get_response(request)
+
+        cache = get_fragment_cache()
+        cache_key = self.cache_key(request)
+
+        entry = get_cached(cache_key, cache=cache)
+        if entry is not None:
+            return self.build_response(request, entry)
+
+        with collect_dependencies() as tags:
+            response = self.get_response(request)
+
+        if self.is_cacheable_response(response):
+            entry = {
+                "content": gzip.compress(response.content),
+                "headers": [
+                    (name, value)
+                    for name, value in response.items()
+                    if name.lower() not in ("content-length", "set-cookie")
+                ],
+                "etag": '"%s"' % hashlib.md5(response.content, usedforsecurity=False).hexdigest(),
+                "last_modified": time.time(),
+            }
+            set_cached(cache_key, entry, tags, self.timeout, cache=cache)
+
+            response["ETag"] = entry["etag"]
+            response["Last-Modified"] = http_date(entry["last_modified"])
+
+        return response
+
+    def build_response(self, request, entry):
+        response = HttpResponse()
+        for name, value in entry["headers"]:
+            response[name] = value
+        response["ETag"] = entry["etag"]
+        response["Last-Modified"] = http_date(entry["last_modified"])
+        patch_vary_headers(response, ("Accept-Encoding",))
+
+        not_modified = get_conditional_response(
+            request,
+            etag=entry["etag"],
+            last_modified=int(entry["last_modified"]),
+            response=response,
+        )
+        if not_modified is not response:
+            return not_modified
+
+        if "gzip" in request.headers.get("Accept-Encoding", ""):
+            response.content = entry["content"]
+            response["Content-Encoding"] = "gzip"
+        else:
+            response.content = gzip.decompress(entry["content"])
+        response["Content-Length"] = str(len(response.content))
+        response["X-Cache"] = "HIT"
+        return response
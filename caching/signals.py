@@ -0,0 +1,67 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from wagtail.documents import get_document_model
+from wagtail.images import get_image_model
+from wagtail.models import Page, PageViewRestriction
+from wagtail.signals import page_published, page_unpublished
+
+from blogpages.models import Author, BlogDetail
+from caching.dependencies import invalidate, tags_for
+
+
+def page_change_tags(page):
+    # The page itself, plus any listing of its type (e.g. ImageBlock's post
+    # list) or of pages in general (e.g. cached search results)
+    return tags_for(page, page.specific_class or type(page), Page)
+
+
+def invalidate_page(page):
+    invalidate(page_change_tags(page))
+
+
+@receiver(page_published)
+@receiver(page_unpublished)
+def invalidate_published_page(sender, instance, **kwargs):
+    invalidate_page(instance)
+
+
+@receiver(post_delete)
+def invalidate_deleted_page(sender, instance, **kwargs):
+    if isinstance(instance, Page):
+        invalidate_page(instance)
+
+
+@receiver(post_save, sender=Author)
+@receiver(post_delete, sender=Author)
+@receiver(post_save, sender=get_image_model())
+@receiver(post_delete, sender=get_image_model())
+@receiver(post_save, sender=get_document_model())
+@receiver(post_delete, sender=get_document_model())
+def invalidate_saved_object(sender, instance, **kwargs):
+    invalidate(instance)
+
+
+def restricted_page_ids(restriction):
+    """
+    The ids of the page `restriction` applies to and its descendants, or
+    none if the page is gone (deleted pages invalidate themselves).
+    """
+    page = Page.objects.filter(pk=restriction.page_id).first()
+    if page is None:
+        return []
+    return list(Page.objects.descendant_of(page, inclusive=True).values_list("pk", flat=True))
+
+
+def restriction_change_tags(page_ids):
+    # The pages, plus listings that may show them
+    return tags_for([Page(pk=pk) for pk in page_ids], BlogDetail, Page)
+
+
+@receiver(post_save, sender=PageViewRestriction)
+@receiver(post_delete, sender=PageViewRestriction)
+def invalidate_restricted_pages(sender, instance, **kwargs):
+    # Cached responses skip serve() and its view restriction check
+    page_ids = restricted_page_ids(instance)
+    if page_ids:
+        invalidate(restriction_change_tags(page_ids))
@@ -0,0 +1,87 @@
+from django import template
+from django.core.cache import caches
+from django.core.cache.utils import make_template_fragment_key
+from django.template.exceptions import TemplateSyntaxError
+
+from wagtail.models import PAGE_TEMPLATE_VAR, Site
+from wagtail.templatetags.wagtail_cache import WagtailPageCacheNode
+
+from caching.dependencies import (
+    cached_render,
+    get_fragment_cache,
+    record_dependency,
+    reference_tags,
+)
+
+register = template.Library()
+
+
+class DependentPageCacheNode(WagtailPageCacheNode):
+    """
+    `{% wagtailpagecache %}` that records what the fragment depends on (the
+    page, everything it references, and anything blocks report while
+    rendering), so publishing one object only drops the fragments using it.
+    """
+
+    def render(self, context):
+        request = context.get("request")
+        if request is None or getattr(request, "is_preview", False):
+            return self.nodelist.render(context)
+
+        with context.update(
+            {self.CACHE_SITE_TEMPLATE_VAR: Site.find_for_request(request)}
+        ):
+            return self.render_cached(context)
+
+    def render_cached(self, context):
+        expire_time = self.expire_time_var.resolve(context)
+        if expire_time is not None:
+            try:
+                expire_time = int(expire_time)
+            except (ValueError, TypeError):
+                raise TemplateSyntaxError(
+                    '"dependentpagecache" tag got a non-integer timeout value: %r' % expire_time
+                )
+
+        if self.cache_name:
+            fragment_cache = caches[self.cache_name.resolve(context)]
+        else:
+            fragment_cache = get_fragment_cache()
+
+        vary_on = [var.resolve(context) for var in self.vary_on]
+        cache_key = make_template_fragment_key(self.fragment_name, vary_on)
+
+        def render():
+            page = context.get(PAGE_TEMPLATE_VAR)
+            record_dependency(page)
+            value = self.nodelist.render(context)
+            if page is not None:
+                record_dependency(reference_tags(page))
+            return value
+
+        value, _ = cached_render(cache_key, render, expire_time, cache=fragment_cache)
+        return value
+
+
+@register.tag("dependentpagecache")
+def do_dependentpagecache(parser, token):
+    # Same arguments as `{% wagtailpagecache %}`
+    nodelist = parser.parse(("enddependentpagecache",))
+    parser.delete_first_token()
+    tokens = token.split_contents()
+    if len(tokens) < 3:
+        raise TemplateSyntaxError(
+            f"'{tokens[0]}' tag requires at least 2 arguments."
+        )
+    if len(tokens) > 3 and tokens[-1].startswith("using="):
+        cache_name = parser.compile_filter(tokens[-1][len("using=") :])
+        tokens = tokens[:-1]
+    else:
+        cache_name = None
+    return DependentPageCacheNode(
+        nodelist,
+        parser.compile_filter(tokens[1]),
+        tokens[2],  # fragment_name can't be a variable.
+        [parser.compile_filter(t) for t in tokens[3:]],
+        cache_name,
+    )
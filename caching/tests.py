@@ -0,0 +1,41 @@
+from unittest import mock
+
+from django.test import TestCase
+
+from wagtail.models import PageViewRestriction
+
+from blog.testing import PageTestMixin
+from caching import wagtail_hooks
+from blogpages.models import BlogDetail, BlogIndex
+from home.models import HomePage
+
+
+class FullPageCacheTests(PageTestMixin, TestCase):
+    def setUp(self):
+        blog_index = HomePage.objects.get().add_child(
+            instance=BlogIndex(title="Posts", slug="posts")
+        )
+        self.post = blog_index.add_child(instance=BlogDetail(title="Post", slug="post"))
+        self.post.save_revision().publish()
+
+    def test_pages_made_private_arent_served_from_the_cache(self):
+        self.client.get(self.post.url)
+        self.assertEqual(self.client.get(self.post.url).get("X-Cache"), "HIT")
+
+        restriction = PageViewRestriction.objects.create(
+            page=self.post.get_parent(), restriction_type=PageViewRestriction.LOGIN
+        )
+        response = self.client.get(self.post.url)
+        self.assertEqual(response.status_code, 302)
+        self.assertIsNone(response.get("X-Cache"))
+
+        restriction.delete()
+        self.assertEqual(self.client.get(self.post.url).status_code, 200)
+
+    def test_uncached_requests_dont_look_up_references(self):
+        with mock.patch.object(wagtail_hooks, "reference_tags", return_value=set()) as lookup:
+            self.client.get(self.post.url)
+            self.assertEqual(lookup.call_count, 1)
+            # Not cached, with a parameter the cache doesn't vary on
+            self.client.get(self.post.url, {"utm_source": "feed"})
+            self.assertEqual(lookup.call_count, 1)
@@ -0,0 +1,11 @@
+from wagtail import hooks
+
+from caching.dependencies import collecting, record_dependency, reference_tags
+
+
+@hooks.register("before_serve_page")
+def record_served_page(page, request, serve_args, serve_kwargs):
+    # Tags a cached full-page response with the page and what it links to
+    if not collecting():
+        return
+    record_dependency(page, reference_tags(page))
@@ -0,0 +1,48 @@
+import logging
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+
+from django.conf import settings
+from django.db import transaction
+
+from documents.workers import extract_document_text, init_worker
+
+
+logger = logging.getLogger(__name__)
+
+_executor = None
+
+
+def get_executor(max_workers=None):
+    global _executor
+    if _executor is None:
+        _executor = ProcessPoolExecutor(
+            max_workers=max_workers or getattr(settings, "DOCUMENT_TEXT_WORKERS", 2),
+            # A fresh interpreter rather than a fork, so workers don't share
+            # the parent's database connections
+            mp_context=get_context("spawn"),
+            initializer=init_worker,
+        )
+    return _executor
+
+
+def _log_failure(future):
+    exception = future.exception()
+    if exception is not None:
+        logger.error("Document text extraction failed", exc_info=exception)
+
+
+def queue_text_extraction(document):
+    """
+    Extract `document`'s text in a worker process once the current
+    transaction commits, so uploads don't wait for it.
+    """
+
+    def submit():
+        if not getattr(settings, "DOCUMENT_TEXT_WORKERS", 2):
+            extract_document_text(document.pk)
+            return
+        future = get_executor().submit(extract_document_text, document.pk)
+        future.add_done_callback(_log_failure)
+
+    transaction.on_commit(submit)
@@ -0,0 +1,130 @@
+# Loaded by text extraction worker processes before Django is set up, so
+# nothing here may depend on Django.
+
+import csv
+import io
+import re
+import zipfile
+from xml.etree.ElementTree import iterparse
+
+
+WHITESPACE_RE = re.compile(r"\s+")
+SLIDE_RE = re.compile(r"^ppt/slides/slide(\d+)\.xml$")
+
+W = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+A = "{http://schemas.openxmlformats.org/drawingml/2006/main}"
+SHEET = "{http://schemas.openxmlformats.org/spreadsheetml/2006/main}"
+ODF_TEXT = "{urn:oasis:names:tc:opendocument:xmlns:text:1.0}"
+
+
+def _text_stream(file):
+    return io.TextIOWrapper(file, encoding="utf-8", errors="replace", newline="")
+
+
+def _txt(file):
+    stream = _text_stream(file)
+    while block := stream.read(64 * 1024):
+        yield block
+
+
+def _csv(file):
+    for row in csv.reader(_text_stream(file)):
+        yield " ".join(row)
+
+
+def _xml_blocks(stream, block_tags):
+    # Streams the XML, so a huge document isn't parsed into memory at once
+    for event, element in iterparse(stream):
+        if element.tag in block_tags:
+            yield "".join(element.itertext())
+            element.clear()
+
+
+def _docx(file):
+    with zipfile.ZipFile(file) as archive, archive.open("word/document.xml") as stream:
+        yield from _xml_blocks(stream, {W + "p"})
+
+
+def _odt(file):
+    with zipfile.ZipFile(file) as archive, archive.open("content.xml") as stream:
+        yield from _xml_blocks(stream, {ODF_TEXT + "p", ODF_TEXT + "h"})
+
+
+def _pptx(file):
+    with zipfile.ZipFile(file) as archive:
+        slides = sorted(
+            (int(match.group(1)), name)
+            for name in archive.namelist()
+            if (match := SLIDE_RE.match(name))
+        )
+        for _, name in slides:
+            with archive.open(name) as stream:
+                yield from _xml_blocks(stream, {A + "p"})
+
+
+def _xlsx(file):
+    # Text cells live in the shared string table; numbers aren't worth indexing
+    with zipfile.ZipFile(file) as archive:
+        if "xl/sharedStrings.xml" in archive.namelist():
+            with archive.open("xl/sharedStrings.xml") as stream:
+                yield from _xml_blocks(stream, {SHEET + "si"})
+
+
+def _pdf(file):
+    from pypdf import PdfReader
+
+    reader = PdfReader(file)
+    if reader.is_encrypted and not reader.decrypt(""):
+        return
+    for page in reader.pages:
+        yield page.extract_text() or ""
+
+
+EXTRACTORS = {
+    "csv": _csv,
+    "docx": _docx,
+    "odt": _odt,
+    "pdf": _pdf,
+    "pptx": _pptx,
+    "txt": _txt,
+    "xlsx": _xlsx,
+}
+
+
+def extract_text(file, extension, max_length):
+    """
+    The text of `file` (open in binary mode) as one whitespace-normalised
+    string of at most `max_length` characters, or None if files with this
+    extension aren't supported. Reading stops once `max_length` is reached.
+    """
+    extractor = EXTRACTORS.get(extension.lower())
+    if extractor is None:
+        return None
+
+    parts = []
+    length = 0
+    for text in extractor(file):
+        text = WHITESPACE_RE.sub(" ", text).strip()
+        if text:
+            parts.append(text)
+            length += len(text) + 1
+            if length > max_length:
+                break
+    return " ".join(parts)[:max_length].rstrip()
+
+
+def chunk_text(text, size):
+    """
+    Split `text` into pieces of at most `size` characters, breaking at a
+    space where there is one.
+    """
+    chunks = []
+    while len(text) > size:
+        end = text.rfind(" ", 0, size + 1)
+        if end <= 0:
+            end = size
+        chunks.append(text[:end])
+        text = text[end:].lstrip()
+    if text:
+        chunks.append(text)
+    return chunks
@@ -0,0 +1,7 @@
+from wagtail.documents.forms import BaseDocumentForm
+
+from filestore.forms import SharedFileFormMixin
+
+
+class DocumentForm(SharedFileFormMixin, BaseDocumentForm):
+    pass
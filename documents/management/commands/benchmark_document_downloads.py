@@ -0,0 +1,146 @@
+import os
+import socket
+import tempfile
+import threading
+import time
+
+from django.contrib.auth.models import AnonymousUser
+from django.core.files.base import File
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import RequestFactory, override_settings
+
+from wagtail.documents import get_document_model
+from wagtail.documents.views import serve as wagtail_serve
+
+from documents import views
+
+
+CHUNK_SIZE = 1024 * 1024
+
+
+def _send(response, sock):
+    """
+    Write `response` to `sock` the way gunicorn does: a FileResponse's file
+    goes through wsgi.file_wrapper, i.e. os.sendfile() from its current
+    position for Content-Length bytes; anything else is iterated in Python.
+    """
+    filelike = getattr(response, "file_to_stream", None)
+    try:
+        if filelike is not None and hasattr(filelike, "fileno"):
+            fd = filelike.fileno()
+            offset = os.lseek(fd, 0, os.SEEK_CUR)
+            remaining = int(response["Content-Length"])
+            while remaining:
+                sent = os.sendfile(sock.fileno(), fd, offset, remaining)
+                if not sent:
+                    break
+                offset += sent
+                remaining -= sent
+        else:
+            for chunk in response:
+                sock.sendall(chunk)
+    finally:
+        response.close()
+
+
+def _socket_pair():
+    # Over loopback TCP, where sendfile() avoids copying through user space
+    with socket.create_server(("127.0.0.1", 0)) as listener:
+        client = socket.create_connection(listener.getsockname())
+        server, _ = listener.accept()
+    return server, client
+
+
+def _drain(sock, received):
+    buffer = bytearray(CHUNK_SIZE)
+    total = 0
+    while count := sock.recv_into(buffer):
+        total += count
+    received.append(total)
+
+
+class Command(BaseCommand):
+    help = (
+        "Time concurrent downloads of a large document from one worker process, "
+        "served by Wagtail's streaming view, by sendfile(), and offloaded to the "
+        "web server."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--size", type=int, default=64, help="Document size in MB.")
+        parser.add_argument(
+            "--concurrency", default="1,4,16", help="Comma-separated numbers of simultaneous downloads."
+        )
+
+    def handle(self, *args, **options):
+        try:
+            levels = [int(level) for level in options["concurrency"].split(",")]
+        except ValueError:
+            raise CommandError("--concurrency must be comma-separated numbers.")
+
+        Document = get_document_model()
+        size = options["size"] * 1024 * 1024
+        with tempfile.TemporaryFile() as f:
+            for _ in range(options["size"]):
+                f.write(os.urandom(CHUNK_SIZE))
+            f.seek(0)
+            doc = Document(title="Download benchmark")
+            doc.file.save("benchmark-download.bin", File(f), save=False)
+            doc.save()
+
+        modes = [
+            ("wagtail", wagtail_serve.serve, {}),
+            ("sendfile", views.serve, {"DOCUMENTS_SERVE_OFFLOAD": None}),
+            ("offload", views.serve, {"DOCUMENTS_SERVE_OFFLOAD": "x-accel-redirect"}),
+        ]
+        factory = RequestFactory()
+        try:
+            self.stdout.write(f"{options['size']}MB document")
+            self.stdout.write(f"{'mode':>9} {'downloads':>9} {'MB/s':>8} {'CPU ms each':>12}")
+            for name, view, overrides in modes:
+                with override_settings(**overrides):
+                    # Warm up
+                    self.run(factory, view, doc, 1)
+                for level in levels:
+                    with override_settings(**overrides):
+                        elapsed, cpu, received = self.run(factory, view, doc, level)
+                    expected = 0 if name == "offload" else size
+                    if any(count != expected for count in received):
+                        raise CommandError(f"{name}: incomplete download")
+                    self.stdout.write(
+                        f"{name:>9} {level:>9} "
+                        f"{sum(received) / 1024 / 1024 / elapsed:>8.0f} "
+                        f"{cpu / level * 1000:>12.1f}"
+                    )
+        finally:
+            doc.file.delete(save=False)
+            doc.delete()
+
+    def run(self, factory, view, doc, level):
+        received = []
+        cpu = []
+
+        def download():
+            server, client = _socket_pair()
+            drain = threading.Thread(target=_drain, args=(client, received))
+            drain.start()
+
+            start = time.thread_time()
+            request = factory.get(doc.url)
+            request.user = AnonymousUser()
+            _send(view(request, str(doc.pk), doc.filename), server)
+            cpu.append(time.thread_time() - start)
+            connection.close()
+
+            server.close()
+            drain.join()
+            client.close()
+
+        threads = [threading.Thread(target=download) for _ in range(level)]
+        start = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return time.perf_counter() - start, sum(cpu), received
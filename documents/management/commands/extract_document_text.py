@@ -0,0 +1,47 @@
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from multiprocessing import get_context
+
+from django.core.management.base import BaseCommand
+
+from wagtail.documents import get_document_model
+
+from documents.workers import extract_document_text, init_worker
+
+
+class Command(BaseCommand):
+    help = "Extract the text of existing documents for search, skipping files whose text is up to date."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--workers", type=int, default=4)
+        parser.add_argument(
+            "--force", action="store_true", help="Extract again even if the file hasn't changed."
+        )
+
+    def handle(self, *args, **options):
+        documents = list(get_document_model().objects.values_list("pk", flat=True))
+
+        start = time.monotonic()
+        extracted = failed = 0
+        with ProcessPoolExecutor(
+            max_workers=options["workers"],
+            mp_context=get_context("spawn"),
+            initializer=init_worker,
+        ) as executor:
+            futures = {
+                executor.submit(extract_document_text, document_id, options["force"]): document_id
+                for document_id in documents
+            }
+            for future in as_completed(futures):
+                try:
+                    extracted += future.result()
+                except Exception as e:
+                    failed += 1
+                    self.stderr.write(f"Document {futures[future]}: {e}")
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Extracted text from {extracted} of {len(documents)} documents "
+                f"in {time.monotonic() - start:.1f}s ({failed} failed)."
+            )
+        )
@@ -0,0 +1,32 @@
+# Generated by Django 5.1.15 on 2026-10-18 07:06
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('documents', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='customdocument',
+            name='extracted_text_hash',
+            field=models.CharField(blank=True, editable=False, max_length=40),
+        ),
+        migrations.CreateModel(
+            name='DocumentTextChunk',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('position', models.PositiveIntegerField()),
+                ('text', models.TextField()),
+                ('document', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='text_chunks', to='documents.customdocument')),
+            ],
+            options={
+                'ordering': ['position'],
+                'constraints': [models.UniqueConstraint(fields=('document', 'position'), name='unique_document_text_chunk')],
+            },
+        ),
+    ]
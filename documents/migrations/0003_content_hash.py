@@ -0,0 +1,18 @@
+# Generated by Django 5.1.15 on 2026-10-18 07:08
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('documents', '0002_document_text_chunks'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='customdocument',
+            name='content_hash',
+            field=models.CharField(blank=True, db_index=True, editable=False, max_length=64),
+        ),
+    ]
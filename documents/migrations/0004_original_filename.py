@@ -0,0 +1,18 @@
+# Generated by Django 5.1.15 on 2026-10-18 07:28
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('documents', '0003_content_hash'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='customdocument',
+            name='original_filename',
+            field=models.CharField(blank=True, editable=False, max_length=255),
+        ),
+    ]
@@ -1,12 +1,65 @@
+from django.conf import settings
 from django.db import models
+from django.db.models import Prefetch
 
 from wagtail.documents.models import AbstractDocument, Document
+from wagtail.search import index
 
+from documents.workers import CHUNK_LENGTH
+from filestore.models import DeduplicatedFile
 
-class CustomDocument(AbstractDocument):
+
+def _search_text_limits():
+    # How much of a document's text is indexed, in characters and chunks
+    length = getattr(settings, "DOCUMENT_SEARCH_TEXT_LENGTH", 100_000)
+    return length, -(-length // CHUNK_LENGTH)
+
+
+class CustomDocument(DeduplicatedFile, AbstractDocument):
     description = models.CharField(blank=True, max_length=255)
+    # The file_hash of the file text_chunks were extracted from
+    extracted_text_hash = models.CharField(max_length=40, blank=True, editable=False)
 
     admin_form_fields = Document.admin_form_fields + (
         "description",
     )
-    
+
+    search_fields = AbstractDocument.search_fields + [
+        index.SearchField("description"),
+        index.SearchField("extracted_text"),
+    ]
+
+    class Meta(AbstractDocument.Meta):
+        # Keep "document" rather than DeduplicatedFile's default name
+        pass
+
+    @classmethod
+    def get_indexed_objects(cls):
+        # Only the chunks extracted_text() uses
+        _, chunks = _search_text_limits()
+        return (
+            super()
+            .get_indexed_objects()
+            .prefetch_related(
+                Prefetch("text_chunks", queryset=DocumentTextChunk.objects.filter(position__lt=chunks))
+            )
+        )
+
+    def extracted_text(self):
+        """
+        The file's text, up to DOCUMENT_SEARCH_TEXT_LENGTH characters of it.
+        """
+        length, chunks = _search_text_limits()
+        return " ".join(chunk.text for chunk in self.text_chunks.all()[:chunks])[:length]
+
+
+class DocumentTextChunk(models.Model):
+    document = models.ForeignKey(CustomDocument, on_delete=models.CASCADE, related_name="text_chunks")
+    position = models.PositiveIntegerField()
+    text = models.TextField()
+
+    class Meta:
+        ordering = ["position"]
+        constraints = [
+            models.UniqueConstraint(fields=["document", "position"], name="unique_document_text_chunk")
+        ]
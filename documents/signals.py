@@ -0,0 +1,12 @@
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+
+from documents.extraction import queue_text_extraction
+from documents.models import CustomDocument
+
+
+@receiver(post_save, sender=CustomDocument)
+def extract_text(sender, instance, **kwargs):
+    # Only new or replaced files; the worker's own save leaves the hashes equal
+    if instance.extracted_text_hash != instance.file_hash or not instance.file_hash:
+        queue_text_extraction(instance)
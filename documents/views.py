@@ -1,3 +1,175 @@
-from django.shortcuts import render
+import os
+import re
+from urllib.parse import quote
 
-# Create your views here.
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.http import FileResponse, Http404, HttpResponse
+from django.shortcuts import get_object_or_404
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, parse_http_date_safe, quote_etag
+from django.views.decorators.http import require_safe
+
+from wagtail import hooks
+from wagtail.documents import get_document_model
+from wagtail.documents.models import document_served
+from wagtail.documents.views import serve as wagtail_serve
+
+
+RANGE_RE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+class FileRange:
+    """
+    `length` bytes of `file` from its current position. WSGI servers with a
+    sendfile()-based wsgi.file_wrapper (gunicorn) send it straight from the
+    file descriptor, bounded by Content-Length; others read it in chunks.
+    """
+
+    def __init__(self, file, length):
+        self.file = file
+        self.remaining = length
+
+    def read(self, size=-1):
+        if size < 0 or size > self.remaining:
+            size = self.remaining
+        data = self.file.read(size)
+        self.remaining -= len(data)
+        return data
+
+    def fileno(self):
+        return self.file.fileno()
+
+    def close(self):
+        self.file.close()
+
+
+def parse_range(header, size):
+    """
+    The (first, last) byte positions a `Range` header asks for from a file
+    of `size` bytes, or None to send the whole file (no header, a malformed
+    one, or several ranges). Raises ValueError if the range can't be
+    satisfied.
+    """
+    match = RANGE_RE.match(header.replace(" ", "")) if header else None
+    if match is None:
+        return None
+
+    first, last = match.groups()
+    if not first:
+        # The last `last` bytes
+        if not last or int(last) == 0 or size == 0:
+            raise ValueError("Unsatisfiable range")
+        return max(size - int(last), 0), size - 1
+
+    first = int(first)
+    if last and int(last) < first:
+        return None
+    if first >= size:
+        raise ValueError("Unsatisfiable range")
+    return first, min(int(last), size - 1) if last else size - 1
+
+
+def _if_range_matches(request, etag, last_modified):
+    if_range = request.headers.get("If-Range")
+    if not if_range:
+        return True
+    if if_range.startswith(("W/", '"')):
+        # Strong comparison; weak validators never match
+        return if_range == etag
+    return parse_http_date_safe(if_range) == last_modified
+
+
+def _offload(doc, local_path):
+    # Let the web server in front send the file (it handles Range itself)
+    method = getattr(settings, "DOCUMENTS_SERVE_OFFLOAD", None)
+    response = HttpResponse(content_type=doc.content_type)
+    if method == "x-accel-redirect":
+        # An nginx `internal` location aliased to MEDIA_ROOT
+        prefix = getattr(settings, "DOCUMENTS_OFFLOAD_PREFIX", "/protected-media/")
+        response["X-Accel-Redirect"] = prefix.rstrip("/") + "/" + quote(doc.file.name)
+    elif method == "x-sendfile":
+        response["X-Sendfile"] = local_path
+    else:
+        raise ImproperlyConfigured(
+            f"DOCUMENTS_SERVE_OFFLOAD must be 'x-accel-redirect', 'x-sendfile' or None, not {method!r}"
+        )
+    return response
+
+
+@require_safe
+def serve(request, document_id, document_filename):
+    """
+    Wagtail's document view for locally stored files, with byte ranges, a
+    content-hash ETag and the file sent by sendfile() or handed off to the
+    web server (DOCUMENTS_SERVE_OFFLOAD) rather than copied through Python.
+    """
+    Document = get_document_model()
+    doc = get_object_or_404(Document, id=document_id)
+    if doc.filename != document_filename:
+        raise Http404("This document does not match the given filename.")
+
+    try:
+        local_path = doc.file.path
+    except NotImplementedError:
+        local_path = None
+    if local_path is None or getattr(settings, "WAGTAILDOCS_SERVE_METHOD", None) in ("redirect", "direct"):
+        # Remote storage: Wagtail's view redirects to it or streams from it
+        return wagtail_serve.serve(request, document_id, document_filename)
+
+    for fn in hooks.get_hooks("before_serve_document"):
+        result = fn(doc, request)
+        if isinstance(result, HttpResponse):
+            return result
+
+    try:
+        stat = os.stat(local_path)
+    except FileNotFoundError:
+        raise Http404("This document's file is missing.")
+
+    # Hashed on upload; documents from before then are hashed (and the hash
+    # stored) the first time they're served
+    etag = quote_etag(doc.get_file_hash())
+    last_modified = int(stat.st_mtime)
+
+    response = HttpResponse()
+    response["ETag"] = etag
+    response["Last-Modified"] = http_date(last_modified)
+    not_modified = get_conditional_response(
+        request, etag=etag, last_modified=last_modified, response=response
+    )
+    if not_modified is not response:
+        return not_modified
+
+    document_served.send(sender=Document, instance=doc, request=request)
+
+    if getattr(settings, "DOCUMENTS_SERVE_OFFLOAD", None):
+        response = _offload(doc, local_path)
+    else:
+        size = stat.st_size
+        byte_range = None
+        if _if_range_matches(request, etag, last_modified):
+            try:
+                byte_range = parse_range(request.headers.get("Range"), size)
+            except ValueError:
+                response = HttpResponse(status=416)
+                response["Content-Range"] = f"bytes */{size}"
+                return response
+
+        file = open(local_path, "rb")
+        if byte_range is None:
+            response = FileResponse(file, content_type=doc.content_type)
+        else:
+            first, last = byte_range
+            file.seek(first)
+            response = FileResponse(
+                FileRange(file, last - first + 1), status=206, content_type=doc.content_type
+            )
+            response["Content-Range"] = f"bytes {first}-{last}/{size}"
+            response["Content-Length"] = last - first + 1
+        response["Accept-Ranges"] = "bytes"
+
+    response["Content-Disposition"] = doc.content_disposition
+    response["ETag"] = etag
+    response["Last-Modified"] = http_date(last_modified)
+    return response
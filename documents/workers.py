@@ -0,0 +1,83 @@
+# Runs inside text extraction worker processes: nothing Django-dependent may
+# be imported at module level, as it is loaded before Django is set up.
+
+# Characters per stored DocumentTextChunk
+CHUNK_LENGTH = 10_000
+
+
+def init_worker():
+    import django
+
+    django.setup()
+
+
+def extract_document_text(document_id, force=False):
+    """
+    Extract the document's text into its text chunks, unless they already
+    hold the text of this exact file. Returns whether anything changed.
+    """
+    import logging
+
+    from django.conf import settings
+    from django.db import close_old_connections, transaction
+
+    from wagtail.documents import get_document_model
+    from wagtail.utils.file import hash_filelike
+
+    from documents.extractors import chunk_text, extract_text
+    from documents.models import DocumentTextChunk
+
+    close_old_connections()
+
+    Document = get_document_model()
+    try:
+        doc = Document.objects.get(pk=document_id)
+    except Document.DoesNotExist:
+        return False
+
+    if not doc.file_hash:
+        # Uploaded before Wagtail hashed files; update() rather than save()
+        # so this doesn't queue another extraction
+        with doc.open_file() as f:
+            doc.file_hash = hash_filelike(f)
+        Document.objects.filter(pk=doc.pk).update(file_hash=doc.file_hash)
+
+    if doc.extracted_text_hash == doc.file_hash and not force:
+        return False
+
+    # The same file uploaded again (bulk uploads often repeat files) reuses
+    # the text already extracted from it
+    source = (
+        Document.objects.filter(extracted_text_hash=doc.file_hash)
+        .exclude(pk=doc.pk)
+        .first()
+    )
+    if source is not None and not force:
+        chunks = list(source.text_chunks.values_list("text", flat=True))
+    else:
+        try:
+            with doc.open_file() as f:
+                text = extract_text(
+                    f,
+                    doc.file_extension,
+                    getattr(settings, "DOCUMENT_TEXT_MAX_LENGTH", 1_000_000),
+                )
+        except Exception:
+            # Corrupt or unreadable files are left without text rather than
+            # retried on every save
+            logging.getLogger(__name__).exception("Extracting text from %s failed", doc)
+            text = None
+        chunks = chunk_text(text, CHUNK_LENGTH) if text else []
+
+    with transaction.atomic():
+        DocumentTextChunk.objects.filter(document=doc).delete()
+        DocumentTextChunk.objects.bulk_create(
+            [
+                DocumentTextChunk(document=doc, position=position, text=chunk)
+                for position, chunk in enumerate(chunks)
+            ]
+        )
+        doc.extracted_text_hash = doc.file_hash
+        # Queues the document for search indexing
+        doc.save(update_fields=["extracted_text_hash"])
+    return True
@@ -0,0 +1,11 @@
+from django.apps import AppConfig
+
+
+class FilestoreConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'filestore'
+
+    def ready(self):
+        # Listed after wagtail.images and wagtail.documents in INSTALLED_APPS,
+        # so their file cleanup handlers are connected by now
+        from filestore import signals  # noqa: F401
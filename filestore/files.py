@@ -0,0 +1,23 @@
+import hashlib
+
+
+CHUNK_SIZE = 1024 * 1024
+
+
+def hash_file(file):
+    """
+    SHA-256 of a Django File's contents, read a chunk at a time.
+    """
+    digest = hashlib.sha256()
+    for chunk in file.chunks(CHUNK_SIZE):
+        digest.update(chunk)
+    file.seek(0)
+    return digest.hexdigest()
+
+
+def delete_file_if_unused(model, storage, name):
+    """
+    Delete `name` from `storage` unless a `model` row still refers to it.
+    """
+    if name and not model._default_manager.filter(file=name).exists():
+        storage.delete(name)
@@ -0,0 +1,22 @@
+from filestore.files import delete_file_if_unused
+
+
+class SharedFileFormMixin:
+    """
+    For Wagtail's image and document forms, which delete the old file
+    outright when it's replaced, even if another row shares it.
+    """
+
+    def delete_derived_files(self):
+        pass
+
+    def save(self, commit=True):
+        original_file = self.original_file
+        if not (commit and "file" in self.changed_data and original_file):
+            return super().save(commit=commit)
+
+        self.original_file = None
+        self.delete_derived_files()
+        instance = super().save(commit=commit)
+        delete_file_if_unused(type(instance), original_file.storage, original_file.name)
+        return instance
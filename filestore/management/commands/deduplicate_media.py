@@ -0,0 +1,130 @@
+import os
+import time
+from collections import defaultdict
+from functools import partial
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.template.defaultfilters import filesizeformat
+
+from wagtail.documents import get_document_model
+from wagtail.images import get_image_model
+
+from caching.dependencies import invalidate
+from filestore.files import delete_file_if_unused, hash_file
+
+
+class Command(BaseCommand):
+    help = (
+        "Hash existing image and document files, point rows with identical "
+        "content at one copy of the file and delete the others."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--workers", type=int, default=8, help="Files hashed at once.")
+        parser.add_argument(
+            "--dry-run", action="store_true", help="Report what would be merged without changing anything."
+        )
+
+    def handle(self, *args, **options):
+        start = time.monotonic()
+        reclaimed = 0
+        for model in [get_image_model(), get_document_model()]:
+            reclaimed += self.deduplicate(model, options["workers"], options["dry_run"])
+
+        verb = "Would reclaim" if options["dry_run"] else "Reclaimed"
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{verb} {filesizeformat(reclaimed)} in {time.monotonic() - start:.1f}s."
+            )
+        )
+
+    def hash_files(self, model, workers):
+        storage = model._meta.get_field("file").storage
+        rows = list(model.objects.filter(content_hash="").values_list("pk", "file"))
+
+        def hash_row(row):
+            pk, name = row
+            try:
+                with storage.open(name, "rb") as f:
+                    return pk, hash_file(f)
+            except FileNotFoundError:
+                self.stderr.write(f"{model._meta.verbose_name} {pk}: {name} is missing")
+                return pk, None
+
+        # Hashing is I/O and hashlib (which releases the GIL), so threads do
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            return {pk: content_hash for pk, content_hash in executor.map(hash_row, rows) if content_hash}
+
+    def deduplicate(self, model, workers, dry_run):
+        storage = model._meta.get_field("file").storage
+        hashes = self.hash_files(model, workers)
+        if not dry_run:
+            model.objects.bulk_update(
+                [model(pk=pk, content_hash=content_hash) for pk, content_hash in hashes.items()],
+                ["content_hash"],
+                batch_size=500,
+            )
+
+        groups = defaultdict(list)
+        for pk, name, content_hash in model.objects.order_by("pk").values_list("pk", "file", "content_hash"):
+            content_hash = hashes.get(pk, content_hash)
+            if content_hash:
+                groups[content_hash].append((pk, name))
+
+        reclaimed = merged = 0
+        for rows in groups.values():
+            # The oldest row's file is kept
+            keeper_pk, keeper_name = rows[0]
+            duplicates = [(pk, name) for pk, name in rows if name != keeper_name]
+            if not duplicates:
+                continue
+
+            with transaction.atomic():
+                keeper = model.objects.get(pk=keeper_pk)
+                for name in {name for _, name in duplicates}:
+                    if storage.exists(name):
+                        reclaimed += storage.size(name)
+                for obj in model.objects.filter(pk__in=[pk for pk, _ in duplicates]):
+                    reclaimed += self.derived_file_size(obj)
+                    merged += 1
+                    if dry_run:
+                        continue
+                    old_name = obj.file.name
+                    # Still downloaded under the name it was uploaded as
+                    original_filename = obj.original_filename or os.path.basename(old_name)
+                    model.objects.filter(pk=obj.pk).update(
+                        file=keeper_name, original_filename=original_filename
+                    )
+                    obj.file = keeper_name
+                    self.delete_derived_files(obj)
+                    obj.share_duplicate(keeper)
+                    # update() sends no signals, so cached pages showing it
+                    # are dropped here
+                    transaction.on_commit(partial(invalidate, obj))
+                    transaction.on_commit(partial(delete_file_if_unused, model, storage, old_name))
+
+        self.stdout.write(
+            f"{model._meta.verbose_name_plural}: hashed {len(hashes)}, "
+            f"{'would merge' if dry_run else 'merged'} {merged} duplicates"
+        )
+        return reclaimed
+
+    def derived_file_size(self, obj):
+        # Rendition files only this image uses, which merging replaces with
+        # the kept image's
+        if not hasattr(obj, "renditions"):
+            return 0
+        Rendition = obj.get_rendition_model()
+        storage = Rendition._meta.get_field("file").storage
+        size = 0
+        for name in obj.renditions.values_list("file", flat=True):
+            if not Rendition.objects.filter(file=name).exclude(image=obj).exists() and storage.exists(name):
+                size += storage.size(name)
+        return size
+
+    def delete_derived_files(self, obj):
+        if hasattr(obj, "renditions"):
+            # Their files are deleted on commit once nothing refers to them
+            obj.renditions.all().delete()
@@ -0,0 +1,62 @@
+import os
+
+from django.db import models, transaction
+
+from filestore.files import hash_file
+
+
+class DeduplicatedFile(models.Model):
+    """
+    A model whose `file` isn't stored again when the same content has been
+    uploaded before: the new row points at the existing file instead.
+    Deleting or replacing a file only removes it from storage once no row
+    refers to it (see filestore.signals).
+    """
+
+    content_hash = models.CharField(max_length=64, blank=True, editable=False, db_index=True)
+    # The name this row's file was uploaded as, when it's stored under
+    # another row's name
+    original_filename = models.CharField(max_length=255, blank=True, editable=False)
+
+    class Meta:
+        abstract = True
+
+    @property
+    def filename(self):
+        return self.original_filename or os.path.basename(self.file.name)
+
+    def find_duplicate(self):
+        storage = self._meta.get_field("file").storage
+        for original in (
+            type(self)._default_manager.filter(content_hash=self.content_hash)
+            .exclude(pk=self.pk)
+            .order_by("pk")
+        ):
+            if storage.exists(original.file.name):
+                return original
+        return None
+
+    def share_duplicate(self, original):
+        """
+        Called once saved with `original`'s file, to reuse whatever else
+        was derived from it.
+        """
+
+    def save(self, *args, **kwargs):
+        if not self.file or self.file._committed:
+            return super().save(*args, **kwargs)
+
+        # A new upload, not yet written to storage
+        self.content_hash = hash_file(self.file)
+        original = self.find_duplicate()
+        if original is None:
+            self.original_filename = ""
+            return super().save(*args, **kwargs)
+
+        self.original_filename = os.path.basename(self.file.name)
+        self.file = original.file.name
+        # Anything queued on commit by post_save (rendition generation, text
+        # extraction) sees what share_duplicate() copies
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            self.share_duplicate(original)
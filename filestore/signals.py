@@ -0,0 +1,28 @@
+from django.db import transaction
+from django.db.models.signals import post_delete
+
+from wagtail.documents import get_document_model
+from wagtail.documents import signal_handlers as document_signal_handlers
+from wagtail.images import get_image_model
+from wagtail.images import signal_handlers as image_signal_handlers
+
+from filestore.files import delete_file_if_unused
+
+
+def delete_unused_file(sender, instance, **kwargs):
+    storage, name = instance.file.storage, instance.file.name
+    transaction.on_commit(lambda: delete_file_if_unused(sender, storage, name))
+
+
+Image = get_image_model()
+Rendition = Image.get_rendition_model()
+Document = get_document_model()
+
+# Wagtail deletes the file with the row; deduplicated files may be shared
+for model, handler in [
+    (Image, image_signal_handlers.post_delete_file_cleanup),
+    (Rendition, image_signal_handlers.post_delete_file_cleanup),
+    (Document, document_signal_handlers.post_delete_file_cleanup),
+]:
+    post_delete.disconnect(handler, sender=model)
+    post_delete.connect(delete_unused_file, sender=model)
@@ -18,6 +18,9 @@ from wagtail.documents import get_document_model
 
 from modelcluster.fields import ParentalKey
 
+from images.prefetch import prefetch_renditions
+from images.rendition_sets import rendition_set_specs
+
 class HomePageGalleryImage(Orderable):
     page = ParentalKey("home.HomePage", related_name="gallery_images", on_delete=models.CASCADE)
     image = models.ForeignKey(
@@ -134,6 +137,17 @@ class HomePage(Page):
         # FieldPanel("custom_documents"),
     ]
 
+    def get_context(self, request, *args, **kwargs):
+        context = super().get_context(request, *args, **kwargs)
+
+        # Images and their renditions in one query each, not one per gallery item
+        gallery_images = list(self.gallery_images.select_related("image"))
+        prefetch_renditions(
+            [item.image for item in gallery_images], rendition_set_specs("gallery")
+        )
+        context["gallery_images"] = gallery_images
+        return context
+
     @property
     def get_cta_url(self):
         if self.cta_url:
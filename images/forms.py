@@ -0,0 +1,8 @@
+from wagtail.images.forms import BaseImageForm
+
+from filestore.forms import SharedFileFormMixin
+
+
+class ImageForm(SharedFileFormMixin, BaseImageForm):
+    def delete_derived_files(self):
+        self.instance.renditions.all().delete()
@@ -0,0 +1,155 @@
+"""
+Several renditions of an image from a single decode of its file.
+
+Wagtail's create_renditions() reads the file once but decodes it again for
+every filter, and resizes every rendition from the full-size original. Here
+the file is decoded (and EXIF-oriented) once, and each filter's Filter.run()
+crops and resizes that in-memory image; Willow's operations return new
+images, so the shared source is never modified.
+
+Renditions are generated largest first, and a rendition cropped to the same
+area as a larger one is resized from that larger one instead of from the
+original, so a set of sizes costs little more than its largest member.
+"""
+
+from contextlib import contextmanager
+
+from django.db.models import Q
+
+from wagtail.images.models import Filter
+from willow.image import Image as WillowImage
+from willow.plugins.pillow import PillowImage
+
+
+class DecodedImage(PillowImage):
+    def __init__(self, image, format_name):
+        super().__init__(image)
+        # Filter.run() picks the default output format from this
+        self.format_name = format_name
+        # Crop rect -> [(size, image)] of the renditions resized from it so far
+        self.resized = {}
+
+    def auto_orient(self):
+        # Oriented once, when decoded
+        return self
+
+    def crop(self, rect):
+        # Filter.run() always resizes straight after cropping, which is
+        # where the crop is made
+        return CroppedSource(self, tuple(rect))
+
+
+class CroppedSource:
+    def __init__(self, source, rect):
+        self.source = source
+        self.rect = rect
+
+    def resize(self, size):
+        # Downscale from the smallest image already resized from this crop
+        # that is at least as large, rather than from the original
+        resized = self.source.resized.setdefault(self.rect, [])
+        for existing_size, image in resized:
+            if tuple(existing_size) == tuple(size):
+                # The same size in another format
+                return image
+        larger = [
+            (width * height, image)
+            for (width, height), image in resized
+            if width >= size[0] and height >= size[1]
+        ]
+        if larger:
+            image = min(larger, key=lambda item: item[0])[1]
+        else:
+            image = PillowImage.crop(self.source, self.rect)
+        image = image.resize(size)
+        resized.append((size, image))
+        return image
+
+
+def decode(file):
+    willow_file = WillowImage.open(file)
+    return DecodedImage(PillowImage.open(willow_file).auto_orient().image, willow_file.format_name)
+
+
+class DecodedSourceFilter(Filter):
+    """
+    A Filter that runs on an already decoded source image instead of
+    opening the image's file.
+    """
+
+    def __init__(self, spec, source):
+        super().__init__(spec)
+        self.source = source
+
+    @contextmanager
+    def get_willow_image(self, image, source=None):
+        yield self.source
+
+
+def output_area(filter, image, source):
+    width, height = filter.get_transform(image, source.get_size()).size
+    return width * height
+
+
+def generate_rendition_files(image, filters, source):
+    """
+    Yield a (filter, file) pair for each of `filters`, rendered from the
+    decoded `source`, largest first.
+    """
+    for filter in sorted(filters, key=lambda f: output_area(f, image, source), reverse=True):
+        yield filter, image.generate_rendition_file(DecodedSourceFilter(filter.spec, source))
+
+
+def create_renditions(image, filters):
+    """
+    Create renditions of `image` for all of `filters` from one read and
+    decode of its file, in a single bulk_create(). Returns them keyed by
+    filter, including any another process created meanwhile.
+    """
+    Rendition = image.get_rendition_model()
+    with image.open_file() as f:
+        source = decode(f)
+
+    to_create = {
+        filter: Rendition(
+            image=image,
+            filter_spec=filter.spec,
+            focal_point_key=filter.get_cache_key(image),
+            file=file,
+        )
+        for filter, file in generate_rendition_files(image, filters, source)
+    }
+
+    # As in Wagtail, renditions created by another process while these were
+    # generated are used instead. The files are only written to storage by
+    # bulk_create(), so there are none to clean up for them.
+    lookup = Q()
+    for rendition in to_create.values():
+        lookup |= Q(filter_spec=rendition.filter_spec, focal_point_key=rendition.focal_point_key)
+    existing = {
+        (rendition.filter_spec, rendition.focal_point_key): rendition
+        for rendition in image.renditions.filter(lookup)
+    }
+
+    renditions = {}
+    for filter, rendition in list(to_create.items()):
+        key = (rendition.filter_spec, rendition.focal_point_key)
+        if key in existing:
+            renditions[filter] = existing[key]
+            del to_create[filter]
+
+    Rendition.objects.bulk_create(to_create.values(), ignore_conflicts=True)
+
+    # Rows that conflicted with ones inserted by another process since the
+    # check above weren't saved, but bulk_create() still wrote their files:
+    # use the stored rows, and delete the files that lost
+    stored = {
+        (rendition.filter_spec, rendition.focal_point_key): rendition
+        for rendition in image.renditions.filter(lookup)
+    }
+    for filter, rendition in to_create.items():
+        winner = stored.get((rendition.filter_spec, rendition.focal_point_key), rendition)
+        if winner.file.name != rendition.file.name:
+            rendition.file.storage.delete(rendition.file.name)
+        renditions[filter] = winner
+    return renditions
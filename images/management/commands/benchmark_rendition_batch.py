@@ -0,0 +1,112 @@
+import os
+import time
+
+from django.core.files import File
+from django.core.management.base import BaseCommand, CommandError
+from django.template.defaultfilters import filesizeformat
+
+from wagtail.images import get_image_model
+from wagtail.images.models import Filter
+
+from images.generation import decode, generate_rendition_files
+from images.renditions import discover_filter_specs
+
+
+def bytes_read():
+    # Bytes this process has read through system calls, including from the
+    # page cache (Linux only)
+    try:
+        with open("/proc/self/io") as f:
+            for line in f:
+                if line.startswith("rchar:"):
+                    return int(line.split()[1])
+    except OSError:
+        return None
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare the CPU time and bytes read of generating every rendition of "
+        "a sample of images one filter spec at a time, as create_rendition() "
+        "does, against decoding each original once. Nothing is saved."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--images", type=int, default=50, help="Number of recent images to use.")
+        parser.add_argument("--directory", help="Use the image files in this directory instead.")
+        parser.add_argument(
+            "--spec",
+            action="append",
+            dest="specs",
+            help="A filter spec to generate (repeatable). Defaults to those the templates use.",
+        )
+        parser.add_argument("--repeat", type=int, default=3, help="Runs of each path; the best is reported.")
+
+    def load_samples(self, options):
+        Image = get_image_model()
+        if options["directory"]:
+            for filename in sorted(os.listdir(options["directory"])):
+                path = os.path.join(options["directory"], filename)
+                with open(path, "rb") as f:
+                    try:
+                        source = decode(f)
+                    except Exception:
+                        continue
+                # Unsaved, only for its name and dimensions (no focal point)
+                image = Image(file=filename, width=source.image.width, height=source.image.height)
+                yield image, lambda path=path: open(path, "rb")
+        else:
+            for image in Image.objects.order_by("-created_at")[: options["images"]]:
+                if not image.is_svg():
+                    yield image, image.open_file
+
+    def per_spec(self, samples, specs):
+        for image, open_source in samples:
+            for spec in specs:
+                with open_source() as f:
+                    image.generate_rendition_file(Filter(spec), source=File(f, name=image.file.name))
+
+    def batch(self, samples, specs):
+        for image, open_source in samples:
+            with open_source() as f:
+                source = decode(f)
+            for _ in generate_rendition_files(image, [Filter(spec) for spec in specs], source):
+                pass
+
+    def measure(self, path, samples, specs, repeat):
+        best = None
+        for _ in range(repeat):
+            read_before = bytes_read()
+            cpu_before = time.process_time()
+            wall_before = time.perf_counter()
+            path(samples, specs)
+            result = (
+                time.process_time() - cpu_before,
+                time.perf_counter() - wall_before,
+                None if read_before is None else bytes_read() - read_before,
+            )
+            if best is None or result[0] < best[0]:
+                best = result
+        return best
+
+    def handle(self, *args, **options):
+        samples = list(self.load_samples(options))
+        if not samples:
+            raise CommandError("No images to sample.")
+        specs = options["specs"] or discover_filter_specs()
+        self.stdout.write(f"{len(samples)} images x {len(specs)} filter specs")
+
+        results = {
+            "per spec": (self.measure(self.per_spec, samples, specs, options["repeat"]), len(specs)),
+            "single decode": (self.measure(self.batch, samples, specs, options["repeat"]), 1),
+        }
+        self.stdout.write(f"{'path':<14} {'cpu':>8} {'wall':>8} {'opens':>7} {'read':>10}")
+        for name, ((cpu, wall, read), opens) in results.items():
+            read = "n/a" if read is None else filesizeformat(read)
+            self.stdout.write(
+                f"{name:<14} {cpu:>7.2f}s {wall:>7.2f}s {opens * len(samples):>7} {read:>10}"
+            )
+
+        (per_spec_cpu, *_), _ = results["per spec"]
+        (batch_cpu, *_), _ = results["single decode"]
+        self.stdout.write(self.style.SUCCESS(f"CPU time {1 - batch_cpu / per_spec_cpu:.0%} lower."))
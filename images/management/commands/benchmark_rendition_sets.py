@@ -0,0 +1,76 @@
+import os
+from collections import defaultdict
+from io import BytesIO
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.template.defaultfilters import filesizeformat
+
+from wagtail.images import get_image_model
+from wagtail.images.models import Filter
+
+from images.generation import DecodedSourceFilter, decode
+from images.rendition_sets import get_rendition_sets
+
+
+class Command(BaseCommand):
+    help = (
+        "Total the file sizes of every size and format of the rendition sets over "
+        "a sample of images, against serving everyone the largest size in the "
+        "original's format as a single {% image %} does. Nothing is saved."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--images", type=int, default=50, help="Number of recent images to use.")
+        parser.add_argument("--directory", help="Use the image files in this directory instead.")
+
+    def load_sources(self, options):
+        Image = get_image_model()
+        if options["directory"]:
+            for filename in sorted(os.listdir(options["directory"])):
+                with open(os.path.join(options["directory"], filename), "rb") as f:
+                    try:
+                        source = decode(f)
+                    except Exception:
+                        continue
+                # Unsaved, only for its dimensions (no focal point)
+                yield Image(width=source.image.width, height=source.image.height), source
+        else:
+            for image in Image.objects.order_by("-created_at")[: options["images"]]:
+                if not image.is_svg():
+                    with image.open_file() as f:
+                        yield image, decode(f)
+
+    def handle(self, *args, **options):
+        sources = list(self.load_sources(options))
+        if not sources:
+            raise CommandError("No images to sample.")
+
+        formats = getattr(settings, "IMAGE_RENDITION_FORMATS", ["avif", "webp", "jpeg"])
+        self.stdout.write(f"{len(sources)} images")
+
+        for name, rendition_set in get_rendition_sets().items():
+            sizes = Filter().expand_spec(rendition_set["spec"])
+            totals = defaultdict(int)
+            baseline = 0
+            for image, source in sources:
+                for size in sizes:
+                    for fmt in formats:
+                        output = DecodedSourceFilter(f"{size}|format-{fmt}", source).run(image, BytesIO())
+                        totals[size, fmt] += len(output.f.getvalue())
+                output = DecodedSourceFilter(sizes[-1], source).run(image, BytesIO())
+                baseline += len(output.f.getvalue())
+
+            self.stdout.write(
+                f"\n{name}: baseline {sizes[-1]} in the original format, {filesizeformat(baseline)}"
+            )
+            self.stdout.write(
+                f"{'size':>24} " + " ".join(f"{fmt:>10}" for fmt in formats) + f" {'saved':>7}"
+            )
+            for size in sizes:
+                smallest = min(totals[size, fmt] for fmt in formats)
+                self.stdout.write(
+                    f"{size:>24} "
+                    + " ".join(f"{filesizeformat(totals[size, fmt]):>10}" for fmt in formats)
+                    + f" {1 - smallest / baseline:>7.0%}"
+                )
@@ -0,0 +1,58 @@
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from multiprocessing import get_context
+
+from django.core.management.base import BaseCommand
+
+from wagtail.images import get_image_model
+
+from images.renditions import discover_filter_specs
+from images.workers import generate_renditions, init_worker
+
+
+class Command(BaseCommand):
+    help = "Pre-generate renditions of existing images for every filter spec the site uses."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--workers", type=int, default=4)
+        parser.add_argument(
+            "--spec",
+            action="append",
+            dest="specs",
+            help="Filter spec to generate (repeatable). Defaults to those discovered in templates and image formats.",
+        )
+
+    def handle(self, *args, **options):
+        specs = tuple(options["specs"] or discover_filter_specs())
+        self.stdout.write(f"Filter specs: {', '.join(specs)}")
+
+        images = [
+            image_id
+            for image_id, filename in get_image_model().objects.values_list("pk", "file")
+            if not filename.lower().endswith(".svg")
+        ]
+
+        start = time.monotonic()
+        created = failed = 0
+        with ProcessPoolExecutor(
+            max_workers=options["workers"],
+            mp_context=get_context("spawn"),
+            initializer=init_worker,
+        ) as executor:
+            futures = {
+                executor.submit(generate_renditions, image_id, specs): image_id
+                for image_id in images
+            }
+            for future in as_completed(futures):
+                try:
+                    created += future.result()
+                except Exception as e:
+                    failed += 1
+                    self.stderr.write(f"Image {futures[future]}: {e}")
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Created {created} renditions for {len(images)} images "
+                f"in {time.monotonic() - start:.1f}s ({failed} failed)."
+            )
+        )
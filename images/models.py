@@ -2,12 +2,67 @@ from django.db import models
 
 from wagtail.images.models import Image,AbstractImage, AbstractRendition
 
+from filestore.models import DeduplicatedFile
+from images import generation
 
-class CustomImage(AbstractImage):
+
+class CustomImage(DeduplicatedFile, AbstractImage):
     caption = models.CharField(max_length=255, blank=True)
 
     admin_form_fields = Image.admin_form_fields + ("caption",)
 
+    rendition_source_fields = (
+        "file",
+        "focal_point_x",
+        "focal_point_y",
+        "focal_point_width",
+        "focal_point_height",
+    )
+
+    def _rendition_source(self):
+        # Everything a rendition's content depends on. Read from __dict__ so
+        # deferred fields aren't loaded just to take this snapshot.
+        return tuple(str(self.__dict__.get(field)) for field in self.rendition_source_fields)
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._saved_rendition_source = instance._rendition_source()
+        return instance
+
+    @property
+    def rendition_source_changed(self):
+        return self._rendition_source() != getattr(self, "_saved_rendition_source", None)
+
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        self._saved_rendition_source = self._rendition_source()
+
+    def create_renditions(self, *filters):
+        # Decode the original once for all of them, not once per filter
+        if len(filters) < 2 or self.is_svg():
+            return super().create_renditions(*filters)
+        return generation.create_renditions(self, filters)
+
+    def share_duplicate(self, original):
+        # Renditions depend only on the file and the focal point key they
+        # record, so the original's rendition files serve this image too
+        Rendition = self.get_rendition_model()
+        Rendition.objects.bulk_create(
+            [
+                Rendition(
+                    image=self,
+                    filter_spec=rendition.filter_spec,
+                    focal_point_key=rendition.focal_point_key,
+                    file=rendition.file.name,
+                    width=rendition.width,
+                    height=rendition.height,
+                )
+                for rendition in original.renditions.all()
+            ],
+            ignore_conflicts=True,
+        )
+
 
 class CustomRendition(AbstractRendition):
     image = models.ForeignKey(CustomImage, on_delete=models.CASCADE, related_name="renditions")
@@ -0,0 +1,61 @@
+from collections import defaultdict
+
+from wagtail.images.models import AbstractImage, Filter
+
+from blocks.values import iter_leaf_values
+from images.renditions import queue_missing_renditions
+
+
+def collect_images(value):
+    """
+    Every image instance inside a (possibly nested) StreamField value.
+    """
+    return [leaf for leaf in iter_leaf_values(value) if isinstance(leaf, AbstractImage)]
+
+
+def prefetch_renditions(images, specs):
+    """
+    Attach each of `images`' existing renditions for `specs` (those the
+    template will ask for), loaded with one query for all of them, so the
+    image tags find them without their own query.
+
+    Missing renditions are queued for the rendition workers rather than
+    created during the request.
+    """
+    # The same image can appear as several instances (e.g. in different
+    # block types); they share one list so each rendition is only made once
+    instances = defaultdict(list)
+    for image in images:
+        if image is not None:
+            instances[image.pk].append(image)
+    if not instances:
+        return images
+
+    Rendition = next(iter(instances.values()))[0].get_rendition_model()
+    specs = tuple(specs)
+    filters = [Filter(spec) for spec in specs]
+
+    renditions = defaultdict(list)
+    for rendition in Rendition.objects.filter(
+        image_id__in=instances.keys(), filter_spec__in=specs
+    ):
+        # The <img> alt text comes from the image, which would otherwise be
+        # fetched again for each rendition
+        rendition.image = instances[rendition.image_id][0]
+        renditions[rendition.image_id].append(rendition)
+
+    for image_id, same_image in instances.items():
+        for image in same_image:
+            image.prefetched_renditions = renditions[image_id]
+
+        image = same_image[0]
+        if image.is_svg():
+            continue
+
+        # Looks only at the prefetched renditions, so no further queries
+        existing = image.find_existing_renditions(*filters)
+        missing = [f.spec for f in filters if f not in existing]
+        if missing:
+            queue_missing_renditions(image, missing)
+
+    return images
@@ -0,0 +1,62 @@
+from functools import lru_cache
+
+from django.conf import settings
+
+from wagtail.images.models import Filter, Picture
+from wagtail.images.shortcuts import get_renditions_or_not_found
+
+from caching.dependencies import record_dependency
+
+
+def get_rendition_sets():
+    return getattr(settings, "IMAGE_RENDITION_SETS", {})
+
+
+@lru_cache(maxsize=None)
+def rendition_set_specs(name):
+    """
+    Every filter spec of the rendition set `name`: each of its sizes in each
+    of IMAGE_RENDITION_FORMATS.
+    """
+    try:
+        spec = get_rendition_sets()[name]["spec"]
+    except KeyError:
+        raise ValueError(f"Unknown rendition set {name!r}")
+    return tuple(Filter().expand_spec(f"{spec}|format-{{{','.join(get_rendition_formats())}}}"))
+
+
+def get_rendition_formats():
+    return getattr(settings, "IMAGE_RENDITION_FORMATS", ["avif", "webp", "jpeg"])
+
+
+def render_rendition_set(image, name, attrs):
+    """
+    A <picture> of `image` in rendition set `name`: a <source> with a
+    srcset per modern format, and an <img> in the last format as fallback.
+
+    Only the fallback format's renditions are created during the request
+    if missing, so the <img> always works; the other formats are queued for
+    the rendition workers and their <source>s appear once they exist.
+    """
+    from images.renditions import queue_missing_renditions
+
+    attrs = {"sizes": get_rendition_sets()[name]["sizes"], **attrs}
+    specs = rendition_set_specs(name)
+    if image.is_svg():
+        return Picture(get_renditions_or_not_found(image, specs), attrs)
+
+    # The workers invalidate this image once they've made what's missing
+    record_dependency(image)
+
+    existing = image.find_existing_renditions(*[Filter(spec) for spec in specs])
+    renditions = {filter.spec: rendition for filter, rendition in existing.items()}
+    missing = [spec for spec in specs if spec not in renditions]
+    if missing:
+        queue_missing_renditions(image, missing)
+        fallback = f"format-{get_rendition_formats()[-1]}"
+        needed = [spec for spec in missing if spec.endswith(fallback)]
+        if needed:
+            renditions.update(get_renditions_or_not_found(image, needed))
+    # In the set's order, as Picture uses the first rendition of the
+    # fallback format as the <img> src
+    return Picture({spec: renditions[spec] for spec in specs if spec in renditions}, attrs)
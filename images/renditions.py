@@ -0,0 +1,124 @@
+import hashlib
+import logging
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from multiprocessing import get_context
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.template import engines
+
+from wagtail.images.formats import get_image_formats
+from wagtail.images.models import Filter
+
+from images.rendition_sets import get_rendition_sets, rendition_set_specs
+from images.workers import generate_renditions, init_worker
+
+
+logger = logging.getLogger(__name__)
+
+IMAGE_TAG_RE = re.compile(r"{%\s*(?:image|srcset_image|picture)\s+(.+?)\s*%}")
+
+
+def _specs_from_tag(arguments):
+    specs = []
+    bits = arguments.split()[1:]  # the first bit is the image expression
+    for bit in bits:
+        if bit == "as":
+            break
+        if "=" in bit or bit == "preserve-svg":
+            continue
+        specs.append(bit)
+    return Filter().expand_spec("|".join(specs)) if specs else []
+
+
+def _project_template_dirs():
+    for engine in engines.all():
+        for template_dir in engine.template_dirs:
+            if str(template_dir).startswith(str(settings.BASE_DIR)):
+                yield template_dir
+
+
+@lru_cache(maxsize=None)
+def discover_filter_specs():
+    """
+    Every filter spec the site can ask for: those used by `{% image %}` tags
+    in the project's own templates, those of the rendition sets and those of
+    registered image formats.
+    """
+    specs = set()
+
+    for template_dir in _project_template_dirs():
+        for root, dirs, files in os.walk(template_dir):
+            for filename in files:
+                if not filename.endswith(".html"):
+                    continue
+                with open(os.path.join(root, filename), encoding="utf-8") as f:
+                    for arguments in IMAGE_TAG_RE.findall(f.read()):
+                        specs.update(_specs_from_tag(arguments))
+
+    for name in get_rendition_sets():
+        specs.update(rendition_set_specs(name))
+
+    for image_format in get_image_formats():
+        specs.add(image_format.filter_spec)
+
+    return tuple(sorted(specs))
+
+
+_executor = None
+
+
+def get_executor(max_workers=None):
+    global _executor
+    if _executor is None:
+        _executor = ProcessPoolExecutor(
+            max_workers=max_workers or getattr(settings, "IMAGE_RENDITION_WORKERS", 2),
+            # A fresh interpreter rather than a fork, so workers don't share
+            # the parent's database connections
+            mp_context=get_context("spawn"),
+            initializer=init_worker,
+        )
+    return _executor
+
+
+def _log_failure(future):
+    exception = future.exception()
+    if exception is not None:
+        logger.error("Rendition pre-generation failed", exc_info=exception)
+
+
+def queue_renditions(image, specs=None):
+    """
+    Generate `image`'s renditions for `specs` (default: every known filter
+    spec) in a worker process once the current transaction commits.
+    """
+    if image.is_svg():
+        return
+
+    specs = tuple(specs or discover_filter_specs())
+    if not specs:
+        return
+
+    def submit():
+        if not getattr(settings, "IMAGE_RENDITION_WORKERS", 2):
+            generate_renditions(image.pk, specs)
+            return
+        future = get_executor().submit(generate_renditions, image.pk, specs)
+        future.add_done_callback(_log_failure)
+
+    transaction.on_commit(submit)
+
+
+def queue_missing_renditions(image, specs):
+    """
+    Queue renditions a page render found missing. Each set is queued at most
+    once a minute, however many requests find it missing before the worker
+    has made it.
+    """
+    digest = hashlib.md5("|".join(sorted(specs)).encode(), usedforsecurity=False).hexdigest()
+    if cache.add(f"renditions:queued:{image.pk}:{digest}", True, 60):
+        queue_renditions(image, specs)
@@ -0,0 +1,13 @@
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+
+from images.models import CustomImage
+from images.renditions import queue_renditions
+
+
+@receiver(post_save, sender=CustomImage)
+def pregenerate_renditions(sender, instance, **kwargs):
+    # New uploads, replaced files and moved focal points all need a fresh
+    # rendition set; other edits (title, tags...) don't.
+    if instance.rendition_source_changed:
+        queue_renditions(instance)
@@ -0,0 +1,30 @@
+from django import template
+
+from images.prefetch import collect_images, prefetch_renditions
+from images.rendition_sets import render_rendition_set, rendition_set_specs
+
+register = template.Library()
+
+
+@register.simple_tag
+def prefetch_stream_renditions(stream_value, *rendition_sets):
+    """
+    Load the renditions of the named rendition sets for every image in a
+    StreamField up front, e.g. `{% prefetch_stream_renditions page.body "block" %}`
+    before `{% include_block page.body %}`.
+    """
+    specs = [spec for name in rendition_sets for spec in rendition_set_specs(name)]
+    prefetch_renditions(collect_images(stream_value), specs)
+    return ""
+
+
+@register.simple_tag
+def rendition_set(image, name, **attrs):
+    """
+    Responsive markup for an image, e.g. `{% rendition_set self "block" alt="" %}`
+    renders a <picture> with every size and format of the "block" rendition
+    set in IMAGE_RENDITION_SETS.
+    """
+    if not image:
+        return ""
+    return render_rendition_set(image, name, attrs)
@@ -1,3 +1,93 @@
+from unittest import mock
+
+from django.core.cache import cache
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from wagtail.images import get_image_model
+from wagtail.images.models import Filter
+
+from blog.testing import PageTestMixin, make_image
+from home.models import HomePage, HomePageGalleryImage
+from images import generation
+from images.rendition_sets import rendition_set_specs
+
+
+class GalleryRenditionTests(PageTestMixin, TestCase):
+    def setUp(self):
+        self.home = HomePage.objects.get()
+        self.rendition_table = get_image_model().get_rendition_model()._meta.db_table
+
+    def make_images(self, count):
+        return [
+            make_image(f"Image {i}", f"image-{i}.jpg", (i * 40 % 256, 80, 160))
+            for i in range(count)
+        ]
+
+    def set_gallery(self, images):
+        HomePageGalleryImage.objects.filter(page=self.home).delete()
+        for image in images:
+            HomePageGalleryImage.objects.create(page=self.home, image=image)
+
+    def rendition_queries(self):
+        # The gallery was changed without publishing, so nothing invalidated
+        # the cached page
+        cache.clear()
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.home.url)
+        self.assertEqual(response.status_code, 200)
+        return [query for query in queries if self.rendition_table in query["sql"]]
+
+    def test_rendition_queries_dont_grow_with_gallery_size(self):
+        filters = [Filter(spec) for spec in rendition_set_specs("gallery")]
+        counts = []
+        for images in (self.make_images(2), self.make_images(4)):
+            for image in images:
+                image.create_renditions(*filters)
+            self.set_gallery(images)
+            counts.append(len(self.rendition_queries()))
+        self.assertEqual(counts, [1, 1])
+
+    def test_missing_renditions_are_queued_not_created(self):
+        images = self.make_images(2)
+        self.set_gallery(images)
+
+        with self.captureOnCommitCallbacks() as callbacks:
+            self.client.get(self.home.url)
+
+        # Only the fallback format's sizes are made during the request
+        created = set(
+            get_image_model().get_rendition_model().objects.values_list("filter_spec", flat=True)
+        )
+        self.assertEqual(
+            created, {spec for spec in rendition_set_specs("gallery") if spec.endswith("format-jpeg")}
+        )
+        self.assertEqual(len(callbacks), len(images))
+
+    def test_renditions_created_meanwhile_win_and_lost_files_are_deleted(self):
+        (image,) = self.make_images(1)
+        filters = [Filter(spec) for spec in rendition_set_specs("gallery")[:2]]
+        generate = generation.generate_rendition_files
+
+        def generate_while_another_process_creates(image, filters, source):
+            # Another process creates the first rendition after the check
+            # for existing ones
+            competing = image.create_rendition(filters[0])
+            competing_files.append(competing.file.name)
+            yield from generate(image, filters, source)
+
+        competing_files = []
+        storage = image.renditions.model.file.field.storage
+        files_before = set(storage.listdir("images")[1])
+        with mock.patch.object(
+            generation, "generate_rendition_files", generate_while_another_process_creates
+        ):
+            renditions = image.create_renditions(*filters)
 
-# Create your tests here.
+        self.assertEqual(renditions[filters[0]].file.name, competing_files[0])
+        self.assertTrue(all(rendition.pk for rendition in renditions.values()))
+        files_written = {
+            f"images/{name}" for name in set(storage.listdir("images")[1]) - files_before
+        }
+        self.assertEqual(files_written, set(image.renditions.values_list("file", flat=True)))
@@ -0,0 +1,38 @@
+# Runs inside rendition worker processes: nothing Django-dependent may be
+# imported at module level, as it is loaded before Django is set up.
+
+
+def init_worker():
+    import django
+
+    django.setup()
+
+
+def generate_renditions(image_id, specs):
+    """
+    Create whichever of `specs` the image doesn't have a rendition for yet.
+    Returns how many were created.
+    """
+    from django.db import close_old_connections
+
+    from wagtail.images import get_image_model
+    from wagtail.images.models import Filter
+
+    from caching.dependencies import invalidate
+
+    close_old_connections()
+
+    Image = get_image_model()
+    try:
+        image = Image.objects.get(pk=image_id)
+    except Image.DoesNotExist:
+        return 0
+
+    filters = [Filter(spec) for spec in specs]
+    existing = image.find_existing_renditions(*filters)
+    missing = [f for f in filters if f not in existing]
+    if missing:
+        image.create_renditions(*missing)
+        # Pages rendered while these were missing used only what existed
+        invalidate(image)
+    return len(missing)
@@ -0,0 +1,153 @@
+"""
+Search analytics without a database write per search.
+
+Each search is counted in memory (hits, zero-result hits, latency per query
+and day), and the totals are written every SEARCH_ANALYTICS_FLUSH_INTERVAL
+seconds by a background thread (started by the first search in each
+process) as one batch of upserts: into
+SearchQueryStats for our reports, and into the search promotions module's
+Query/QueryDailyHits so its popular queries are filled in.
+"""
+
+import atexit
+import logging
+import os
+import threading
+
+from django.conf import settings
+from django.db import close_old_connections, connection, transaction
+from django.utils import timezone
+
+from wagtail.contrib.search_promotions.models import Query, QueryDailyHits
+from wagtail.search.utils import MAX_QUERY_STRING_LENGTH, normalise_query_string
+
+from search.models import SearchQueryStats
+
+
+logger = logging.getLogger(__name__)
+
+# Flush early rather than let a flood of distinct queries grow without bound
+MAX_PENDING_QUERIES = 1000
+
+
+def _upsert(model, unique_fields, add_fields, max_fields, rows):
+    """
+    INSERT ... ON CONFLICT DO UPDATE, adding `add_fields` to the existing
+    row and keeping the larger of `max_fields`. Both SQLite and PostgreSQL
+    support this, and unlike read-modify-write it is safe with several
+    processes flushing at once.
+    """
+    if not rows:
+        return
+
+    quote = connection.ops.quote_name
+    table = quote(model._meta.db_table)
+    fields = [model._meta.get_field(name) for name in unique_fields + add_fields + max_fields]
+    updates = [f"{quote(name)} = {table}.{quote(name)} + excluded.{quote(name)}" for name in add_fields]
+    updates += [
+        f"{quote(name)} = CASE WHEN excluded.{quote(name)} > {table}.{quote(name)} "
+        f"THEN excluded.{quote(name)} ELSE {table}.{quote(name)} END"
+        for name in max_fields
+    ]
+    sql = (
+        f"INSERT INTO {table} ({', '.join(quote(field.column) for field in fields)}) "
+        f"VALUES ({', '.join(['%s'] * len(fields))}) "
+        f"ON CONFLICT ({', '.join(quote(model._meta.get_field(name).column) for name in unique_fields)}) "
+        f"DO UPDATE SET {', '.join(updates)}"
+    )
+    with connection.cursor() as cursor:
+        cursor.executemany(
+            sql,
+            [
+                [field.get_db_prep_save(value, connection) for field, value in zip(fields, row)]
+                for row in rows
+            ],
+        )
+
+
+class SearchAnalytics:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.pending = {}
+        # Set to flush before the interval is up
+        self.wake = threading.Event()
+        self.thread = None
+        self.thread_pid = None
+
+    def record(self, query, result_count, latency):
+        """
+        Count one search for `query` that found `result_count` results in
+        `latency` seconds.
+        """
+        key = (timezone.localdate(), query[:255])
+        latency_ms = latency * 1000
+
+        with self.lock:
+            stats = self.pending.setdefault(key, [0, 0, 0.0, 0.0])
+            stats[0] += 1
+            stats[1] += result_count == 0
+            stats[2] += latency_ms
+            stats[3] = max(stats[3], latency_ms)
+
+            # Threads don't survive a fork, so each worker process starts its own
+            if self.thread_pid != os.getpid():
+                self.thread_pid = os.getpid()
+                self.thread = threading.Thread(
+                    target=self._flush_periodically, name="search-analytics", daemon=True
+                )
+                self.thread.start()
+            if len(self.pending) >= MAX_PENDING_QUERIES:
+                self.wake.set()
+
+    def _flush_periodically(self):
+        while True:
+            self.wake.wait(getattr(settings, "SEARCH_ANALYTICS_FLUSH_INTERVAL", 30))
+            self.wake.clear()
+            close_old_connections()
+            try:
+                self.flush()
+            except Exception:
+                logger.exception("Writing search analytics failed")
+            finally:
+                close_old_connections()
+
+    def flush(self):
+        with self.lock:
+            pending, self.pending = self.pending, {}
+        if not pending:
+            return
+
+        with transaction.atomic():
+            _upsert(
+                SearchQueryStats,
+                ["date", "query_string"],
+                ["hits", "zero_result_hits", "total_latency"],
+                ["max_latency"],
+                [(date, query, *stats) for (date, query), stats in pending.items()],
+            )
+
+            hits = {}
+            for (date, query), stats in pending.items():
+                key = (date, normalise_query_string(query)[:MAX_QUERY_STRING_LENGTH])
+                hits[key] = hits.get(key, 0) + stats[0]
+
+            query_strings = {query for _, query in hits}
+            Query.objects.bulk_create(
+                [Query(query_string=query) for query in query_strings], ignore_conflicts=True
+            )
+            query_ids = dict(
+                Query.objects.filter(query_string__in=query_strings).values_list("query_string", "pk")
+            )
+            _upsert(
+                QueryDailyHits,
+                ["query", "date"],
+                ["hits"],
+                [],
+                [(query_ids[query], date, count) for (date, query), count in hits.items()],
+            )
+
+
+search_analytics = SearchAnalytics()
+
+# Don't lose the last few seconds' counts when a worker shuts down cleanly
+atexit.register(search_analytics.flush)
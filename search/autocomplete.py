@@ -0,0 +1,224 @@
+import threading
+import time
+from bisect import bisect_left, insort
+from collections import namedtuple
+
+from django.core.cache import cache
+from django.db import close_old_connections
+
+from taggit.models import Tag
+from wagtail.models import Page
+
+
+# Shared between processes: a counter of changes to the index, and each
+# change by number, so every process can apply the changes the others made
+VERSION_CACHE_KEY = "search:autocomplete:version"
+CHANGE_CACHE_KEY = "search:autocomplete:change:{}"
+
+# How long changes are kept, and how many a process applies to catch up;
+# one that is further behind rebuilds its index instead
+CHANGE_TIMEOUT = 60 * 60
+MAX_CHANGES_APPLIED = 1000
+
+# How often a process checks whether another one has changed the index
+VERSION_CHECK_INTERVAL = 1.0
+
+Suggestion = namedtuple("Suggestion", ["type", "id", "label", "url"])
+
+
+def _tokens(text):
+    return text.lower().split()
+
+
+class PrefixIndex:
+    """
+    In-memory sorted (token, key) list answering prefix queries with a
+    binary search, so suggestions never touch the database.
+    """
+
+    def __init__(self):
+        self.suggestions = {}
+        self.tokens = []
+
+    def add(self, suggestion):
+        key = (suggestion.type, suggestion.id)
+        self.remove(*key)
+        self.suggestions[key] = suggestion
+        for token in set(_tokens(suggestion.label)):
+            insort(self.tokens, (token, key))
+
+    def remove(self, type, id):
+        key = (type, id)
+        suggestion = self.suggestions.pop(key, None)
+        if suggestion is None:
+            return
+        for token in set(_tokens(suggestion.label)):
+            position = bisect_left(self.tokens, (token, key))
+            if position < len(self.tokens) and self.tokens[position] == (token, key):
+                del self.tokens[position]
+
+    def search(self, query, limit=10):
+        words = _tokens(query)
+        if not words:
+            return []
+
+        # Scan the matches for the last (still being typed) word, then
+        # require every other word to prefix one of the label's tokens
+        prefix, others = words[-1], words[:-1]
+        results = []
+        seen = set()
+        position = bisect_left(self.tokens, (prefix,))
+        while position < len(self.tokens) and len(results) < limit:
+            token, key = self.tokens[position]
+            if not token.startswith(prefix):
+                break
+            position += 1
+            if key in seen:
+                continue
+            seen.add(key)
+            suggestion = self.suggestions.get(key)
+            if suggestion is None:
+                # Being removed by another thread
+                continue
+            label_tokens = _tokens(suggestion.label)
+            if all(any(t.startswith(word) for t in label_tokens) for word in others):
+                results.append(suggestion)
+        return results
+
+
+def page_suggestion(page):
+    return Suggestion("page", page.pk, page.title, page.get_url())
+
+
+def tag_suggestion(tag):
+    return Suggestion("tag", tag.pk, tag.name, None)
+
+
+def author_suggestion(author):
+    return Suggestion("author", author.pk, author.name, None)
+
+
+def build_index():
+    from blogpages.models import Author
+
+    index = PrefixIndex()
+    for page in Page.objects.live().public().only("title", "url_path"):
+        index.add(page_suggestion(page))
+    for tag in Tag.objects.only("name"):
+        index.add(tag_suggestion(tag))
+    for author in Author.objects.filter(live=True).only("name"):
+        index.add(author_suggestion(author))
+    return index
+
+
+def publish_change(change):
+    """
+    Record `change` ("add", suggestion), ("remove", (type, id)) or
+    ("reset", None) for every process to apply. Returns its version.
+    """
+    try:
+        version = cache.incr(VERSION_CACHE_KEY)
+    except ValueError:
+        cache.add(VERSION_CACHE_KEY, 0, None)
+        version = cache.incr(VERSION_CACHE_KEY)
+    cache.set(CHANGE_CACHE_KEY.format(version), change, CHANGE_TIMEOUT)
+    return version
+
+
+class AutocompleteIndex:
+    """
+    The process-wide index. Built on first use, then kept up to date by
+    applying every change any process publishes (see publish_change()).
+    When changes can't be applied (too many, expired, or a reset), the
+    index is rebuilt in a background thread while the old one is still
+    served, so searches never wait for a rebuild after the first.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.index = None
+        self.version = None
+        self.checked_at = 0
+        self.rebuilding = False
+
+    def _shared_version(self):
+        return cache.get_or_set(VERSION_CACHE_KEY, 0, None)
+
+    def get(self):
+        now = time.monotonic()
+        if self.index is not None and now - self.checked_at < VERSION_CHECK_INTERVAL:
+            return self.index
+
+        with self.lock:
+            if self.index is None:
+                # Only the first search in a process waits for a build
+                self.version = self._shared_version()
+                self.index = build_index()
+            else:
+                self._catch_up()
+            self.checked_at = now
+            return self.index
+
+    def _catch_up(self):
+        # Called with the lock held
+        if self.index is None or self.rebuilding:
+            return
+        version = self._shared_version()
+        if version == self.version:
+            return
+        if not 0 < version - self.version <= MAX_CHANGES_APPLIED:
+            self._rebuild_in_background()
+            return
+
+        keys = [CHANGE_CACHE_KEY.format(v) for v in range(self.version + 1, version + 1)]
+        changes = cache.get_many(keys)
+        if len(changes) < len(keys) or any(changes[key][0] == "reset" for key in keys):
+            self._rebuild_in_background()
+            return
+
+        for key in keys:
+            action, argument = changes[key]
+            if action == "add":
+                self.index.add(argument)
+            else:
+                self.index.remove(*argument)
+        self.version = version
+
+    def _rebuild_in_background(self):
+        self.rebuilding = True
+
+        def rebuild():
+            try:
+                # Changes published while building are applied afterwards
+                version = self._shared_version()
+                index = build_index()
+                with self.lock:
+                    self.index = index
+                    self.version = version
+            finally:
+                self.rebuilding = False
+                close_old_connections()
+
+        threading.Thread(target=rebuild, daemon=True).start()
+
+    def _publish(self, change):
+        publish_change(change)
+        with self.lock:
+            # Applies this change, and any others made since the last check
+            self._catch_up()
+
+    def update(self, suggestion):
+        self._publish(("add", suggestion))
+
+    def remove(self, type, id):
+        self._publish(("remove", (type, id)))
+
+    def reset(self):
+        # After bulk changes that skip the signals, e.g. an import
+        self._publish(("reset", None))
+
+    def search(self, query, limit=10):
+        return self.get().search(query, limit)
+
+
+autocomplete_index = AutocompleteIndex()
@@ -0,0 +1,201 @@
+"""
+Search indexing outside the editor's request.
+
+Saving or deleting an indexed object only upserts an IndexQueueEntry (in the
+same transaction, so nothing is lost if it rolls back or the process dies).
+Shortly after the commit a background thread indexes whatever is queued in
+batches, one add_bulk() per model, then invalidates search results cached
+since the save. With SEARCH_INDEX_QUEUE_THREAD = False,
+run `manage.py process_search_index_queue --loop` as a separate process
+instead.
+
+The backends in WAGTAILSEARCH_BACKENDS have AUTO_UPDATE off, so Wagtail
+doesn't also index synchronously on save.
+"""
+
+import logging
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.contrib.contenttypes.models import ContentType
+from django.db import close_old_connections, transaction
+from django.db.models import Count, F, Min, Q
+from django.utils import timezone
+
+from wagtail.search import index
+from wagtail.search.backends import get_search_backends
+
+from caching.dependencies import invalidate, tags_for
+from search.models import IndexQueueEntry
+
+
+logger = logging.getLogger(__name__)
+
+_executor = None
+_lock = threading.Lock()
+_flush_scheduled = False
+
+
+def enqueue(instance):
+    now = timezone.now()
+    IndexQueueEntry.objects.bulk_create(
+        [
+            IndexQueueEntry(
+                content_type=ContentType.objects.get_for_model(instance),
+                object_id=str(instance.pk),
+                queued_at=now,
+                updated_at=now,
+            )
+        ],
+        update_conflicts=True,
+        unique_fields=["content_type", "object_id"],
+        # A new save gets a fresh set of attempts
+        update_fields=["updated_at", "attempts", "last_error"],
+    )
+    transaction.on_commit(schedule_flush)
+
+
+def _flush_later():
+    global _flush_scheduled
+
+    # Let edits made in quick succession (e.g. a bulk action) pile up
+    time.sleep(getattr(settings, "SEARCH_INDEX_QUEUE_DELAY", 1.0))
+    with _lock:
+        _flush_scheduled = False
+
+    close_old_connections()
+    try:
+        flush()
+    except Exception:
+        logger.exception("Flushing the search index queue failed")
+    finally:
+        close_old_connections()
+
+
+def schedule_flush():
+    global _executor, _flush_scheduled
+
+    if not getattr(settings, "SEARCH_INDEX_QUEUE_THREAD", True):
+        return
+
+    with _lock:
+        if _flush_scheduled:
+            return
+        _flush_scheduled = True
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="search-index")
+    _executor.submit(_flush_later)
+
+
+def _index_batch(entries):
+    """
+    Index `entries`, returning the models they belong to.
+    """
+    ids_by_model = defaultdict(set)
+    for entry in entries:
+        model = entry.content_type.model_class()
+        if model is not None and index.class_is_indexed(model):
+            ids_by_model[model].add(entry.object_id)
+
+    backends = list(get_search_backends())
+    for model, ids in ids_by_model.items():
+        # Objects that are gone, or no longer meant to be indexed, are removed
+        objects = {str(obj.pk): obj for obj in model.get_indexed_objects().filter(pk__in=ids)}
+        removed = [model(pk=model._meta.pk.to_python(pk)) for pk in ids - set(objects)]
+
+        by_class = defaultdict(list)
+        for obj in objects.values():
+            indexed = obj.get_indexed_instance()
+            if indexed is not None:
+                by_class[type(indexed)].append(indexed)
+
+        for backend in backends:
+            for indexed_model, indexed in by_class.items():
+                backend.add_bulk(indexed_model, indexed)
+            for obj in removed:
+                backend.delete(obj)
+    return set(ids_by_model)
+
+
+def _max_attempts():
+    return getattr(settings, "SEARCH_INDEX_QUEUE_MAX_ATTEMPTS", 5)
+
+
+def _index_entries(entries):
+    """
+    Index `entries`, returning the models of those indexed and
+    {entry pk: error} for those that failed.
+    """
+    if len(entries) > 1:
+        try:
+            return _index_batch(entries), {}
+        except Exception:
+            logger.warning("Indexing a batch of %d failed, retrying one by one", len(entries))
+
+    indexed_models, errors = set(), {}
+    for entry in entries:
+        try:
+            indexed_models |= _index_batch([entry])
+        except Exception as e:
+            logger.exception("Indexing %s %s failed", entry.content_type, entry.object_id)
+            errors[entry.pk] = repr(e)
+    return indexed_models, errors
+
+
+def _search_result_tags(models):
+    # Cached search results depend on their base model (Page, for every
+    # page type), which a publish invalidated before it was indexed
+    return tags_for(models, [model._meta.get_parent_list() for model in models])
+
+
+def flush(batch_size=None):
+    """
+    Index everything queued, oldest first. Returns the number of objects
+    indexed.
+    """
+    batch_size = batch_size or getattr(settings, "SEARCH_INDEX_QUEUE_BATCH_SIZE", 500)
+    processed = 0
+    failed = set()
+
+    while True:
+        started = timezone.now()
+        entries = list(
+            IndexQueueEntry.objects.select_related("content_type")
+            .filter(attempts__lt=_max_attempts())
+            # Retried on the next flush, not again in this one
+            .exclude(pk__in=failed)
+            .order_by("queued_at")[:batch_size]
+        )
+        if not entries:
+            return processed
+
+        indexed_models, errors = _index_entries(entries)
+        if indexed_models:
+            invalidate(_search_result_tags(indexed_models))
+
+        # Keep entries saved again while we were indexing, with their
+        # attempts reset
+        unchanged = IndexQueueEntry.objects.filter(updated_at__lt=started)
+        unchanged.filter(pk__in=[entry.pk for entry in entries if entry.pk not in errors]).delete()
+        for pk, error in errors.items():
+            unchanged.filter(pk=pk).update(attempts=F("attempts") + 1, last_error=error)
+        failed.update(errors)
+        processed += len(entries) - len(errors)
+
+
+def queue_status():
+    """
+    (number of objects waiting, seconds the oldest has waited, number that
+    failed too many times to be retried).
+    """
+    max_attempts = _max_attempts()
+    status = IndexQueueEntry.objects.aggregate(
+        count=Count("pk", filter=Q(attempts__lt=max_attempts)),
+        oldest=Min("queued_at", filter=Q(attempts__lt=max_attempts)),
+        failed=Count("pk", filter=Q(attempts__gte=max_attempts)),
+    )
+    lag = (timezone.now() - status["oldest"]).total_seconds() if status["oldest"] else 0
+    return status["count"], lag, status["failed"]
@@ -0,0 +1,533 @@
+"""
+An in-process search backend: an inverted index held in memory and ranked
+with BM25, for sites that outgrow the database backend.
+
+The index lives in an append-only journal file of add/delete records. Each
+process memory-maps the journal and applies only the records added since it
+last looked, so an object indexed by one process (e.g. the search index
+queue's flush, see search.index_queue) is searchable in all of them without
+a rebuild. `update_index` rewrites the journal compactly, and so does any
+write that leaves it holding more than COMPACT_RATIO records per indexed
+object.
+
+    WAGTAILSEARCH_BACKENDS = {
+        "inverted": {
+            "BACKEND": "search.inverted_index",
+            "PATH": os.path.join(BASE_DIR, ".cache", "search-index.jsonl"),
+            "AUTO_UPDATE": False,
+        },
+    }
+"""
+
+import fcntl
+import json
+import math
+import mmap
+import os
+import re
+import threading
+from bisect import bisect_left
+from collections import defaultdict
+from heapq import nlargest
+from itertools import islice
+
+from django.db.models import Model
+
+from wagtail.search import index
+from wagtail.search.backends.base import (
+    BaseSearchBackend,
+    BaseSearchQueryCompiler,
+    BaseSearchResults,
+    get_model_root,
+)
+from wagtail.search.query import And, Boost, MatchAll, Not, Or, Phrase, PlainText
+
+
+# BM25 parameters
+K1 = 1.2
+B = 0.75
+
+# Ids are checked against the queryset's filters this many at a time
+FILTER_CHUNK_SIZE = 500
+
+# The journal is rewritten once it has this many records per indexed object
+# (and at least COMPACT_MIN_RECORDS), e.g. from objects saved again and again
+COMPACT_RATIO = 2
+COMPACT_MIN_RECORDS = 10000
+
+TOKEN_RE = re.compile(r"\w+")
+
+
+def tokenize(text):
+    return TOKEN_RE.findall(text.lower())
+
+
+def _doc_key(obj):
+    return (get_model_root(type(obj))._meta.label_lower, str(obj.pk))
+
+
+def _model_labels(model):
+    return [model._meta.label_lower] + [
+        parent._meta.label_lower for parent in model._meta.get_parent_list()
+    ]
+
+
+def _iter_field_text(obj, fields, boost=1.0):
+    for field in fields:
+        if isinstance(field, index.SearchField):
+            value = field.get_value(obj)
+            if value is None:
+                continue
+            if isinstance(value, (list, tuple)):
+                value = " ".join(str(item) for item in value)
+            yield str(value), boost * (field.boost or 1)
+        elif isinstance(field, index.RelatedFields):
+            related = getattr(obj, field.field_name, None)
+            if related is None:
+                continue
+            if hasattr(related, "all"):
+                related = related.all()
+            elif isinstance(related, Model):
+                related = [related]
+            for related_obj in related:
+                yield from _iter_field_text(related_obj, field.fields, boost)
+
+
+def document(obj):
+    """
+    The journal record indexing `obj`: boosted term frequencies over its
+    search fields.
+    """
+    terms = defaultdict(float)
+    for text, boost in _iter_field_text(obj, type(obj).get_search_fields()):
+        for token in tokenize(text):
+            terms[token] += boost
+    return {
+        "op": "add",
+        "doc": _doc_key(obj),
+        "models": _model_labels(type(obj)),
+        "terms": terms,
+        "length": sum(terms.values()),
+    }
+
+
+class InvertedIndex:
+    """
+    One journal file and the in-memory index built from it, shared by every
+    backend instance in the process (Wagtail creates them freely).
+    """
+
+    def __init__(self, path):
+        self.name = str(path)
+        self.path = str(path)
+        self.lock = threading.RLock()
+        self._clear()
+        self.inode = None
+        self.offset = 0
+        # Records in the journal up to `offset`
+        self.record_count = 0
+
+    def _clear(self):
+        self.docs = {}
+        self.postings = defaultdict(dict)
+        self.total_length = 0.0
+        self._vocabulary = None
+
+    # Journal
+
+    def _append(self, records):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        data = "".join(json.dumps(record) + "\n" for record in records).encode()
+        while True:
+            with open(self.path, "ab") as f:
+                fcntl.flock(f, fcntl.LOCK_EX)
+                # A compaction may have replaced the file while we waited
+                try:
+                    replaced = os.fstat(f.fileno()).st_ino != os.stat(self.path).st_ino
+                except FileNotFoundError:
+                    replaced = True
+                if not replaced:
+                    f.write(data)
+                    return
+
+    def sync(self):
+        """
+        Apply the journal records written since the last sync, starting over
+        if the journal has been replaced by a compaction or reset.
+        """
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            with self.lock:
+                if self.inode is not None:
+                    self._clear()
+                    self.inode, self.offset, self.record_count = None, 0, 0
+            return
+
+        with self.lock:
+            if stat.st_ino != self.inode or stat.st_size < self.offset:
+                self._clear()
+                self.inode, self.offset, self.record_count = stat.st_ino, 0, 0
+            if stat.st_size == self.offset:
+                return
+
+            with open(self.path, "rb") as f, mmap.mmap(
+                f.fileno(), 0, access=mmap.ACCESS_READ
+            ) as journal:
+                # Only whole records; a writer may be part way through one
+                end = journal.rfind(b"\n", self.offset) + 1
+                if end:
+                    for line in journal[self.offset : end].splitlines():
+                        self._apply(json.loads(line))
+                        self.record_count += 1
+                    self.offset = end
+
+    def _apply(self, record):
+        if record["op"] == "reset":
+            self._clear()
+            return
+
+        key = tuple(record["doc"])
+        previous = self.docs.pop(key, None)
+        if previous is not None:
+            self.total_length -= previous[1]
+            for term in previous[2]:
+                postings = self.postings[term]
+                postings.pop(key, None)
+                if not postings:
+                    del self.postings[term]
+                    self._vocabulary = None
+
+        if record["op"] == "add":
+            terms = record["terms"]
+            self.docs[key] = (frozenset(record["models"]), record["length"], tuple(terms))
+            self.total_length += record["length"]
+            for term, frequency in terms.items():
+                if term not in self.postings:
+                    self._vocabulary = None
+                self.postings[term][key] = frequency
+
+    def _needs_compaction(self):
+        return self.record_count >= max(COMPACT_MIN_RECORDS, COMPACT_RATIO * len(self.docs))
+
+    def compact(self, only_if_needed=False):
+        """
+        Rewrite the journal as one record per indexed object.
+        """
+        if not os.path.exists(self.path):
+            return
+
+        with open(self.path, "ab") as journal:
+            # Hold off writers until the new journal is in place
+            fcntl.flock(journal, fcntl.LOCK_EX)
+            self.sync()
+            with self.lock:
+                if only_if_needed and not self._needs_compaction():
+                    # e.g. another process compacted it while we waited
+                    return
+                with open(self.path + ".tmp", "w") as f:
+                    for key, (models, length, terms) in self.docs.items():
+                        record = {
+                            "op": "add",
+                            "doc": key,
+                            "models": sorted(models),
+                            "terms": {term: self.postings[term][key] for term in terms},
+                            "length": length,
+                        }
+                        f.write(json.dumps(record) + "\n")
+                os.replace(self.path + ".tmp", self.path)
+                # Already in memory, so there's no need to read it back
+                stat = os.stat(self.path)
+                self.inode, self.offset, self.record_count = stat.st_ino, stat.st_size, len(self.docs)
+
+    # Wagtail's index interface, used by update_index and the backend
+
+    def add_model(self, model):
+        pass
+
+    def refresh(self):
+        self.sync()
+
+    def add_item(self, item):
+        self.add_items(type(item), [item])
+
+    def add_items(self, model, items):
+        records = []
+        for item in items:
+            indexed = item.get_indexed_instance()
+            if indexed is not None:
+                records.append(document(indexed))
+        if records:
+            self._append(records)
+            self._compact_if_needed()
+
+    def delete_item(self, item):
+        self._append([{"op": "delete", "doc": _doc_key(item)}])
+        self._compact_if_needed()
+
+    def _compact_if_needed(self):
+        self.sync()
+        with self.lock:
+            needed = self._needs_compaction()
+        if needed:
+            self.compact(only_if_needed=True)
+
+    def reset(self):
+        self._append([{"op": "reset"}])
+
+    # Querying
+
+    def vocabulary(self):
+        with self.lock:
+            if self._vocabulary is None:
+                self._vocabulary = sorted(self.postings)
+            return self._vocabulary
+
+    def expand_prefix(self, prefix):
+        vocabulary = self.vocabulary()
+        position = bisect_left(vocabulary, prefix)
+        terms = []
+        while position < len(vocabulary) and vocabulary[position].startswith(prefix):
+            terms.append(vocabulary[position])
+            position += 1
+        return terms
+
+    def score_terms(self, terms, model_label, operator="or"):
+        """
+        BM25 scores of the documents of `model_label` (or a subclass)
+        matching `terms`. Each entry of `terms` is a list of alternatives,
+        e.g. the expansions of a prefix.
+        """
+        with self.lock:
+            count = len(self.docs)
+            if not count or not terms:
+                return {}
+            average_length = self.total_length / count or 1.0
+
+            scores = defaultdict(float)
+            matched = defaultdict(int)
+            for alternatives in terms:
+                seen = set()
+                for term in alternatives:
+                    postings = self.postings.get(term, {})
+                    idf = math.log(1 + (count - len(postings) + 0.5) / (len(postings) + 0.5))
+                    for key, frequency in postings.items():
+                        models, length, _ = self.docs[key]
+                        if model_label not in models:
+                            continue
+                        scores[key] += idf * frequency * (K1 + 1) / (
+                            frequency + K1 * (1 - B + B * length / average_length)
+                        )
+                        seen.add(key)
+                for key in seen:
+                    matched[key] += 1
+
+            if operator == "and":
+                return {key: score for key, score in scores.items() if matched[key] == len(terms)}
+            return dict(scores)
+
+    def all_documents(self, model_label):
+        with self.lock:
+            return {key: 0.0 for key, (models, _, _) in self.docs.items() if model_label in models}
+
+
+_indexes = {}
+_indexes_lock = threading.Lock()
+
+
+def get_index(path):
+    with _indexes_lock:
+        if str(path) not in _indexes:
+            _indexes[str(path)] = InvertedIndex(path)
+        return _indexes[str(path)]
+
+
+class InvertedIndexQueryCompiler(BaseSearchQueryCompiler):
+    prefix_last_term = False
+
+    def check(self):
+        if self.fields:
+            raise NotImplementedError("The inverted index backend can't search specific fields")
+        super().check()
+
+    # The queryset's filters are applied by the database to the matches
+    # (see InvertedIndexSearchResults), so they only need to be valid here
+    def _process_lookup(self, field, lookup, value):
+        return True
+
+    def _connect_filters(self, filters, connector, negated):
+        return True
+
+    def _terms(self, query_string):
+        tokens = tokenize(query_string)
+        return [[token] for token in tokens]
+
+    def evaluate(self, inverted_index):
+        return self._evaluate(self.query, inverted_index, self.queryset.model._meta.label_lower)
+
+    def _evaluate(self, query, inverted_index, model_label):
+        if isinstance(query, MatchAll):
+            return inverted_index.all_documents(model_label)
+        if isinstance(query, PlainText):
+            terms = self._terms(query.query_string)
+            return inverted_index.score_terms(terms, model_label, query.operator)
+        if isinstance(query, Phrase):
+            # Scored as all of its words, without checking their order
+            return inverted_index.score_terms(
+                self._terms(query.query_string), model_label, "and"
+            )
+        if isinstance(query, Boost):
+            scores = self._evaluate(query.subquery, inverted_index, model_label)
+            return {key: score * query.boost for key, score in scores.items()}
+        if isinstance(query, (And, Or)):
+            results = [self._evaluate(q, inverted_index, model_label) for q in query.subqueries]
+            keys = set(results[0]) if results else set()
+            for result in results[1:]:
+                keys = keys & set(result) if isinstance(query, And) else keys | set(result)
+            return {key: sum(result.get(key, 0.0) for result in results) for key in keys}
+        if isinstance(query, Not):
+            excluded = self._evaluate(query.subquery, inverted_index, model_label)
+            return {
+                key: 0.0
+                for key in inverted_index.all_documents(model_label)
+                if key not in excluded
+            }
+        # Fuzzy and anything else: match the words as typed
+        return inverted_index.score_terms(
+            self._terms(getattr(query, "query_string", "")), model_label
+        )
+
+
+class InvertedIndexAutocompleteQueryCompiler(InvertedIndexQueryCompiler):
+    def _terms(self, query_string):
+        terms = super()._terms(query_string)
+        if terms:
+            # The last word is probably still being typed
+            terms[-1] = self.inverted_index.expand_prefix(terms[-1][0]) or terms[-1]
+        return terms
+
+    def evaluate(self, inverted_index):
+        self.inverted_index = inverted_index
+        return super().evaluate(inverted_index)
+
+
+class InvertedIndexSearchResults(BaseSearchResults):
+    def _scores(self):
+        if not hasattr(self, "_score_cache"):
+            inverted_index = self.backend.index
+            inverted_index.sync()
+            self._score_cache = self.query_compiler.evaluate(inverted_index)
+        return self._score_cache
+
+    def _clone(self):
+        new = super()._clone()
+        if hasattr(self, "_score_cache"):
+            new._score_cache = self._score_cache
+        return new
+
+    def _matching_ids(self, stop=None):
+        """
+        Matching ids that pass the queryset's filters, best first, found by
+        checking candidates in chunks until `stop` are found.
+        """
+        queryset = self.query_compiler.queryset
+        pk_field = queryset.model._meta.pk
+        scores = self._scores()
+
+        ranked = iter(self._ranked(scores, stop))
+        ids = []
+        while chunk := [pk_field.to_python(pk) for _, pk in islice(ranked, FILTER_CHUNK_SIZE)]:
+            allowed = set(queryset.filter(pk__in=chunk).values_list("pk", flat=True))
+            ids += [pk for pk in chunk if pk in allowed]
+            if stop is not None and len(ids) >= stop:
+                break
+        return ids, scores
+
+    def _ranked(self, scores, stop):
+        if stop is None:
+            yield from sorted(scores, key=scores.get, reverse=True)
+            return
+
+        # Usually enough to fill the page without sorting every match
+        top = nlargest(max(stop * 2, FILTER_CHUNK_SIZE), scores, key=scores.get)
+        yield from top
+        if len(top) < len(scores):
+            seen = set(top)
+            yield from sorted(
+                (key for key in scores if key not in seen), key=scores.get, reverse=True
+            )
+
+    def _ordered_ids(self, stop=None):
+        """
+        Matching ids that pass the queryset's filters, in the queryset's own
+        order, found by streaming its ids until `stop` are found rather than
+        sending every match to the database.
+        """
+        queryset = self.query_compiler.queryset
+        root = get_model_root(queryset.model)._meta.label_lower
+        scores = self._scores()
+
+        ids = []
+        for pk in queryset.values_list("pk", flat=True).iterator(chunk_size=FILTER_CHUNK_SIZE):
+            if (root, str(pk)) in scores:
+                ids.append(pk)
+                if stop is not None and len(ids) >= stop:
+                    break
+        return ids, scores
+
+    def _do_search(self):
+        queryset = self.query_compiler.queryset
+        if self.query_compiler.order_by_relevance:
+            ids, scores = self._matching_ids(self.stop)
+        else:
+            ids, scores = self._ordered_ids(self.stop)
+        ids = ids[self.start : self.stop]
+
+        if self.prefetch_related:
+            queryset = queryset.prefetch_related(*self.prefetch_related)
+        objects = {}
+        for start in range(0, len(ids), FILTER_CHUNK_SIZE):
+            objects.update(queryset.filter(pk__in=ids[start : start + FILTER_CHUNK_SIZE]).in_bulk())
+
+        root = get_model_root(queryset.model)._meta.label_lower
+        results = [objects[pk] for pk in ids if pk in objects]
+        if self._score_field:
+            for obj in results:
+                setattr(obj, self._score_field, scores.get((root, str(obj.pk))))
+        return results
+
+    def _do_count(self):
+        ids, _ = self._matching_ids()
+        return len(ids)
+
+
+class InvertedIndexRebuilder:
+    def __init__(self, index):
+        self.index = index
+
+    def start(self):
+        self.index.reset()
+        return self.index
+
+    def finish(self):
+        self.index.compact()
+
+
+class InvertedIndexSearchBackend(BaseSearchBackend):
+    query_compiler_class = InvertedIndexQueryCompiler
+    autocomplete_query_compiler_class = InvertedIndexAutocompleteQueryCompiler
+    results_class = InvertedIndexSearchResults
+    rebuilder_class = InvertedIndexRebuilder
+
+    def __init__(self, params):
+        super().__init__(params)
+        self.index = get_index(params.get("PATH", "search-index.jsonl"))
+
+    def get_index_for_model(self, model):
+        return self.index
+
+    def reset_index(self):
+        self.index.reset()
+
+
+SearchBackend = InvertedIndexSearchBackend
@@ -0,0 +1,97 @@
+import random
+import statistics
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import RequestFactory, override_settings
+from django.test.utils import CaptureQueriesContext
+
+from search import views
+from search.autocomplete import (
+    AutocompleteIndex,
+    Suggestion,
+    build_index,
+    publish_change,
+)
+
+
+def _percentile(timings, fraction):
+    return timings[max(int(len(timings) * fraction) - 1, 0)] if timings else 0.0
+
+
+class Command(BaseCommand):
+    help = (
+        "Time the autocomplete view for random prefixes while another process "
+        "changes the index every few requests, and report p50/p99/max latency "
+        "and database queries. Uses a private in-memory cache and index."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--requests", type=int, default=5000)
+        parser.add_argument(
+            "--change-every",
+            type=int,
+            default=50,
+            help="Publish a change from another process after this many requests (0 for none).",
+        )
+        parser.add_argument(
+            "--reset-every",
+            type=int,
+            default=0,
+            help="Publish a reset (full rebuild) after this many requests (0 for none).",
+        )
+
+    def handle(self, *args, **options):
+        labels = [suggestion.label for suggestion in build_index().suggestions.values()]
+        if not labels:
+            raise CommandError("Nothing to suggest.")
+        rng = random.Random(0)
+        prefixes = []
+        for _ in range(options["requests"]):
+            word = rng.choice(rng.choice(labels).split() or ["a"])
+            prefixes.append(word[: rng.randint(1, len(word))])
+
+        cache_settings = {
+            "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}
+        }
+        index = AutocompleteIndex()
+        shared_index = views.autocomplete_index
+        views.autocomplete_index = index
+        factory = RequestFactory()
+        timings, query_count = [], 0
+        try:
+            with override_settings(CACHES=cache_settings):
+                start = time.perf_counter()
+                index.get()
+                self.stdout.write(
+                    f"{len(labels)} suggestions, first build "
+                    f"{(time.perf_counter() - start) * 1000:.0f}ms"
+                )
+
+                for i, prefix in enumerate(prefixes):
+                    if i and options["change_every"] and i % options["change_every"] == 0:
+                        # As a publish in another process: the version moves on
+                        # without this index being told directly
+                        publish_change(("add", Suggestion("tag", -i, f"benchmark {prefix}", None)))
+                    if i and options["reset_every"] and i % options["reset_every"] == 0:
+                        publish_change(("reset", None))
+                    # Skip the throttle, so every request checks for changes
+                    index.checked_at = 0
+
+                    request = factory.get("/search/autocomplete/", {"query": prefix})
+                    with CaptureQueriesContext(connection) as queries:
+                        start = time.perf_counter()
+                        views.autocomplete(request)
+                        timings.append((time.perf_counter() - start) * 1000)
+                    query_count += len(queries)
+        finally:
+            views.autocomplete_index = shared_index
+
+        timings.sort()
+        self.stdout.write(
+            f"{len(timings)} requests: p50 {statistics.median(timings):.2f}ms, "
+            f"p99 {_percentile(timings, 0.99):.2f}ms, max {timings[-1]:.2f}ms, "
+            f"{query_count} queries"
+        )
+
@@ -0,0 +1,89 @@
+import os
+import random
+import statistics
+import tempfile
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from wagtail.models import Page
+from wagtail.search.backends import get_search_backend
+from wagtail.search.index import get_indexed_models
+
+from search.inverted_index import InvertedIndexSearchBackend, tokenize
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare indexing throughput and query latency of the database backend and the "
+        "inverted index on the pages in the database (load 10k/100k with import_blog_posts)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--queries", type=int, default=200)
+        parser.add_argument("--chunk-size", type=int, default=1000)
+        parser.add_argument(
+            "--skip-indexing", action="store_true", help="Query the existing indexes as they are."
+        )
+
+    def get_backends(self):
+        # (backend, whether its index already exists)
+        backends = {"database": (get_search_backend("default"), True)}
+        if "inverted" in settings.WAGTAILSEARCH_BACKENDS:
+            backends["inverted"] = (get_search_backend("inverted"), True)
+        else:
+            path = os.path.join(tempfile.mkdtemp(), "search-index.jsonl")
+            backends["inverted"] = (InvertedIndexSearchBackend({"PATH": path}), False)
+        return backends
+
+    def index_all(self, name, backend, chunk_size):
+        count = 0
+        start = time.perf_counter()
+        for model in get_indexed_models():
+            index = backend.get_index_for_model(model)
+            objects = model.get_indexed_objects().order_by("pk")
+            for offset in range(0, objects.count(), chunk_size):
+                chunk = list(objects[offset : offset + chunk_size])
+                index.add_items(model, chunk)
+                count += len(chunk)
+        elapsed = time.perf_counter() - start
+        self.stdout.write(f"{name}: indexed {count} objects in {elapsed:.1f}s ({count / elapsed:.0f}/s)")
+
+    def handle(self, *args, **options):
+        backends = self.get_backends()
+
+        for name, (backend, exists) in backends.items():
+            if not (exists and options["skip_indexing"]):
+                self.index_all(name, backend, options["chunk_size"])
+
+        words = list(
+            {
+                word
+                for title in Page.objects.live().values_list("title", flat=True)[:5000]
+                for word in tokenize(title)
+            }
+        )
+        if not words:
+            self.stdout.write("No pages to search.")
+            return
+        rng = random.Random(0)
+        queries = [
+            " ".join(rng.sample(words, min(len(words), rng.choice([1, 2]))))
+            for _ in range(options["queries"])
+        ]
+
+        self.stdout.write(f"{Page.objects.live().count()} live pages, {len(queries)} queries")
+        for name, (backend, _) in backends.items():
+            # Warm up, e.g. loading the inverted index's journal
+            list(backend.search(queries[0], Page.objects.live())[:10])
+            timings = []
+            for query in queries:
+                start = time.perf_counter()
+                list(backend.search(query, Page.objects.live())[:10])
+                timings.append((time.perf_counter() - start) * 1000)
+            timings.sort()
+            self.stdout.write(
+                f"{name}: p50 {statistics.median(timings):.2f}ms, "
+                f"p95 {timings[int(len(timings) * 0.95) - 1]:.2f}ms, max {timings[-1]:.2f}ms"
+            )
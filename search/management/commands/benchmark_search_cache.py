@@ -0,0 +1,111 @@
+import random
+import statistics
+import threading
+import time
+
+from django.contrib.auth.models import AnonymousUser
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import RequestFactory, override_settings
+from django.test.utils import CaptureQueriesContext
+
+from wagtail.models import Page
+
+from search.analytics import search_analytics
+from search.inverted_index import tokenize
+from search.views import search
+
+
+def _percentile(timings, fraction):
+    return timings[max(int(len(timings) * fraction) - 1, 0)] if timings else 0.0
+
+
+class Command(BaseCommand):
+    help = (
+        "Load test the search view with a few popular queries repeated many "
+        "times (with page flips), with the result cache emptied before each "
+        "request against kept warm. Uses a private in-memory cache."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--requests", type=int, default=1000, help="Searches per phase.")
+        parser.add_argument("--queries", type=int, default=10, help="Distinct popular queries.")
+        parser.add_argument("--threads", type=int, default=4, help="Concurrent clients.")
+
+    def handle(self, *args, **options):
+        words = sorted(
+            {
+                word
+                for title in Page.objects.live().values_list("title", flat=True)[:5000]
+                for word in tokenize(title)
+            }
+        )
+        if not words:
+            raise CommandError("No pages to search.")
+        rng = random.Random(0)
+        queries = rng.sample(words, min(len(words), options["queries"]))
+        # A few queries account for most searches, and most stay on page 1
+        weights = [1 / (rank + 1) for rank in range(len(queries))]
+        requests = [
+            (rng.choices(queries, weights)[0], rng.choice([1, 1, 1, 2, 3]))
+            for _ in range(options["requests"])
+        ]
+
+        self.stdout.write(
+            f"{Page.objects.live().count()} live pages, {len(requests)} searches for "
+            f"{len(queries)} queries, {options['threads']} threads"
+        )
+        cache_settings = {
+            "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}
+        }
+        # Not counted in the real search analytics
+        search_analytics.record = lambda *args: None
+        try:
+            with override_settings(CACHES=cache_settings):
+                for phase in ("cold", "warm"):
+                    self.report(phase, *self.run(phase, requests, options["threads"]))
+        finally:
+            del search_analytics.record
+
+    def run(self, phase, requests, threads):
+        from django.core.cache import cache
+
+        factory = RequestFactory()
+        timings, query_counts = [], []
+        lock = threading.Lock()
+        remaining = list(requests)
+
+        def client():
+            while True:
+                with lock:
+                    if not remaining:
+                        break
+                    query, page = remaining.pop()
+                if phase == "cold":
+                    cache.clear()
+                request = factory.get("/search/", {"query": query, "page": page})
+                request.user = AnonymousUser()
+                start = time.perf_counter()
+                with CaptureQueriesContext(connection) as queries:
+                    search(request).render()
+                elapsed = (time.perf_counter() - start) * 1000
+                with lock:
+                    timings.append(elapsed)
+                    query_counts.append(len(queries))
+            connection.close()
+
+        workers = [threading.Thread(target=client) for _ in range(threads)]
+        start = time.perf_counter()
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        return timings, query_counts, time.perf_counter() - start
+
+    def report(self, phase, timings, query_counts, elapsed):
+        timings.sort()
+        self.stdout.write(
+            f"{phase}: {len(timings) / elapsed:.0f} searches/s, "
+            f"p50 {statistics.median(timings):.1f}ms, p95 {_percentile(timings, 0.95):.1f}ms, "
+            f"{statistics.mean(query_counts):.1f} queries/search"
+        )
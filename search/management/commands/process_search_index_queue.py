@@ -0,0 +1,24 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from search.index_queue import flush, queue_status
+
+
+class Command(BaseCommand):
+    help = "Index the objects queued for search indexing, once or continuously."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--loop", action="store_true", help="Keep polling the queue.")
+        parser.add_argument("--interval", type=float, default=1.0, help="Seconds between polls.")
+        parser.add_argument("--batch-size", type=int)
+
+    def handle(self, *args, **options):
+        while True:
+            count, lag, _failed = queue_status()
+            if count:
+                processed = flush(options["batch_size"])
+                self.stdout.write(f"Indexed {processed} objects (lag was {lag:.1f}s)")
+            if not options["loop"]:
+                break
+            time.sleep(options["interval"])
@@ -0,0 +1,49 @@
+import datetime
+
+from django.core.management.base import BaseCommand
+from django.db.models import F, Max, Sum
+from django.utils import timezone
+
+from search.analytics import search_analytics
+from search.models import SearchQueryStats
+
+
+class Command(BaseCommand):
+    help = "Report the slowest, most popular and zero-result search queries."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--days", type=int, default=7)
+        parser.add_argument("--limit", type=int, default=20)
+
+    def handle(self, *args, **options):
+        # Include this process's own unwritten counts
+        search_analytics.flush()
+
+        since = timezone.localdate() - datetime.timedelta(days=options["days"] - 1)
+        queries = (
+            SearchQueryStats.objects.filter(date__gte=since)
+            .values("query_string")
+            .annotate(
+                hits=Sum("hits"),
+                zero_result_hits=Sum("zero_result_hits"),
+                total_latency=Sum("total_latency"),
+                max_latency=Max("max_latency"),
+            )
+            .annotate(average_latency=F("total_latency") / F("hits"))
+        )
+        limit = options["limit"]
+
+        self.stdout.write(f"Slowest queries since {since} (average / max ms, hits):")
+        for row in queries.order_by("-average_latency")[:limit]:
+            self.stdout.write(
+                f"  {row['average_latency']:8.1f} {row['max_latency']:8.1f} "
+                f"{row['hits']:6}  {row['query_string']}"
+            )
+
+        self.stdout.write("Most popular queries (hits, zero-result hits):")
+        for row in queries.order_by("-hits")[:limit]:
+            self.stdout.write(f"  {row['hits']:6} {row['zero_result_hits']:6}  {row['query_string']}")
+
+        self.stdout.write("Queries finding nothing (zero-result hits):")
+        for row in queries.filter(zero_result_hits__gt=0).order_by("-zero_result_hits")[:limit]:
+            self.stdout.write(f"  {row['zero_result_hits']:6}  {row['query_string']}")
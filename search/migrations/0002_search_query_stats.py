@@ -0,0 +1,29 @@
+# Generated by Django 5.1.15 on 2026-10-18 06:59
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('search', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SearchQueryStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField(db_index=True)),
+                ('query_string', models.CharField(max_length=255)),
+                ('hits', models.PositiveIntegerField(default=0)),
+                ('zero_result_hits', models.PositiveIntegerField(default=0)),
+                ('total_latency', models.FloatField(default=0)),
+                ('max_latency', models.FloatField(default=0)),
+            ],
+            options={
+                'verbose_name_plural': 'search query stats',
+                'constraints': [models.UniqueConstraint(fields=('date', 'query_string'), name='unique_search_query_stats')],
+            },
+        ),
+    ]
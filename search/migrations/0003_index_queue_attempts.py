@@ -0,0 +1,23 @@
+# Generated by Django 5.1.15 on 2026-10-18 07:34
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('search', '0002_search_query_stats'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='indexqueueentry',
+            name='attempts',
+            field=models.PositiveSmallIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='indexqueueentry',
+            name='last_error',
+            field=models.TextField(blank=True),
+        ),
+    ]
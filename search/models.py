@@ -0,0 +1,52 @@
+from django.contrib.contenttypes.models import ContentType
+from django.db import models
+
+
+class IndexQueueEntry(models.Model):
+    """
+    An object whose search index entry is out of date. Repeated saves of the
+    same object update one row, so they're indexed once (see
+    search.index_queue).
+    """
+
+    content_type = models.ForeignKey(ContentType, on_delete=models.CASCADE, related_name="+")
+    object_id = models.CharField(max_length=255)
+    # The first change not yet indexed, for the lag, and the latest one
+    queued_at = models.DateTimeField(db_index=True)
+    updated_at = models.DateTimeField()
+    # Failed indexing attempts since the last save; entries that reach
+    # SEARCH_INDEX_QUEUE_MAX_ATTEMPTS are skipped until saved again
+    attempts = models.PositiveSmallIntegerField(default=0)
+    last_error = models.TextField(blank=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["content_type", "object_id"], name="unique_index_queue_entry"
+            ),
+        ]
+
+
+class SearchQueryStats(models.Model):
+    """
+    Per-day totals for one normalized search query, written in batches by
+    search.analytics.
+    """
+
+    date = models.DateField(db_index=True)
+    query_string = models.CharField(max_length=255)
+    hits = models.PositiveIntegerField(default=0)
+    zero_result_hits = models.PositiveIntegerField(default=0)
+    # Milliseconds
+    total_latency = models.FloatField(default=0)
+    max_latency = models.FloatField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["date", "query_string"], name="unique_search_query_stats"),
+        ]
+        verbose_name_plural = "search query stats"
+
+    @property
+    def average_latency(self):
+        return self.total_latency / self.hits if self.hits else 0
@@ -0,0 +1,139 @@
+import hashlib
+
+from django.conf import settings
+
+from wagtail.contrib.search_promotions.models import SearchPromotion
+from wagtail.models import Page
+
+from caching.dependencies import (
+    cached_render,
+    get_cached,
+    get_fragment_cache,
+    record_dependency,
+    set_cached,
+)
+
+
+# Result ids are fetched from the search backend, and cached, this many at a time
+SEARCH_RESULTS_BLOCK_SIZE = 100
+
+
+def normalize_query(query):
+    return " ".join(query.split()).lower()
+
+
+def _cache_key(normalized_query, part):
+    digest = hashlib.md5(normalized_query.encode(), usedforsecurity=False).hexdigest()
+    return f"search:results:{digest}:{part}"
+
+
+class ResultIds:
+    """
+    The ids of the live pages matching a query, in relevance order, as a
+    sequence a Paginator can page through.
+
+    The total comes from the backend's count and each block of
+    SEARCH_RESULTS_BLOCK_SIZE ids from a slice of the results, fetched
+    when a page inside it is first viewed. Both are cached per normalized
+    query, so repeat searches and page flips don't go back to the search
+    backend, until any page is published, unpublished or deleted (see
+    caching.signals).
+    """
+
+    def __init__(self, query):
+        self.query = normalize_query(query)
+        self.cache = get_fragment_cache()
+        self.timeout = getattr(settings, "SEARCH_RESULTS_CACHE_TIMEOUT", 300)
+        self._count = None
+        self._blocks = {}
+
+    def _search(self):
+        return Page.objects.live().search(
+            self.query, backend=getattr(settings, "SITE_SEARCH_BACKEND", "default")
+        )
+
+    def _cached(self, part, load):
+        key = _cache_key(self.query, part)
+        value = get_cached(key, cache=self.cache)
+        if value is None:
+            value = load()
+            set_cached(key, value, {Page._meta.label_lower}, self.timeout, cache=self.cache)
+        return value
+
+    def count(self):
+        if self._count is None:
+            self._count = self._cached("count", lambda: self._search().count())
+        return self._count
+
+    def __len__(self):
+        return self.count()
+
+    def _block(self, number):
+        if number not in self._blocks:
+            start = number * SEARCH_RESULTS_BLOCK_SIZE
+            self._blocks[number] = self._cached(
+                number,
+                lambda: [page.pk for page in self._search()[start : start + SEARCH_RESULTS_BLOCK_SIZE]],
+            )
+        return self._blocks[number]
+
+    def __getitem__(self, index):
+        if not isinstance(index, slice):
+            return self[index : index + 1][0]
+        start, stop, _ = index.indices(self.count())
+        ids = []
+        for number in range(start // SEARCH_RESULTS_BLOCK_SIZE, -(-stop // SEARCH_RESULTS_BLOCK_SIZE)):
+            offset = number * SEARCH_RESULTS_BLOCK_SIZE
+            ids += self._block(number)[max(start - offset, 0) : stop - offset]
+        return ids
+
+
+def get_result_ids(query):
+    """
+    The ids of the live pages matching `query` (see ResultIds).
+    """
+    record_dependency(Page)
+    return ResultIds(query)
+
+
+def get_specific_pages(page_ids):
+    """
+    Specific page objects for `page_ids`, in the same order, fetched with
+    one query per page type rather than one per result.
+    """
+    pages = Page.objects.live().filter(pk__in=page_ids).specific().in_bulk()
+    return [pages[page_id] for page_id in page_ids if page_id in pages]
+
+
+def _load_promotions(normalized_query):
+    record_dependency(SearchPromotion)
+    promotions = []
+    for promotion in SearchPromotion.objects.filter(
+        query__query_string=normalized_query
+    ).select_related("page").order_by("sort_order"):
+        if promotion.page is not None:
+            if not promotion.page.live:
+                continue
+            record_dependency(promotion.page)
+            url = promotion.page.get_url()
+        else:
+            url = promotion.external_link_url
+        promotions.append(
+            {"title": promotion.title, "url": url, "description": promotion.description}
+        )
+    return promotions
+
+
+def get_promotions(query):
+    """
+    The editors' promoted results for `query`, cached until a promotion or
+    promoted page changes.
+    """
+    normalized_query = normalize_query(query)
+    digest = hashlib.md5(normalized_query.encode(), usedforsecurity=False).hexdigest()
+    promotions, _ = cached_render(
+        f"search:promotions:{digest}",
+        lambda: _load_promotions(normalized_query),
+        getattr(settings, "SEARCH_RESULTS_CACHE_TIMEOUT", 300),
+    )
+    return promotions
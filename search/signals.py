@@ -0,0 +1,79 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from taggit.models import Tag
+from wagtail.contrib.search_promotions.models import SearchPromotion
+from wagtail.models import Page
+from wagtail.search import index
+from wagtail.signals import page_published, page_unpublished
+
+from blogpages.models import Author
+from caching.dependencies import invalidate
+from search.autocomplete import (
+    author_suggestion,
+    autocomplete_index,
+    page_suggestion,
+    tag_suggestion,
+)
+from search.index_queue import enqueue
+
+
+@receiver(page_published)
+def add_published_page(sender, instance, **kwargs):
+    if instance.get_view_restrictions().exists():
+        autocomplete_index.remove("page", instance.pk)
+    else:
+        autocomplete_index.update(page_suggestion(instance))
+
+
+@receiver(page_unpublished)
+def remove_unpublished_page(sender, instance, **kwargs):
+    autocomplete_index.remove("page", instance.pk)
+
+
+@receiver(post_delete)
+def remove_deleted_page(sender, instance, **kwargs):
+    if isinstance(instance, Page):
+        autocomplete_index.remove("page", instance.pk)
+
+
+@receiver(post_save, sender=Author)
+def update_author(sender, instance, **kwargs):
+    # Saving a draft revision also saves the instance, carrying unpublished
+    # changes, so go by the row, which only publishing changes
+    author = Author.objects.filter(pk=instance.pk).only("name", "live").first()
+    if author is not None and author.live:
+        autocomplete_index.update(author_suggestion(author))
+    else:
+        autocomplete_index.remove("author", instance.pk)
+
+
+@receiver(post_delete, sender=Author)
+def remove_author(sender, instance, **kwargs):
+    autocomplete_index.remove("author", instance.pk)
+
+
+@receiver(post_save, sender=Tag)
+def update_tag(sender, instance, **kwargs):
+    autocomplete_index.update(tag_suggestion(instance))
+
+
+@receiver(post_delete, sender=Tag)
+def remove_tag(sender, instance, **kwargs):
+    autocomplete_index.remove("tag", instance.pk)
+
+
+@receiver(post_save, sender=SearchPromotion)
+@receiver(post_delete, sender=SearchPromotion)
+def invalidate_promotions(sender, instance, **kwargs):
+    invalidate(SearchPromotion)
+
+
+def enqueue_for_indexing(sender, instance, **kwargs):
+    enqueue(instance)
+
+
+for model in index.get_indexed_models():
+    if getattr(model, "search_auto_update", True):
+        post_save.connect(enqueue_for_indexing, sender=model)
+        post_delete.connect(enqueue_for_indexing, sender=model)
@@ -1,14 +1,17 @@
+import time
+
 from django.core.paginator import EmptyPage, PageNotAnInteger, Paginator
+from django.http import JsonResponse
 from django.template.response import TemplateResponse
 
-from wagtail.models import Page
-
-# To enable logging of search queries for use with the "Promoted search results" module
-# <https://docs.wagtail.org/en/stable/reference/contrib/searchpromotions.html>
-# uncomment the following line and the lines indicated in the search function
-# (after adding wagtail.contrib.search_promotions to INSTALLED_APPS):
-
-# from wagtail.contrib.search_promotions.models import Query
+from search.analytics import search_analytics
+from search.autocomplete import autocomplete_index
+from search.results import (
+    get_promotions,
+    get_result_ids,
+    get_specific_pages,
+    normalize_query,
+)
 
 
 def search(request):
@@ -16,16 +19,13 @@ def search(request):
     page = request.GET.get("page", 1)
 
     # Search
+    start = time.perf_counter()
+    promotions = []
     if search_query:
-        search_results = Page.objects.live().search(search_query)
-
-        # To log this query for use with the "Promoted search results" module:
-
-        # query = Query.get(search_query)
-        # query.add_hit()
-
+        search_results = get_result_ids(search_query)
+        promotions = get_promotions(search_query)
     else:
-        search_results = Page.objects.none()
+        search_results = []
 
     # Pagination
     paginator = Paginator(search_results, 10)
@@ -36,11 +36,39 @@ def search(request):
     except EmptyPage:
         search_results = paginator.page(paginator.num_pages)
 
+    search_results.object_list = get_specific_pages(search_results.object_list)
+
+    if search_query:
+        # Timed up to here, as the result ids are only fetched when sliced
+        # for the page. Counted in memory and written in batches (see
+        # search.analytics), which also feeds the "Promoted search results"
+        # module's popular queries
+        search_analytics.record(
+            normalize_query(search_query),
+            paginator.count,
+            time.perf_counter() - start,
+        )
+
     return TemplateResponse(
         request,
         "search/search.html",
         {
             "search_query": search_query,
             "search_results": search_results,
+            "promotions": promotions,
         },
     )
+
+
+def autocomplete(request):
+    search_query = request.GET.get("query", "")
+    try:
+        limit = min(int(request.GET.get("limit", 10)), 20)
+    except ValueError:
+        limit = 10
+
+    suggestions = autocomplete_index.search(search_query, limit)
+
+    return JsonResponse(
+        {"results": [suggestion._asdict() for suggestion in suggestions]}
+    )
@@ -0,0 +1,20 @@
+from wagtail import hooks
+from wagtail.admin.ui.components import Component
+
+from search.index_queue import queue_status
+
+
+class SearchIndexQueuePanel(Component):
+    name = "search_index_queue"
+    template_name = "search/panels/index_queue.html"
+    order = 400
+
+    def get_context_data(self, parent_context):
+        count, lag, failed = queue_status()
+        return {"count": count, "lag": lag, "failed": failed}
+
+
+@hooks.register("construct_homepage_panels")
+def add_search_index_queue_panel(request, panels):
+    if request.user.is_superuser:
+        panels.append(SearchIndexQueuePanel())
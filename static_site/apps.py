@@ -0,0 +1,9 @@
+from django.apps import AppConfig
+
+
+class StaticSiteConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'static_site'
+
+    def ready(self):
+        from static_site import signals  # noqa: F401
@@ -0,0 +1,254 @@
+"""
+Renders the live page tree to plain files that a web server can serve with
+no Python involved.
+
+Each page is written to <path>/index.html, and each of its routable
+subpages (e.g. BlogIndex's tags/<slug>/) to <path><subpath>index.html;
+further listing pages (the `?after=<cursor>` links) go to
+<...>/after/<cursor>/index.html. With nginx:
+
+    location / {
+        if ($arg_after) {
+            rewrite ^(.*?)/?$ $1/after/$arg_after/ last;
+        }
+        try_files $uri $uri/index.html =404;
+    }
+
+A manifest records which files each page produced and the dependency tags
+recorded while rendering it, so a change only re-renders the pages that
+showed the changed object.
+"""
+
+import fcntl
+import hashlib
+import json
+import os
+import shutil
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from itertools import repeat
+from multiprocessing import get_context
+
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser
+from django.db import close_old_connections
+from django.template.loader import render_to_string
+from django.test import RequestFactory
+
+from wagtail.models import Page, Site
+
+from caching.dependencies import (
+    collect_dependencies,
+    model_tag,
+    record_dependency,
+    reference_tags,
+)
+from static_site import workers
+
+
+MANIFEST_NAME = ".manifest.json"
+PAGE_TAG_PREFIX = model_tag(Page) + ":"
+
+
+def _output_path(page_path, cursor=None):
+    parts = [part for part in page_path.split("/") if part]
+    if cursor:
+        parts += ["after", cursor]
+    return os.path.join(*parts, "index.html")
+
+
+def _write(export_dir, relative_path, content):
+    """
+    Write `content` unless the file already holds it, keeping mtimes (and so
+    browser and proxy caches) stable for unchanged pages.
+    """
+    path = os.path.join(export_dir, relative_path)
+    try:
+        with open(path, "rb") as f:
+            unchanged = f.read() == content
+    except FileNotFoundError:
+        unchanged = False
+
+    if not unchanged:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path + ".tmp", "wb") as f:
+            f.write(content)
+        os.replace(path + ".tmp", path)
+
+    return hashlib.sha1(content, usedforsecurity=False).hexdigest()
+
+
+def _request_factory(site):
+    return RequestFactory(SERVER_NAME=site.hostname, SERVER_PORT=str(site.port))
+
+
+def _export_route(page, factory, route_path, subpath, export_dir, files, tags):
+    cursor = None
+    while True:
+        request = factory.get(route_path, {"after": cursor} if cursor else {})
+        request.user = AnonymousUser()
+
+        with collect_dependencies() as rendered_tags:
+            record_dependency(page, reference_tags(page))
+            if subpath is None:
+                response = page.serve(request)
+            else:
+                view, args, kwargs = page.resolve_subpage("/" + subpath)
+                response = page.serve(request, view, args, kwargs)
+            if hasattr(response, "render"):
+                response.render()
+        if response.status_code != 200:
+            break
+
+        tags |= rendered_tags
+        relative_path = _output_path(route_path, cursor)
+        files[relative_path] = _write(export_dir, relative_path, response.content)
+
+        cursor = (getattr(response, "context_data", None) or {}).get("next_cursor")
+        if not cursor:
+            break
+
+
+def export_page(page_id, export_dir):
+    """
+    Render one live page (every listing page of it, for a BlogIndex, and
+    any routes from its get_static_export_paths()) into `export_dir`.
+    Returns its manifest entry, or None if it isn't exportable.
+    """
+    close_old_connections()
+
+    try:
+        page = Page.objects.live().public().specific().get(pk=page_id)
+    except Page.DoesNotExist:
+        return None
+
+    url_parts = page.get_url_parts()
+    site = page.get_site()
+    if url_parts is None or url_parts[2] is None or site is None:
+        return None
+    page_path = url_parts[2]
+
+    factory = _request_factory(site)
+    files = {}
+    tags = set()
+    _export_route(page, factory, page_path, None, export_dir, files, tags)
+    for subpath in getattr(page, "get_static_export_paths", list)():
+        _export_route(page, factory, page_path + subpath, subpath, export_dir, files, tags)
+
+    return {"files": files, "tags": sorted(tags)}
+
+
+@contextmanager
+def locked_manifest(export_dir):
+    """
+    The export's manifest, held under an exclusive lock so concurrent
+    exports (e.g. publishes in two web workers) don't interleave.
+    """
+    os.makedirs(export_dir, exist_ok=True)
+    manifest_path = os.path.join(export_dir, MANIFEST_NAME)
+
+    with open(os.path.join(export_dir, ".manifest.lock"), "w") as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        try:
+            with open(manifest_path) as f:
+                manifest = json.load(f)
+        except FileNotFoundError:
+            manifest = {"pages": {}}
+
+        yield manifest
+
+        with open(manifest_path + ".tmp", "w") as f:
+            json.dump(manifest, f)
+        os.replace(manifest_path + ".tmp", manifest_path)
+
+
+def _apply(export_dir, manifest, page_id, entry):
+    previous = manifest["pages"].pop(str(page_id), None)
+    if entry is not None:
+        manifest["pages"][str(page_id)] = entry
+
+    stale = set(previous["files"] if previous else ()) - set(entry["files"] if entry else ())
+    for relative_path in stale:
+        path = os.path.join(export_dir, relative_path)
+        try:
+            os.remove(path)
+            # Tidy up now-empty directories (the export root keeps its manifest)
+            os.removedirs(os.path.dirname(path))
+        except OSError:
+            pass
+
+
+def _export_assets(export_dir):
+    # With ManifestStaticFilesStorage, collectstatic has already given the
+    # assets content-hashed names, which the rendered pages refer to.
+    if os.path.isdir(settings.STATIC_ROOT):
+        shutil.copytree(
+            settings.STATIC_ROOT,
+            os.path.join(export_dir, settings.STATIC_URL.strip("/")),
+            dirs_exist_ok=True,
+        )
+
+    site = Site.objects.filter(is_default_site=True).first()
+    if site is not None:
+        request = _request_factory(site).get("/")
+        request.user = AnonymousUser()
+        _write(export_dir, "404.html", render_to_string("404.html", request=request).encode())
+
+
+def export_site(export_dir, max_workers=4):
+    """
+    Render every live public page in parallel and drop files of pages that
+    are gone. Returns the number of pages exported.
+    """
+    page_ids = list(
+        Page.objects.live().public().filter(depth__gt=1).values_list("pk", flat=True)
+    )
+
+    with locked_manifest(export_dir) as manifest:
+        with ProcessPoolExecutor(
+            max_workers=max_workers,
+            mp_context=get_context("spawn"),
+            initializer=workers.init_worker,
+        ) as executor:
+            entries = dict(
+                zip(page_ids, executor.map(workers.export_page, page_ids, repeat(export_dir)))
+            )
+
+        for page_id in set(manifest["pages"]) - {str(page_id) for page_id in page_ids}:
+            _apply(export_dir, manifest, page_id, None)
+        for page_id, entry in entries.items():
+            _apply(export_dir, manifest, page_id, entry)
+
+        _export_assets(export_dir)
+
+    return sum(1 for entry in entries.values() if entry is not None)
+
+
+def export_changes(export_dir, tags, removed_page_ids=()):
+    """
+    Re-render only the exported pages that recorded one of `tags`, plus any
+    page named in `tags` that isn't exported yet (a first publish).
+    Returns the number of pages re-rendered.
+    """
+    tags = set(tags)
+
+    with locked_manifest(export_dir) as manifest:
+        for page_id in removed_page_ids:
+            _apply(export_dir, manifest, page_id, None)
+
+        affected = {
+            page_id
+            for page_id, entry in manifest["pages"].items()
+            if tags.intersection(entry["tags"])
+        }
+        affected.update(
+            tag[len(PAGE_TAG_PREFIX) :]
+            for tag in tags
+            if tag.startswith(PAGE_TAG_PREFIX)
+        )
+        affected -= {str(page_id) for page_id in removed_page_ids}
+
+        for page_id in affected:
+            _apply(export_dir, manifest, page_id, export_page(int(page_id), export_dir))
+
+    return len(affected)
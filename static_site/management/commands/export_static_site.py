@@ -0,0 +1,39 @@
+import time
+
+from django.conf import settings
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+
+from static_site.exporter import export_site
+
+
+class Command(BaseCommand):
+    help = "Render the live page tree to static files (see static_site.exporter for serving them)."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--output",
+            default=getattr(settings, "STATIC_SITE_EXPORT_DIR", None),
+            help="Directory to write to. Defaults to STATIC_SITE_EXPORT_DIR.",
+        )
+        parser.add_argument("--workers", type=int, default=4)
+        parser.add_argument(
+            "--collectstatic",
+            action="store_true",
+            help="Run collectstatic first, so hashed assets are up to date.",
+        )
+
+    def handle(self, *args, **options):
+        if not options["output"]:
+            raise CommandError("Pass --output or set STATIC_SITE_EXPORT_DIR.")
+
+        if options["collectstatic"]:
+            call_command("collectstatic", interactive=False, verbosity=0)
+
+        start = time.monotonic()
+        count = export_site(options["output"], options["workers"])
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Exported {count} pages to {options['output']} in {time.monotonic() - start:.1f}s."
+            )
+        )
@@ -0,0 +1,101 @@
+import logging
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from wagtail.documents import get_document_model
+from wagtail.images import get_image_model
+from wagtail.models import Page, PageViewRestriction
+from wagtail.signals import page_published, page_unpublished
+
+from blogpages.models import Author
+from caching.dependencies import tags_for
+from caching.signals import page_change_tags, restricted_page_ids, restriction_change_tags
+from static_site import workers
+
+
+logger = logging.getLogger(__name__)
+
+_executor = None
+
+
+def get_executor():
+    global _executor
+    if _executor is None:
+        # One worker: incremental exports are small and queue up behind each other
+        _executor = ProcessPoolExecutor(
+            max_workers=1,
+            mp_context=get_context("spawn"),
+            initializer=workers.init_worker,
+        )
+    return _executor
+
+
+def _log_failure(future):
+    exception = future.exception()
+    if exception is not None:
+        logger.error("Static site export failed", exc_info=exception)
+
+
+def queue_export(tags, removed_page_ids=()):
+    """
+    Re-export the pages affected by `tags` in the background once the current
+    transaction commits. Does nothing unless STATIC_SITE_EXPORT_DIR is set.
+    """
+    export_dir = getattr(settings, "STATIC_SITE_EXPORT_DIR", None)
+    if not export_dir:
+        return
+
+    def submit():
+        future = get_executor().submit(
+            workers.export_changes, export_dir, sorted(tags), list(removed_page_ids)
+        )
+        future.add_done_callback(_log_failure)
+
+    transaction.on_commit(submit)
+
+
+@receiver(page_published)
+def export_published_page(sender, instance, **kwargs):
+    queue_export(page_change_tags(instance))
+
+
+@receiver(page_unpublished)
+def remove_unpublished_page(sender, instance, **kwargs):
+    queue_export(page_change_tags(instance), [instance.pk])
+
+
+@receiver(post_delete)
+def remove_deleted_page(sender, instance, **kwargs):
+    if isinstance(instance, Page):
+        queue_export(page_change_tags(instance), [instance.pk])
+
+
+@receiver(post_save, sender=PageViewRestriction)
+def remove_restricted_pages(sender, instance, **kwargs):
+    # The export is served without Python, so private pages must not be in it
+    page_ids = restricted_page_ids(instance)
+    if page_ids:
+        queue_export(restriction_change_tags(page_ids), page_ids)
+
+
+@receiver(post_delete, sender=PageViewRestriction)
+def export_unrestricted_pages(sender, instance, **kwargs):
+    # Re-exported if they're public now (another restriction may still apply)
+    page_ids = restricted_page_ids(instance)
+    if page_ids:
+        queue_export(restriction_change_tags(page_ids))
+
+
+@receiver(post_save, sender=Author)
+@receiver(post_delete, sender=Author)
+@receiver(post_save, sender=get_image_model())
+@receiver(post_delete, sender=get_image_model())
+@receiver(post_save, sender=get_document_model())
+@receiver(post_delete, sender=get_document_model())
+def export_pages_using_object(sender, instance, **kwargs):
+    queue_export(tags_for(instance))
@@ -0,0 +1,20 @@
+# Runs inside export worker processes: nothing Django-dependent may be
+# imported at module level, as it is loaded before Django is set up.
+
+
+def init_worker():
+    import django
+
+    django.setup()
+
+
+def export_page(page_id, export_dir):
+    from static_site.exporter import export_page
+
+    return export_page(page_id, export_dir)
+
+
+def export_changes(export_dir, tags, removed_page_ids=()):
+    from static_site.exporter import export_changes
+
+    return export_changes(export_dir, tags, removed_page_ids)